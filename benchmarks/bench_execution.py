@@ -0,0 +1,87 @@
+""" Compare `AsyncioExecutor` (promises) and native asyncio execution of the same query.
+
+Usage (test database from `tests/common/models.py`)::
+
+    python -m benchmarks.bench_execution [authors] [books per author] [runs]
+"""
+import asyncio
+import sys
+import time
+
+from peewee_async import Manager
+
+from graphene_peewee_async.cost import QueryCostMiddleware
+from graphene_peewee_async.execution import execute_async
+from tests.common.models import db, Author, Book
+from tests.common.schema import generate_schema
+
+
+QUERY = '''
+    query {
+        books {
+            total
+            edges {
+                node {
+                    id
+                    name
+                    year
+                    author { id name rating }
+                }
+            }
+        }
+    }
+'''
+
+
+async def fill(manager, authors, books):
+    await manager.execute(Book.delete())
+    await manager.execute(Author.delete())
+    for i in range(authors):
+        author = await manager.create(Author, name='author{}'.format(i), rating=i)
+        await manager.execute(Book.insert_many([
+            {'name': 'book{}'.format(j), 'year': 2000 + j % 20, 'author': author.id} for j in range(books)
+        ]))
+
+
+def run_promise(schema, executor, middleware):
+    return schema.execute(QUERY, executor=executor, return_promise=True, middleware=middleware)
+
+
+def run_native(schema, executor, middleware):
+    return execute_async(schema, QUERY, middleware=middleware)
+
+
+async def measure(name, run, runs, *args):
+    await run(*args)  # Warm up
+    started = time.perf_counter()
+    for _ in range(runs):
+        result = await run(*args)
+        assert not result.errors, result.errors
+    elapsed = (time.perf_counter() - started) / runs
+    print('{:<20} {:8.2f} ms'.format(name, elapsed * 1000))
+    return elapsed
+
+
+async def main(authors=10, books=100, runs=20):
+    loop = asyncio.get_event_loop()
+    manager = Manager(db, loop=loop)
+    await manager.connect()
+    schema, executor = generate_schema(manager, [Book, Author])
+    await fill(manager, authors, books)
+    raw_schema, _ = generate_schema(manager, [Book, Author], skip_serialize=True)
+    print('{} rows, {} runs'.format(authors * books, runs))
+    # Middleware makes graphql-core wrap every resolver result in a promise
+    native = {}
+    for middleware in (None, [QueryCostMiddleware()]):
+        suffix = ' + middleware' if middleware else ''
+        promise = await measure('promise' + suffix, run_promise, runs, schema, executor, middleware)
+        native[suffix] = await measure('native' + suffix, run_native, runs, schema, executor, middleware)
+        print('{:<20} {:8.2f}x'.format('speedup', promise / native[suffix]))
+    raw = await measure('native + raw', run_native, runs, raw_schema, executor, None)
+    print('{:<20} {:8.2f}x'.format('skip_serialize', native[''] / raw))
+    await manager.execute(Book.delete())
+    await manager.execute(Author.delete())
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main(*map(int, sys.argv[1:])))
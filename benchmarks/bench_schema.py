@@ -0,0 +1,68 @@
+""" Measure time and memory spent building a schema (node, connection and mutation classes) for many models
+and answering introspection with and without `SchemaSnapshot`.
+
+No database connection is needed::
+
+    python -m benchmarks.bench_schema [models] [columns per model]
+"""
+import asyncio
+import gc
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+from peewee import CharField, IntegerField, ForeignKeyField, Model
+from peewee_async import Manager
+from graphql.utils.introspection_query import introspection_query
+
+from graphene_peewee_async.schema_snapshot import SchemaSnapshot
+
+from tests.common.models import db
+from tests.common.schema import generate_schema
+
+
+def make_models(count, columns):
+    """ Tree of models, each one referencing its parent, so most models have backref connections.
+    (Long chains of types are not supported by graphene as its type map is built recursively)
+    """
+    models = []
+    for i in range(count):
+        attrs = {'column{}'.format(j): (CharField if j % 2 else IntegerField)(null=True) for j in range(columns)}
+        if models:
+            attrs['parent'] = ForeignKeyField(models[(i - 1) // 2], null=True, backref='model{}s'.format(i))
+        attrs['Meta'] = type('Meta', (), {'database': db, 'table_name': 'model{}'.format(i)})
+        models.append(type('Model{}'.format(i), (Model,), attrs))
+    return models
+
+
+def measure(name, func, *args):
+    """ Time is measured separately as tracing slows allocations down """
+    gc.collect()
+    started = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    tracemalloc.start()
+    func(*args)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print('{:<20} {:8.2f} ms {:8.2f} MB'.format(name, elapsed * 1000, memory / 2 ** 20))
+    return result
+
+
+def main(count=400, columns=5):
+    manager = Manager(db, loop=asyncio.get_event_loop())
+    models = make_models(count, columns)
+    print('{} models, {} columns each'.format(count, columns))
+    schema, _ = measure('schema', generate_schema, manager, models)  # Type map is built by `Schema` eagerly
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'schema.json')
+        measure('introspection', lambda: SchemaSnapshot(schema).execute_introspection(introspection_query))
+        SchemaSnapshot(schema, path).warm()
+        measure('cached introspection', lambda: SchemaSnapshot(schema, path).execute_introspection(introspection_query))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,76 @@
+""" Compare `name__ilike: "%word%"` and `name__search: "word"` filters over a table with a GIN expression index.
+
+Usage (test database from `tests/common/models.py`)::
+
+    python -m benchmarks.bench_search [rows] [runs]
+"""
+import asyncio
+import random
+import sys
+import time
+
+from peewee import CharField, Model
+from peewee_async import Manager
+
+from graphene_peewee_async.queries import filter, SEARCH_CONFIG
+from tests.common.models import db
+
+
+WORDS = ['alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf', 'hotel', 'india', 'juliett',
+         'kilo', 'lima', 'mike', 'november', 'oscar', 'papa', 'quebec', 'romeo', 'sierra', 'tango']
+SEARCHED = 'needle'
+
+
+class Document(Model):
+    name = CharField()
+
+    class Meta:
+        database = db
+        table_name = 'bench_search_document'
+
+
+async def fill(manager, rows):
+    random.seed(rows)
+    with manager.allow_sync():
+        Document.drop_table(safe=True)
+        Document.create_table()
+        db.execute_sql('CREATE INDEX ON {} USING GIN (to_tsvector(\'{}\', name))'.format(
+            Document._meta.table_name, SEARCH_CONFIG))
+    batch = 10000
+    for start in range(0, rows, batch):
+        await manager.execute(Document.insert_many([
+            {'name': ' '.join(random.sample(WORDS, 8) + ([SEARCHED] if i % 1000 == 0 else []))}
+            for i in range(start, min(start + batch, rows))
+        ]))
+    with manager.allow_sync():
+        db.execute_sql('ANALYZE {}'.format(Document._meta.table_name))
+
+
+async def measure(name, manager, filters, runs):
+    query = filter(Document.select(Document.id), filters)
+    count = len(await manager.execute(query))  # Warm up
+    started = time.perf_counter()
+    for _ in range(runs):
+        await manager.execute(query)
+    elapsed = (time.perf_counter() - started) / runs
+    sql, params = query.sql()
+    with manager.allow_sync():
+        plan = db.execute_sql('EXPLAIN ' + sql, params).fetchone()[0]
+    print('{:<10} {:8.2f} ms {:6} rows  {}'.format(name, elapsed * 1000, count, plan))
+    return elapsed
+
+
+async def main(rows=200000, runs=20):
+    manager = Manager(db, loop=asyncio.get_event_loop())
+    await manager.connect()
+    await fill(manager, rows)
+    print('{} rows, {} runs'.format(rows, runs))
+    ilike = await measure('ilike', manager, {'name__ilike': '%{}%'.format(SEARCHED)}, runs)
+    search = await measure('search', manager, {'name__search': SEARCHED}, runs)
+    print('{:<10} {:8.2f}x'.format('speedup', ilike / search))
+    with manager.allow_sync():
+        Document.drop_table()
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main(*map(int, sys.argv[1:])))
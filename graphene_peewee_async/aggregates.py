@@ -0,0 +1,133 @@
+from collections import OrderedDict
+
+from graphene import ObjectType, Field, Float, Int, Dynamic, NonNull
+from peewee import fn, SQL, ForeignKeyField, IntegerField, FloatField, DecimalField, DateField, DateTimeField, TimeField
+
+from .database import execute, get_read_manager
+from .queries import filter, get_model
+from .utils import iter_fields, get_computed_fields, get_generated_type
+
+
+AGGREGATE_FIELD = 'aggregate'
+GROUP_BY_ARGUMENT = 'group_by'
+AGGREGATE_QUERY_ATTR = '__aggregate_query__'
+COUNT_FIELD = 'count'
+GROUP_FIELD = 'group'
+COLUMN_DELIMITER = '__'
+NUMERIC_FUNCTIONS = OrderedDict([('sum', fn.SUM), ('avg', fn.AVG)])
+VALUE_FUNCTIONS = OrderedDict([('min', fn.MIN), ('max', fn.MAX)])
+NUMERIC_FIELDS = (IntegerField, FloatField, DecimalField)
+VALUE_FIELDS = NUMERIC_FIELDS + (DateField, DateTimeField, TimeField)
+
+
+def get_columns(model, field_types=None):
+    return [field for field in model._meta.sorted_fields
+            if not field.primary_key and (field_types is None or isinstance(field, field_types))]
+
+
+def get_foreign_key_type(field):
+    """ Scalar type of the column referenced by foreign key (following foreign keys to foreign keys) """
+    from .converter import convert_peewee_field
+    while isinstance(field, ForeignKeyField):
+        field = field.rel_field
+    return convert_peewee_field(field).get_type()
+
+
+def get_column_type(node, name):
+    field = node._meta.fields[name]
+    if isinstance(field, Dynamic):  # Foreign key is grouped and filtered by its column
+        return get_foreign_key_type(node._meta.model._meta.fields[name])
+    _type = field.type
+    return _type.of_type if isinstance(_type, NonNull) else _type
+
+
+def get_aggregate_type(node):
+    """ Object type of connection `aggregate` items: `count`, values of `group_by` columns,
+    `sum` and `avg` of numeric columns, `min` and `max` of numeric and date columns
+    """
+    return get_generated_type(node, 'Aggregate', lambda: generate_aggregate_type(node))
+
+
+def generate_aggregate_type(node):
+    model = node._meta.model
+    name = node._meta.name
+    attrs = OrderedDict([(COUNT_FIELD, Int())])
+    group_type = type('{}AggregateGroup'.format(name), (ObjectType,), OrderedDict(
+        (field.name, Field(get_column_type(node, field.name))) for field in get_columns(model)
+    ))
+    attrs[GROUP_FIELD] = Field(group_type)
+    numeric_fields = get_columns(model, NUMERIC_FIELDS)
+    if numeric_fields:
+        numbers_type = type('{}AggregateNumbers'.format(name), (ObjectType,), OrderedDict(
+            (field.name, Float()) for field in numeric_fields
+        ))
+        for function_name in NUMERIC_FUNCTIONS:
+            attrs[function_name] = Field(numbers_type)
+    value_fields = get_columns(model, VALUE_FIELDS)
+    if value_fields:
+        values_type = type('{}AggregateValues'.format(name), (ObjectType,), OrderedDict(
+            (field.name, Field(get_column_type(node, field.name))) for field in value_fields
+        ))
+        for function_name in VALUE_FUNCTIONS:
+            attrs[function_name] = Field(values_type)
+    return type('{}Aggregate'.format(name), (ObjectType,), attrs)
+
+
+class AggregateRows(list):
+    """ No rows of a connection requesting nothing but `aggregate`, so only the `GROUP BY` query is executed """
+
+
+def get_connection_fields(info):
+    return {field_ast.name.value
+            for connection_ast in info.field_asts
+            for field_ast in iter_fields(connection_ast.selection_set.selections, info.fragments, info.variable_values)}
+
+
+def get_filtered_query(query, filters, registry=None):
+    """ Query of all rows matching connection filters, to be aggregated """
+    computed = {}
+    if filters:
+        computed = {name: expression(query.model)
+                    for name, expression in get_computed_fields(registry, get_model(query.model)).items()}
+    return filter(query, filters, {}, computed)
+
+
+def get_aggregate_query(query, info, group_by=None):
+    """ Single `GROUP BY` query selecting only requested aggregates """
+    model = query.model
+    groups = [getattr(model, name) for name in group_by or ()]
+    columns = [group.alias(COLUMN_DELIMITER.join((GROUP_FIELD, name))) for name, group in zip(group_by or (), groups)]
+    functions = dict(NUMERIC_FUNCTIONS, **VALUE_FUNCTIONS)
+    for field_ast in iter_fields(info.field_asts[0].selection_set.selections, info.fragments, info.variable_values):
+        name = field_ast.name.value
+        if name == COUNT_FIELD:
+            columns.append(fn.COUNT(SQL('*')).alias(COUNT_FIELD))
+        elif name in functions:
+            for column_ast in iter_fields(field_ast.selection_set.selections, info.fragments, info.variable_values):
+                column_name = column_ast.name.value
+                if not column_name.startswith('__'):
+                    columns.append(functions[name](getattr(model, column_name)).alias(
+                        COLUMN_DELIMITER.join((name, column_name))))
+    if not columns:
+        columns = [SQL('1')]
+    return query.select(*columns).group_by(*groups).order_by(*groups).dicts()
+
+
+def get_aggregate(row):
+    result = {}
+    for key, value in row.items():
+        if COLUMN_DELIMITER in key:
+            name, column = key.split(COLUMN_DELIMITER, 1)
+            result.setdefault(name, {})[column] = value
+        else:
+            result[key] = value
+    return result
+
+
+async def resolve_aggregate(connection, info, group_by=None):
+    query = getattr(connection.iterable, AGGREGATE_QUERY_ATTR, None)
+    if query is None:  # Already fetched objects (mutation results)
+        return None
+    manager = await get_read_manager(info, connection._meta.node._meta)
+    rows = await execute(info, manager, get_aggregate_query(query, info, group_by))
+    return [get_aggregate(row) for row in rows]
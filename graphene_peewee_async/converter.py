@@ -5,7 +5,7 @@ from graphene.types.generic import GenericScalar
 from graphene.types.datetime import DateTime
 from graphene.utils.str_converters import to_const
 
-from .fields import PeeweeListField, PeeweeConnectionField, PeeweeConnection
+from .fields import PeeweeListField, PeeweeConnectionField
 from .utils import import_single_dispatch
 
 
@@ -96,20 +96,23 @@ def convert_date_to_string(field, registry=None):
 @convert_peewee_field.register(peewee.BackrefAccessor)
 def convert_field_to_list_or_connection(field, registry=None):
     model = field.rel_model
+    converted = {}  # Dynamic type is resolved by the type map, cost analysis, etc. so it's made once per node type
 
     def dynamic_type():
         _type = registry.get_type_for_model(model)
         if not _type:
             return
+        if _type in converted:
+            return converted[_type]
         if True: # if is_node(_type): # TODO: Find a way to ckeck that it's a node but without `issubclass(i, Node)` insterfaces check
             # Generate another queries for set until aggregate_rows implemented for peewee-async
             # https://github.com/05bit/peewee-async/issues/10
-            connection_meta_class = type('Meta', (), {'node': _type})
-            connection_class = type('{}_{}_Connection'.format(field.field.rel_model.__name__, field.field.backref),
-                                    (PeeweeConnection,),
-                                    {connection_meta_class.__name__: connection_meta_class})
-            return PeeweeConnectionField(connection_class)
-        return PeeweeListField(_type)
+            connection_class = registry.get_connection(
+                '{}_{}_Connection'.format(field.field.rel_model.__name__, field.field.backref), _type)
+            converted[_type] = PeeweeConnectionField(connection_class)
+        else:
+            converted[_type] = PeeweeListField(_type)
+        return converted[_type]
 
     return Dynamic(dynamic_type)
 
@@ -0,0 +1,218 @@
+from graphql.execution.values import get_argument_values
+from graphql.type.definition import GraphQLObjectType, get_named_type
+from graphene import Dynamic
+from peewee import Select, SQL
+
+from .fields import PeeweeConnection, PeeweeConnectionField, PaginationError, get_pagination
+from .types import PeeweeObjectType
+from .utils import iter_fields, get_context_value, set_context_value
+
+
+QUERY_COST_CONTEXT_KEY = 'query_cost'
+DEFAULT_UNBOUNDED_ROWS = 1000  # Rows expected from unpaginated query of a table without statistics
+DEFAULT_FANOUT = 10  # Backref rows expected per parent row without statistics
+QUERY_WEIGHT = 10
+ROW_WEIGHT = 1
+JOINED_ROW_WEIGHT = 1
+
+
+class QueryCostError(Exception):
+    pass
+
+
+class QueryCost(object):
+    """ Estimated amount of database work needed for a GraphQL operation """
+
+    def __init__(self, operation=None):
+        self.operation = operation
+        self.queries = 0
+        self.rows = 0
+        self.joins = 0
+        self.joined_rows = 0
+
+    def add_query(self, executions, rows):
+        self.queries += executions
+        self.rows += executions * rows
+
+    def add_join(self, executions, rows):
+        self.joins += executions
+        self.joined_rows += executions * rows
+
+    @property
+    def total(self):
+        return self.queries * QUERY_WEIGHT + self.rows * ROW_WEIGHT + self.joined_rows * JOINED_ROW_WEIGHT
+
+    def as_dict(self):
+        return {
+            'total': self.total,
+            'queries': self.queries,
+            'rows': self.rows,
+            'joins': self.joins,
+        }
+
+
+def get_graphene_type(gql_type):
+    return getattr(get_named_type(gql_type), 'graphene_type', None)
+
+
+def is_connection(graphene_type):
+    return isinstance(graphene_type, type) and issubclass(graphene_type, PeeweeConnection)
+
+
+def is_node(graphene_type):
+    return isinstance(graphene_type, type) and issubclass(graphene_type, PeeweeObjectType)
+
+
+def get_page_size(field, args):
+    if not isinstance(field, PeeweeConnectionField):
+        field = PeeweeConnectionField  # Global settings
+    try:
+        return get_pagination(args, field.default_paginate_by, field.max_paginate_by)[1]
+    except PaginationError:
+        return None
+
+
+class CostAnalyzer(object):
+    """ Walks selection set of an operation like `get_requested_models` does and estimates
+    how many queries, rows and joins it will take.
+    `statistics` is an optional `{model: rows}` dict (see `get_table_statistics`)
+    used instead of default estimations for unpaginated queries and backref fan-out.
+    """
+
+    def __init__(self, schema, fragments=None, variables=None, statistics=None):
+        self.schema = schema
+        self.fragments = fragments or {}
+        self.variables = variables or {}
+        self.statistics = statistics or {}
+
+    def analyze(self, operation):
+        cost = QueryCost(operation)
+        if operation.operation == 'mutation':
+            root_type = self.schema.get_mutation_type()
+        else:
+            root_type = self.schema.get_query_type()
+        self.walk_object(cost, root_type, operation.selection_set.selections, 1)
+        return cost
+
+    def get_fields(self, parent_type, selections):
+        for field_ast in iter_fields(selections, self.fragments, self.variables):
+            gql_field = parent_type.fields.get(field_ast.name.value)
+            if gql_field is not None:
+                yield field_ast, gql_field
+
+    def get_graphene_field(self, parent_type, name):
+        graphene_type = getattr(parent_type, 'graphene_type', None)
+        fields = getattr(getattr(graphene_type, '_meta', None), 'fields', None) or {}
+        field = fields.get(name)
+        if isinstance(field, Dynamic):
+            field = field.get_type()
+        return field
+
+    def estimate_rows(self, model, page_size, parent_model=None):
+        if parent_model is None:
+            rows = self.statistics.get(model, DEFAULT_UNBOUNDED_ROWS)
+        elif model in self.statistics and parent_model in self.statistics:
+            rows = self.statistics[model] / max(self.statistics[parent_model], 1)
+        else:
+            rows = DEFAULT_FANOUT
+        if page_size is not None:
+            rows = min(rows, page_size)
+        return max(rows, 1)
+
+    def walk_object(self, cost, gql_type, selections, executions):
+        """ Fields of a non-node type (query root, mutation payload) """
+        for field_ast, gql_field in self.get_fields(gql_type, selections):
+            graphene_type = get_graphene_type(gql_field.type)
+            if is_connection(graphene_type):
+                self.walk_connection(cost, gql_type, field_ast, gql_field, executions)
+            elif is_node(graphene_type) and field_ast.selection_set:
+                cost.add_query(executions, 1)
+                self.walk_node(cost, get_named_type(gql_field.type), field_ast.selection_set.selections,
+                               executions, 1)
+            elif isinstance(get_named_type(gql_field.type), GraphQLObjectType) and field_ast.selection_set:
+                self.walk_object(cost, get_named_type(gql_field.type), field_ast.selection_set.selections,
+                                 executions)
+
+    def walk_connection(self, cost, parent_type, field_ast, gql_field, executions, parent_model=None):
+        connection_type = get_named_type(gql_field.type)
+        model = connection_type.graphene_type._meta.node._meta.model
+        args = get_argument_values(gql_field.args, field_ast.arguments, self.variables)
+        field = self.get_graphene_field(parent_type, field_ast.name.value)
+        rows = self.estimate_rows(model, get_page_size(field, args), parent_model)
+        cost.add_query(executions, rows)
+        for edges_ast, edges_field in self.get_fields(connection_type, field_ast.selection_set.selections):
+            if edges_ast.name.value != 'edges' or not edges_ast.selection_set:
+                continue
+            edge_type = get_named_type(edges_field.type)
+            for node_ast, node_field in self.get_fields(edge_type, edges_ast.selection_set.selections):
+                if node_ast.name.value == 'node' and node_ast.selection_set:
+                    self.walk_node(cost, get_named_type(node_field.type), node_ast.selection_set.selections,
+                                   executions, rows)
+
+    def walk_node(self, cost, node_type, selections, executions, rows):
+        """ Fields of a node fetched by `executions` queries returning `rows` rows each """
+        model = node_type.graphene_type._meta.model
+        for field_ast, gql_field in self.get_fields(node_type, selections):
+            graphene_type = get_graphene_type(gql_field.type)
+            if is_connection(graphene_type):
+                self.walk_connection(cost, node_type, field_ast, gql_field, executions * rows, model)
+            elif is_node(graphene_type) and field_ast.selection_set:
+                cost.add_join(executions, rows)
+                self.walk_node(cost, get_named_type(gql_field.type), field_ast.selection_set.selections,
+                               executions, rows)
+
+
+def get_query_cost(schema, operation, fragments=None, variables=None, statistics=None):
+    return CostAnalyzer(schema, fragments, variables, statistics).analyze(operation)
+
+
+def check_query_cost(cost, max_cost=None, max_queries=None, max_rows=None, max_joins=None):
+    for name, value, limit in (('cost', cost.total, max_cost),
+                               ('queries', cost.queries, max_queries),
+                               ('rows', cost.rows, max_rows),
+                               ('joins', cost.joins, max_joins)):
+        if limit is not None and value > limit:
+            raise QueryCostError('Query {} {} exceeds limit of {}'.format(name, value, limit))
+
+
+async def get_table_statistics(manager, models):
+    """ Get `{model: rows}` planner estimations from `pg_class` """
+    tables = {model._meta.table_name: model for model in models}
+    query = Select(from_list=[SQL('pg_class')],
+                   columns=[SQL('relname'), SQL('reltuples')]).where(SQL('relname').in_(list(tables)))
+    query = query.bind(manager.database)
+    rows = await manager.execute(query)
+    return {tables[row['relname']]: max(int(row['reltuples']), 0) for row in rows}
+
+
+class QueryCostMiddleware(object):
+    """ Rejects operations which estimated cost exceeds given limits before any SQL runs.
+
+    Computed `QueryCost` is stored in the context as `query_cost` to be reported in the response.
+
+    Example::
+
+        schema.execute(query, middleware=[QueryCostMiddleware(max_cost=10000)], context_value={}, ...)
+    """
+
+    def __init__(self, max_cost=None, max_queries=None, max_rows=None, max_joins=None, statistics=None):
+        self.limits = {
+            'max_cost': max_cost,
+            'max_queries': max_queries,
+            'max_rows': max_rows,
+            'max_joins': max_joins,
+        }
+        self.statistics = statistics
+
+    def get_cost(self, info):
+        cost = get_context_value(info, QUERY_COST_CONTEXT_KEY)
+        if cost is None or cost.operation is not info.operation:
+            cost = get_query_cost(info.schema, info.operation, info.fragments, info.variable_values,
+                                  self.statistics)
+            set_context_value(info, QUERY_COST_CONTEXT_KEY, cost)
+        return cost
+
+    def resolve(self, next, root, info, **args):
+        if info.path is not None and len(info.path) == 1:  # Root fields only
+            check_query_cost(self.get_cost(info), **self.limits)
+        return next(root, info, **args)
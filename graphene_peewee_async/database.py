@@ -0,0 +1,242 @@
+import asyncio
+import time
+
+from peewee import SelectQuery, Select, SQL, DatabaseError, __exception_wrapper__
+from peewee_async import AsyncQueryWrapper
+
+from .queries import get_prefetches
+from .utils import get_context_value, set_context_value
+
+
+SNAPSHOT_CONTEXT_KEY = 'snapshot'
+SNAPSHOT_BEGIN_SQL = 'BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY'
+READ_FROM_PRIMARY_CONTEXT_KEY = 'read_from_primary'
+REPLICA_LAG_SQL = 'COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)'
+REPLICA_LAG_CHECK_INTERVAL = 1.0
+DEADLINE_CONTEXT_KEY = 'deadline'
+
+
+class QueryTimeoutError(Exception):
+    pass
+
+
+async def fetch_all(cursor, query):
+    result = AsyncQueryWrapper(cursor=cursor, query=query)
+    try:
+        while True:
+            await result.fetchone()
+    except GeneratorExit:
+        pass
+    return result
+
+
+async def run_sql(connection, sql, params=None):
+    cursor = await connection.cursor()
+    try:
+        with __exception_wrapper__:
+            await cursor.execute(sql, params)
+    finally:
+        cursor.close()
+
+
+async def run_query(connection, query, timeout=None):
+    """ Execute query on the connection, limiting it with `statement_timeout` if `timeout` (seconds) is given.
+    Cancelling the calling task cancels the query at the backend as well (done by aiopg).
+    """
+    if timeout is not None:
+        await run_sql(connection, 'SET statement_timeout = %s', (max(int(timeout * 1000), 1),))
+    started = time.monotonic()
+    cursor = await connection.cursor()
+    try:
+        with __exception_wrapper__:
+            await cursor.execute(*query.sql())
+        if isinstance(query, SelectQuery):
+            return await fetch_all(cursor, query)
+        return cursor.rowcount
+    except asyncio.CancelledError:
+        # aiopg reports backend-side query cancellation as `CancelledError` too
+        if timeout is not None and time.monotonic() - started >= timeout:
+            raise QueryTimeoutError('Query exceeded {}s timeout'.format(timeout))
+        raise
+    finally:
+        cursor.close()
+        if timeout is not None:
+            try:
+                await run_sql(connection, 'RESET statement_timeout')
+            except DatabaseError:
+                pass  # Aborted transaction, setting will be rolled back with it
+
+
+class Snapshot(object):
+    """ Runs all reads of one GraphQL query operation over a single pooled connection
+    inside of a `REPEATABLE READ READ ONLY` transaction, so every field sees the same data.
+
+    Example::
+
+        async with Snapshot(manager) as snapshot:
+            result = await schema.execute(query, context_value={'snapshot': snapshot}, ...)
+
+    Queries sharing the connection are executed one by one.
+    Mutation operations and other managers' databases are not affected.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.connection = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def pool(self):
+        return self.manager.database._async_conn
+
+    async def __aenter__(self):
+        await self.manager.connect()
+        self.connection = await self.pool.acquire()
+        try:
+            await self.execute_sql(SNAPSHOT_BEGIN_SQL)
+        except:
+            self.pool.release(self.connection)
+            self.connection = None
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            await self.execute_sql('ROLLBACK' if exc_type else 'COMMIT')
+        finally:
+            self.pool.release(self.connection)
+            self.connection = None
+
+    async def execute_sql(self, sql, params=None):
+        async with self._lock:
+            await run_sql(self.connection, sql, params)
+
+    async def execute(self, query, timeout=None):
+        query = self.manager._swap_database(query)
+        async with self._lock:
+            return await run_query(self.connection, query, timeout)
+
+
+def get_snapshot(info, manager):
+    if info.operation.operation != 'query':
+        return None
+    snapshot = get_context_value(info, SNAPSHOT_CONTEXT_KEY)
+    if snapshot is not None and snapshot.manager.database is manager.database:
+        return snapshot
+    return None
+
+
+def get_timeout(info, timeout=None):
+    """ Get seconds left for a query: the smaller of the field's own `timeout`
+    and the time remaining until the operation `deadline` (`time.monotonic()` based) passed with the context
+    """
+    deadline = get_context_value(info, DEADLINE_CONTEXT_KEY)
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        timeout = remaining if timeout is None else min(timeout, remaining)
+    if timeout is not None and timeout <= 0:
+        raise QueryTimeoutError('Operation deadline exceeded')
+    return timeout
+
+
+async def execute_with_timeout(manager, query, timeout):
+    query = manager._swap_database(query)
+    await manager.connect()
+    database = manager.database
+    if database.transaction_depth_async() > 0:
+        return await run_query(database.transaction_conn_async(), query, timeout)
+    pool = database._async_conn
+    connection = await pool.acquire()
+    try:
+        return await run_query(connection, query, timeout)
+    finally:
+        pool.release(connection)
+
+
+async def execute(info, manager, query, timeout=None):
+    timeout = get_timeout(info, timeout)
+    snapshot = get_snapshot(info, manager)
+    if snapshot is not None and isinstance(query, SelectQuery):
+        result = await snapshot.execute(query, timeout)
+    elif timeout is not None:
+        result = await execute_with_timeout(manager, query, timeout)
+    else:
+        result = await manager.execute(query)
+    for prefetch in get_prefetches(query):
+        await execute_prefetch(info, manager, result, prefetch, timeout)
+    return result
+
+
+async def execute_prefetch(info, manager, rows, prefetch, timeout=None):
+    """ Fetch foreign key objects of the rows by their ids with a separate query (see `queries.Prefetch`) """
+    owners = prefetch.get_owners(rows)
+    ids = list({owner.__data__.get(prefetch.field.name) for owner in owners} - {None})
+    if ids:
+        prefetch.set(owners, await execute(info, manager, prefetch.get_query(ids), timeout))
+
+
+async def get(info, manager, query, timeout=None):
+    """ Same as `Manager.get`, but for a ready select query only """
+    result = await execute(info, manager, query, timeout)
+    try:
+        return list(result)[0]
+    except IndexError:
+        raise query.model.DoesNotExist
+
+
+class ReplicaLagMonitor(object):
+    """ Tells if replica is not behind primary more than `max_lag` seconds.
+    Replay lag is requested at most once per `check_interval` seconds.
+    """
+
+    def __init__(self, manager, max_lag, check_interval=REPLICA_LAG_CHECK_INTERVAL):
+        self.manager = manager
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag = None
+        self.checked_at = None
+
+    async def get_lag(self):
+        now = time.monotonic()
+        if self.checked_at is None or now - self.checked_at >= self.check_interval:
+            self.checked_at = now
+            query = Select(columns=[SQL(REPLICA_LAG_SQL)]).bind(self.manager.database)
+            try:
+                self.lag = float(await self.manager.scalar(query))
+            except DatabaseError:
+                self.lag = None
+        return self.lag
+
+    async def is_fresh(self):
+        lag = await self.get_lag()
+        return lag is not None and lag <= self.max_lag
+
+
+_lag_monitors = {}
+
+
+def get_lag_monitor(manager, max_lag):
+    key = (manager, max_lag)
+    if key not in _lag_monitors:
+        _lag_monitors[key] = ReplicaLagMonitor(manager, max_lag)
+    return _lag_monitors[key]
+
+
+def mark_written(info):
+    """ Make further reads with the same context go to primary (read-your-writes) """
+    set_context_value(info, READ_FROM_PRIMARY_CONTEXT_KEY, True)
+
+
+async def get_read_manager(info, options):
+    """ Choose manager for reading with `PeeweeOptions`: replica `read_manager` for queries
+    unless request has written already or replica is lagging behind, primary `manager` otherwise
+    """
+    read_manager = options.read_manager
+    if read_manager is None or read_manager is options.manager:
+        return options.manager
+    if info.operation.operation != 'query' or get_context_value(info, READ_FROM_PRIMARY_CONTEXT_KEY):
+        return options.manager
+    if options.max_replica_lag is not None:
+        if not await get_lag_monitor(read_manager, options.max_replica_lag).is_fresh():
+            return options.manager
+    return read_manager
@@ -0,0 +1,290 @@
+import asyncio
+import logging
+from collections import OrderedDict
+
+from graphql import parse, validate, GraphQLError
+from graphql.error import GraphQLLocatedError
+from graphql.execution import ExecutionResult
+from graphql.execution.base import ResolveInfo
+from graphql.execution.executor import complete_leaf_value, get_default_resolve_type_fn
+from graphql.execution.middleware import MiddlewareManager
+from graphql.execution.utils import ExecutionContext, collect_fields, get_field_def, get_operation_root_type, \
+    default_resolve_fn
+from graphql.pyutils.default_ordered_dict import DefaultOrderedDict
+from graphql.type.definition import (
+    GraphQLEnumType,
+    GraphQLInterfaceType,
+    GraphQLList,
+    GraphQLNonNull,
+    GraphQLObjectType,
+    GraphQLScalarType,
+    GraphQLUnionType,
+    get_nullable_type,
+)
+
+
+logger = logging.getLogger(__name__)
+
+RAW_TYPES = {
+    'Int': int,
+    'Float': float,
+    'String': str,
+    'ID': str,
+    'Boolean': bool,
+}
+PLAIN_TYPES = frozenset([str, int, float, bool, type(None), list, dict, OrderedDict])
+
+
+def is_awaitable(value):
+    """ Cheaper `inspect.isawaitable` for the values resolved from fetched rows """
+    value_type = type(value)
+    if value_type in PLAIN_TYPES:
+        return False
+    return getattr(value_type, '__await__', None) is not None or asyncio.iscoroutine(value)
+
+
+async def gather(result, pending):
+    values = await asyncio.gather(*pending.values())
+    for key, value in zip(pending, values):
+        result[key] = value
+    return result
+
+
+def close_pending(pending):
+    """ Don't leave coroutines of sibling fields never awaited when one of them fails synchronously """
+    for value in pending.values():
+        if asyncio.iscoroutine(value):
+            value.close()
+
+
+class AsyncExecutor(object):
+    """ Executes graphql-core 2 operation awaiting resolvers' coroutines directly.
+
+    Synchronously resolved values are completed in place, coroutines are only created
+    for fields (and their parents) that actually wait for something, so no futures or promises
+    are made for plain attribute access on fetched rows.
+    """
+
+    def __init__(self, exe_context):
+        self.exe_context = exe_context
+        self._fields = {}
+
+    def get_field(self, parent_type, field_name):
+        """ Field definition, its resolver wrapped with middleware
+        and Python type of values returned without serialization (see `skip_serialize` of `PeeweeObjectType`)
+        """
+        key = parent_type, field_name
+        if key not in self._fields:
+            field_def = get_field_def(self.exe_context.schema, parent_type, field_name)
+            resolver = None
+            raw_type = None
+            if field_def:
+                resolver = self.exe_context.get_field_resolver(field_def.resolver or default_resolve_fn)
+                meta = getattr(getattr(parent_type, 'graphene_type', None), '_meta', None)
+                if field_name in getattr(meta, 'raw_fields', ()):
+                    raw_type = RAW_TYPES.get(get_nullable_type(field_def.type).name)
+            self._fields[key] = field_def, resolver, raw_type
+        return self._fields[key]
+
+    def report_error(self, error):
+        self.exe_context.errors.append(error)
+
+    def execute_operation(self, operation, root_value):
+        root_type = get_operation_root_type(self.exe_context.schema, operation)
+        fields = collect_fields(self.exe_context, root_type, operation.selection_set, DefaultOrderedDict(list), set())
+        if operation.operation == 'mutation':
+            return self.execute_fields_serially(root_type, root_value, fields)
+        if operation.operation == 'subscription':
+            raise GraphQLError('Subscriptions are not supported')
+        return self.execute_fields(root_type, root_value, fields, [], None)
+
+    async def execute_fields_serially(self, parent_type, source, fields):
+        result = OrderedDict()
+        for key, field_asts in fields.items():
+            value = self.resolve_field(parent_type, source, field_asts, None, [key])
+            if is_awaitable(value):
+                value = await value
+            result[key] = value
+        return result
+
+    def execute_fields(self, parent_type, source, fields, path, parent_info):
+        result = OrderedDict()
+        pending = OrderedDict()
+        try:
+            for key, field_asts in fields.items():
+                value = self.resolve_field(parent_type, source, field_asts, parent_info, path + [key])
+                if is_awaitable(value):
+                    pending[key] = value
+                    value = None
+                result[key] = value
+        except:
+            close_pending(pending)
+            raise
+        if pending:
+            return gather(result, pending)
+        return result
+
+    def resolve_field(self, parent_type, source, field_asts, parent_info, path):
+        exe_context = self.exe_context
+        field_ast = field_asts[0]
+        field_def, resolve_fn, raw_type = self.get_field(parent_type, field_ast.name.value)
+        if not field_def:
+            return None
+        info = ResolveInfo(
+            field_ast.name.value,
+            field_asts,
+            field_def.type,
+            parent_type,
+            schema=exe_context.schema,
+            fragments=exe_context.fragments,
+            root_value=exe_context.root_value,
+            operation=exe_context.operation,
+            variable_values=exe_context.variable_values,
+            context=exe_context.context_value,
+            path=path,
+        )
+        try:
+            args = exe_context.get_argument_values(field_def, field_ast)
+            result = resolve_fn(source, info, **args)
+            if type(result) is raw_type:
+                return result
+        except Exception as error:
+            logger.exception('An error occurred while resolving field {}.{}'.format(parent_type.name, info.field_name))
+            result = error
+        return self.complete_value_catching_error(field_def.type, field_asts, info, path, result)
+
+    def complete_value_catching_error(self, return_type, field_asts, info, path, result):
+        if isinstance(return_type, GraphQLNonNull):
+            return self.complete_value(return_type, field_asts, info, path, result)
+        try:
+            completed = self.complete_value(return_type, field_asts, info, path, result)
+        except Exception as error:
+            self.report_error(error)
+            return None
+        if is_awaitable(completed):
+            return self.await_catching_error(completed)
+        return completed
+
+    async def await_catching_error(self, completed):
+        try:
+            return await completed
+        except Exception as error:
+            self.report_error(error)
+            return None
+
+    async def await_and_complete(self, return_type, field_asts, info, path, result):
+        try:
+            result = await result
+        except Exception as error:
+            raise GraphQLLocatedError(field_asts, original_error=error, path=path)
+        completed = self.complete_value(return_type, field_asts, info, path, result)
+        if is_awaitable(completed):
+            completed = await completed
+        return completed
+
+    def complete_value(self, return_type, field_asts, info, path, result):
+        if is_awaitable(result):
+            return self.await_and_complete(return_type, field_asts, info, path, result)
+        if isinstance(result, Exception):
+            raise GraphQLLocatedError(field_asts, original_error=result, path=path)
+        if isinstance(return_type, GraphQLNonNull):
+            completed = self.complete_value(return_type.of_type, field_asts, info, path, result)
+            if is_awaitable(completed):
+                return self.check_nonnull(return_type, field_asts, info, path, completed)
+            if completed is None:
+                raise GraphQLError('Cannot return null for non-nullable field {}.{}.'.format(
+                    info.parent_type, info.field_name), field_asts, path=path)
+            return completed
+        if result is None:
+            return None
+        if isinstance(return_type, GraphQLList):
+            return self.complete_list_value(return_type, field_asts, info, path, result)
+        if isinstance(return_type, (GraphQLScalarType, GraphQLEnumType)):
+            return complete_leaf_value(return_type, path, result)
+        if isinstance(return_type, (GraphQLInterfaceType, GraphQLUnionType)):
+            return self.complete_abstract_value(return_type, field_asts, info, path, result)
+        if isinstance(return_type, GraphQLObjectType):
+            return self.complete_object_value(return_type, field_asts, info, path, result)
+        assert False, 'Cannot complete value of unexpected type "{}".'.format(return_type)
+
+    async def check_nonnull(self, return_type, field_asts, info, path, completed):
+        completed = await completed
+        if completed is None:
+            raise GraphQLError('Cannot return null for non-nullable field {}.{}.'.format(
+                info.parent_type, info.field_name), field_asts, path=path)
+        return completed
+
+    def complete_list_value(self, return_type, field_asts, info, path, result):
+        item_type = return_type.of_type
+        completed = []
+        pending = OrderedDict()
+        try:
+            for index, item in enumerate(result):
+                value = self.complete_value_catching_error(item_type, field_asts, info, path + [index], item)
+                if is_awaitable(value):
+                    pending[index] = value
+                    value = None
+                completed.append(value)
+        except:
+            close_pending(pending)
+            raise
+        if pending:
+            return gather(completed, pending)
+        return completed
+
+    def complete_abstract_value(self, return_type, field_asts, info, path, result):
+        if return_type.resolve_type:
+            runtime_type = return_type.resolve_type(result, info)
+        else:
+            runtime_type = get_default_resolve_type_fn(result, info, return_type)
+        if isinstance(runtime_type, str):
+            runtime_type = info.schema.get_type(runtime_type)
+        if not isinstance(runtime_type, GraphQLObjectType):
+            raise GraphQLError(
+                'Abstract type {} must resolve to an Object type at runtime for field {}.{} '
+                'with value "{}", received "{}".'.format(return_type, info.parent_type, info.field_name,
+                                                         result, runtime_type), field_asts)
+        if not info.schema.is_possible_type(return_type, runtime_type):
+            raise GraphQLError('Runtime Object type "{}" is not a possible type for "{}".'.format(
+                runtime_type, return_type), field_asts)
+        return self.complete_object_value(runtime_type, field_asts, info, path, result)
+
+    def complete_object_value(self, return_type, field_asts, info, path, result):
+        if return_type.is_type_of and not return_type.is_type_of(result, info):
+            raise GraphQLError('Expected value of type "{}" but got: {}.'.format(
+                return_type, type(result).__name__), field_asts)
+        fields = self.exe_context.get_sub_fields(return_type, field_asts)
+        return self.execute_fields(return_type, result, fields, path, info)
+
+
+async def execute_async(schema, request_string, root_value=None, context_value=None, variable_values=None,
+                        operation_name=None, middleware=None):
+    """ Execute GraphQL operation natively with asyncio instead of `AsyncioExecutor` and promises::
+
+        result = await execute_async(schema, '{ books { edges { node { id name } } } }')
+
+    Returns `ExecutionResult` just like `schema.execute`.
+    Middleware should return resolver results as is (values or awaitables), without wrapping them in promises.
+    """
+    try:
+        document = parse(request_string)
+    except GraphQLError as error:
+        return ExecutionResult(errors=[error], invalid=True)
+    errors = validate(schema, document)
+    if errors:
+        return ExecutionResult(errors=errors, invalid=True)
+    if middleware and not isinstance(middleware, MiddlewareManager):
+        middleware = MiddlewareManager(*middleware, wrap_in_promise=False)
+    try:
+        exe_context = ExecutionContext(schema, document, root_value, context_value, variable_values or {},
+                                       operation_name, None, middleware, False)
+    except GraphQLError as error:
+        return ExecutionResult(errors=[error], invalid=True)
+    try:
+        data = AsyncExecutor(exe_context).execute_operation(exe_context.operation, root_value)
+        if is_awaitable(data):
+            data = await data
+    except Exception as error:
+        exe_context.errors.append(error)
+        data = None
+    return ExecutionResult(data=data, errors=exe_context.errors or None)
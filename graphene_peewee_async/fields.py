@@ -4,15 +4,46 @@ from graphene import Field, List, ConnectionField, Argument, String, Int, Connec
 from graphene.types.generic import GenericScalar
 from peewee import Query
 
+from .aggregates import AGGREGATE_FIELD, AGGREGATE_QUERY_ATTR, GROUP_BY_ARGUMENT, AggregateRows, \
+    get_aggregate_type, get_connection_fields, get_filtered_query, resolve_aggregate
+from .database import execute, get_read_manager
+from .incremental import get_incremental_request
+from .inputs import get_filter_input, get_order_by_enum, get_distinct_on_enum
+from .merging import get_merged_info, get_merged_result
 from .queries import get_query, TOTAL_FIELD
+from .scheduler import schedule
+from .streaming import get_stream_request
 
 
 FILTERS_FIELD = 'filters'
 ORDER_BY_FIELD = 'order_by'
+DISTINCT_ON_FIELD = 'distinct_on'
 PAGE_FIELD = 'page'
 PAGINATE_BY_FIELD = 'paginate_by'
 
 
+class PaginationError(Exception):
+    pass
+
+
+def get_pagination(args, default_paginate_by=None, max_paginate_by=None, strict=False):
+    """ Get effective `(page, paginate_by)` of connection field arguments.
+    `(None, None)` means an unbounded query.
+    """
+    paginate_by = args.get(PAGINATE_BY_FIELD) or default_paginate_by
+    if not paginate_by:
+        if strict:
+            raise PaginationError('`{}` is required'.format(PAGINATE_BY_FIELD))
+        paginate_by = max_paginate_by
+    if not paginate_by:
+        return None, None
+    if max_paginate_by and paginate_by > max_paginate_by:
+        if strict:
+            raise PaginationError('`{}` must not exceed {}'.format(PAGINATE_BY_FIELD, max_paginate_by))
+        paginate_by = max_paginate_by
+    return args.get(PAGE_FIELD) or 1, paginate_by
+
+
 class PeeweeConnection(Connection):
 
     count = Int()
@@ -29,6 +60,16 @@ class PeeweeConnection(Connection):
             return result
         return 0
 
+    def resolve_aggregate(self, info, **args):
+        return resolve_aggregate(self, info, **args)
+
+    @classmethod
+    def __init_subclass_with_meta__(cls, node=None, **options):
+        if getattr(getattr(node, '_meta', None), 'model', None) is not None and AGGREGATE_FIELD not in vars(cls):
+            setattr(cls, AGGREGATE_FIELD, Field(List(get_aggregate_type(node)),
+                                                **{GROUP_BY_ARGUMENT: Argument(List(String))}))
+        super().__init_subclass_with_meta__(node=node, **options)
+
     class Meta:
         abstract = True
 
@@ -36,6 +77,7 @@ class PeeweeConnection(Connection):
 class PeeweeNodeField(Field):
 
     def __init__(self, type, *args, **kwargs):
+        self.priority = kwargs.pop('priority', 0)
         self.primary_key_name = type._meta.model._meta.primary_key.name
         kwargs.update({
             self.primary_key_name: Int(), # required=True
@@ -51,7 +93,8 @@ class PeeweeNodeField(Field):
         query = resolver(root, info, **args)
         if query is None:
             # filters = args.get(FILTERS_FIELD, {})
-            query = await self._type.get_node(info, args[self.primary_key_name])
+            query = await get_merged_result(info, lambda: schedule(
+                info, self._type.get_node(get_merged_info(info), args[self.primary_key_name]), self.priority))
         return query
 
     def get_resolver(self, parent_resolver):
@@ -60,10 +103,33 @@ class PeeweeNodeField(Field):
 
 class PeeweeConnectionField(ConnectionField):
 
+    # Global pagination settings, could be overridden by field kwargs.
+    # Applied to all connections including backref and mutation ones.
+    default_paginate_by = None
+    max_paginate_by = None
+    strict_pagination = False  # Fail unbounded or too large pages instead of limiting them
+    # Generated `<Node>FilterInput` and `<Node>OrderBy` argument types instead of `GenericScalar` and strings,
+    # with foreign key paths `filter_depth` levels deep
+    typed_filters = False
+    filter_depth = 1
+
     def __init__(self, type, *args, **kwargs):
+        self.priority = kwargs.pop('priority', 0)
+        self.timeout = kwargs.pop('timeout', None)
+        for name in ('default_paginate_by', 'max_paginate_by', 'strict_pagination', 'typed_filters', 'filter_depth'):
+            if name in kwargs:
+                setattr(self, name, kwargs.pop(name))
+        filters_type, order_by_type, distinct_on_type = GenericScalar, String, String
+        if self.typed_filters:
+            node, depth = type._meta.node, self.filter_depth
+            # Types of related nodes are looked up, so input types are made when the schema is built
+            filters_type = lambda: get_filter_input(node, depth)
+            order_by_type = lambda: get_order_by_enum(node, depth)
+            distinct_on_type = lambda: get_distinct_on_enum(node, depth)
         kwargs.update({
-            FILTERS_FIELD: Argument(GenericScalar),
-            ORDER_BY_FIELD: Argument(List(String)),
+            FILTERS_FIELD: Argument(filters_type),
+            ORDER_BY_FIELD: Argument(List(order_by_type)),
+            DISTINCT_ON_FIELD: Argument(List(distinct_on_type)),
             PAGE_FIELD: Argument(Int),
             PAGINATE_BY_FIELD: Argument(Int),
         })
@@ -77,24 +143,89 @@ class PeeweeConnectionField(ConnectionField):
     def manager(self):
         return self.type._meta.node._meta.manager
 
+    @property
+    def read_manager(self):
+        return self.type._meta.node._meta.read_manager
+
+    def get_pagination(self, args):
+        return get_pagination(args, self.default_paginate_by, self.max_paginate_by, self.strict_pagination)
+
     async def query_resolver(self, resolver, root, info, **args):
+        stream_request = get_stream_request(info)
         query = resolver(root, info, **args)
-        if query is None or isinstance(query, Query):
+        fetched = not (query is None or isinstance(query, Query))
+        if stream_request is not None:
+            # Streaming keeps memory flat, so only explicitly requested page is applied
+            page, paginate_by = get_pagination(args)
+        elif fetched:
+            # Mutation results are written already, so their page is limited but never rejected
+            page, paginate_by = get_pagination(args, self.default_paginate_by, self.max_paginate_by)
+        else:
+            page, paginate_by = self.get_pagination(args)
+        if not fetched:
             if query is None:
                 query = self.model
             filters = args.get(FILTERS_FIELD, {})
             order_by = args.get(ORDER_BY_FIELD, [])
-            page = args.get(PAGE_FIELD, None)
-            paginate_by = args.get(PAGINATE_BY_FIELD, None)
-            query = get_query(query, info, filters=filters, order_by=order_by,
-                              page=page, paginate_by=paginate_by)
-            query = (await self.manager.execute(query))
+            distinct_on = args.get(DISTINCT_ON_FIELD, [])
+            incremental = get_incremental_request(info)
+            streamed_edges = incremental and incremental.get_streamed_edges(info)
+            # Streamed rows are fetched by cursor batches, so foreign key objects are always joined to them
+            prefetch = stream_request is None and streamed_edges is None
+            # Aliases with the same arguments are served by a single query selecting all their fields
+            query_info = get_merged_info(info) if prefetch else info
+            aggregate_query = None
+            connection_fields = get_connection_fields(query_info)
+            if AGGREGATE_FIELD in connection_fields:
+                aggregate_query = get_filtered_query(query if isinstance(query, Query) else query.select(), filters,
+                                                     self.type._meta.node._meta.registry)
+                if connection_fields <= {AGGREGATE_FIELD, '__typename'}:
+                    rows = AggregateRows()
+                    setattr(rows, AGGREGATE_QUERY_ATTR, aggregate_query)
+                    return rows
+            query = get_query(query, query_info, filters=filters, order_by=order_by, page=page, paginate_by=paginate_by,
+                              registry=self.type._meta.node._meta.registry, prefetch=prefetch,
+                              distinct_on=distinct_on)
+            manager = await get_read_manager(info, self.type._meta.node._meta)
+            if stream_request is not None:
+                stream_request.set(manager, query, info)
+                return []
+            if streamed_edges is not None:
+                return (await incremental.open_stream(manager, query, info, streamed_edges['initial_count']))
+            query = (await get_merged_result(info, lambda: schedule(
+                info, execute(info, manager, query, self.timeout), self.priority)))
+            if aggregate_query is not None:
+                setattr(query, AGGREGATE_QUERY_ATTR, aggregate_query)
+        elif paginate_by and query is not None:
+            # Already fetched objects (mutation results)
+            objs = list(query)
+            offset = (page - 1) * paginate_by
+            query = objs[offset:offset + paginate_by]
+            for obj in query:
+                setattr(obj, TOTAL_FIELD, len(objs))
         return query
 
     def get_resolver(self, parent_resolver):
         return super().get_resolver(partial(self.query_resolver, parent_resolver))
 
 
+class ComputedField(Field):
+    """ Field of `PeeweeObjectType` computed by SQL expression and selected only when requested::
+
+        class AuthorNode(PeeweeObjectType):
+            book_count = ComputedField(Int, lambda author: (
+                Book.select(fn.COUNT(SQL('*'))).where(Book.author == author.id)
+            ))
+
+    `expression` is called with the model (or its alias) being selected and returns peewee expression,
+    e.g. correlated subquery or `fn` call. Computed fields could be used in `filters` and `order_by` as well.
+    """
+
+    def __init__(self, type, expression, *args, **kwargs):
+        self.expression = expression
+        super(ComputedField, self).__init__(type, *args, **kwargs)
+
+
 class PeeweeListField(Field):
 
     def __init__(self, _type, *args, **kwargs):
@@ -0,0 +1,485 @@
+import asyncio
+
+from graphql import parse, validate, format_error, GraphQLError
+from graphql.execution.executor import (
+    execute_fields,
+    execute_fields_serially,
+    resolve_field,
+    complete_value_catching_error,
+)
+from graphql.execution.executors.asyncio import AsyncioExecutor
+from graphql.execution.middleware import MiddlewareManager
+from graphql.execution.utils import ExecutionContext, collect_fields, get_operation_root_type
+from graphql.execution.values import get_argument_values
+from graphql.pyutils.default_ordered_dict import DefaultOrderedDict
+from graphql.type.definition import (
+    GraphQLArgument,
+    GraphQLList,
+    GraphQLNonNull,
+    GraphQLObjectType,
+    get_named_type,
+    get_nullable_type,
+)
+from graphql.type.directives import GraphQLDirective, DirectiveLocation
+from graphql.type.scalars import GraphQLBoolean, GraphQLString, GraphQLInt
+from graphql_relay.connection.arrayconnection import offset_to_cursor
+from promise import Promise
+
+from .streaming import QueryStream
+from .utils import iter_fields, get_context_value
+
+
+INCREMENTAL_CONTEXT_KEY = 'incremental'
+DEFAULT_STREAM_FETCH_SIZE = 100
+
+
+GraphQLDeferDirective = GraphQLDirective(
+    name='defer',
+    description='Directs the executor to deliver this field in a subsequent payload.',
+    args={
+        'if': GraphQLArgument(GraphQLBoolean, default_value=True),
+        'label': GraphQLArgument(GraphQLString),
+    },
+    locations=[DirectiveLocation.FIELD],
+)
+
+GraphQLStreamDirective = GraphQLDirective(
+    name='stream',
+    description='Directs the executor to deliver list items after `initial_count` ones in subsequent payloads.',
+    args={
+        'if': GraphQLArgument(GraphQLBoolean, default_value=True),
+        'label': GraphQLArgument(GraphQLString),
+        'initial_count': GraphQLArgument(GraphQLInt, default_value=0),
+    },
+    locations=[DirectiveLocation.FIELD],
+)
+
+incremental_directives = [GraphQLDeferDirective, GraphQLStreamDirective]
+
+
+def get_directive_args(directive, field_ast, variables=None):
+    """ Arguments of the directive if it is applied to the field and enabled, `None` otherwise """
+    for ast_directive in field_ast.directives or ():
+        if ast_directive.name.value == directive.name:
+            args = get_argument_values(directive.args, ast_directive.arguments, variables)
+            if args.get('if', True):
+                return args
+    return None
+
+
+def get_incremental_request(info):
+    return get_context_value(info, INCREMENTAL_CONTEXT_KEY)
+
+
+def get_defer_args(field_asts, variables=None):
+    """ `@defer` arguments if every selection of the field is deferred """
+    args = None
+    for field_ast in field_asts:
+        args = get_directive_args(GraphQLDeferDirective, field_ast, variables)
+        if args is None:
+            return None
+    return args
+
+
+class IncrementalExecutionContext(ExecutionContext):
+    """ Leaves `@defer` fields out of the selections executed """
+
+    __slots__ = ()
+
+    def __init__(self, *args, subfields_cache=None):
+        super().__init__(*args)
+        if subfields_cache is not None:
+            self._subfields_cache = subfields_cache
+
+    def get_sub_fields(self, return_type, field_asts):
+        key = return_type, tuple(field_asts)
+        if key not in self._subfields_cache:
+            fields = super().get_sub_fields(return_type, field_asts)
+            self._subfields_cache[key] = omit_deferred(fields, self.variable_values)
+        return self._subfields_cache[key]
+
+
+def omit_deferred(fields, variables):
+    result = DefaultOrderedDict(list)
+    for key, field_asts in fields.items():
+        if get_defer_args(field_asts, variables) is None:
+            result[key] = field_asts
+    return result
+
+
+class DeferredField(object):
+    """ Field of an already resolved object completed after the initial payload """
+
+    def __init__(self, parent_type, source, field_asts, parent_info, field_path, label=None):
+        self.parent_type = parent_type
+        self.source = source
+        self.field_asts = field_asts
+        self.parent_info = parent_info
+        self.field_path = field_path
+        self.label = label
+
+    @property
+    def path(self):
+        return self.field_path[:-1]
+
+    async def run(self, request):
+        exe_context = request.get_execution_context()
+        data = await Promise.resolve(resolve_field(
+            exe_context, self.parent_type, self.source, self.field_asts, self.parent_info, self.field_path))
+        return request.get_payload(exe_context, self, data={self.field_path[-1]: data})
+
+    async def close(self):
+        pass
+
+
+class StreamedItems(object):
+    """ List field items after the initial ones completed in subsequent payloads """
+
+    def __init__(self, info, items, start, label=None, deferred=None):
+        self.info = info
+        self.items = items
+        self.start = start
+        self.label = label
+        self.deferred = deferred
+        return_type = info.return_type
+        if isinstance(return_type, GraphQLNonNull):
+            return_type = return_type.of_type
+        self.item_type = return_type.of_type
+
+    @property
+    def path(self):
+        return self.info.path + [self.start]
+
+    @property
+    def finished(self):
+        return self.items is None
+
+    async def next_batch(self):
+        batch, self.items = self.items or [], None
+        return batch
+
+    async def run(self, request):
+        info = self.info
+        while True:
+            batch = await self.next_batch()
+            if not batch:
+                return None
+            exe_context = request.get_execution_context()
+            items = await Promise.all([
+                complete_value_catching_error(exe_context, self.item_type, info.field_asts, info,
+                                              info.path + [self.start + index], item)
+                for index, item in enumerate(batch)
+            ])
+            payload = request.get_payload(exe_context, self, items=items)
+            if self.deferred:
+                request.defer_fields(info, self.deferred, batch, self.start)
+            self.start += len(batch)
+            if self.finished:
+                return payload
+            request.send(payload)
+
+    async def close(self):
+        pass
+
+
+class StreamedEdges(StreamedItems):
+    """ Connection edges fetched with server-side cursor, every fetched batch is a separate payload """
+
+    def __init__(self, info, rows, start, label=None, deferred=None):
+        super().__init__(info, None, start, label, deferred)
+        self.rows = rows
+        self.edge_type = info.parent_type.graphene_type.Edge
+
+    @property
+    def finished(self):
+        return self.rows.finished
+
+    async def next_batch(self):
+        rows = await self.rows.next_batch()
+        return [self.edge_type(node=row, cursor=offset_to_cursor(self.start + index))
+                for index, row in enumerate(rows)]
+
+    async def close(self):
+        await self.rows.close()
+
+
+class IncrementalMiddleware(object):
+    """ Cuts `@stream` lists to `initial_count` items and registers `@defer` sub-fields of resolved objects,
+    so the rest is delivered later by the `IncrementalRequest`
+    """
+
+    def __init__(self, request):
+        self.request = request
+
+    def resolve(self, next, root, info, **args):
+        result = next(root, info, **args)
+        deferred = self.request.get_deferred_fields(info)
+        stream = get_directive_args(GraphQLStreamDirective, info.field_asts[0], info.variable_values)
+        if stream is not None:
+            result = Promise.resolve(result).then(
+                lambda items: self.request.stream_items(info, items, stream, deferred))
+        if deferred:
+            result = Promise.resolve(result).then(
+                lambda value: self.request.defer_fields(info, deferred, value))
+        return result
+
+
+class IncrementalRequest(object):
+    """ State of an operation executed with `execute_incremental` """
+
+    def __init__(self, schema, document, root_value, context_value, variable_values, operation_name,
+                 executor, middleware, fetch_size):
+        self.schema = schema
+        self.document = document
+        self.root_value = root_value
+        self.context_value = context_value
+        self.variable_values = variable_values
+        self.operation_name = operation_name
+        self.executor = executor
+        self.middleware = MiddlewareManager(IncrementalMiddleware(self), *(middleware or ()))
+        self.fetch_size = fetch_size
+        self.subfields_cache = {}
+        self.collect_context = self.get_execution_context(ExecutionContext)
+        self.streams = {}  # root connection path -> QueryStream opened for its streamed edges
+        self.records = []
+        self.tasks = set()
+        self.running = 0
+        self.queue = asyncio.Queue()
+        self.started = False
+
+    def get_execution_context(self, context_class=None):
+        args = (self.schema, self.document, self.root_value, self.context_value, self.variable_values or {},
+                self.operation_name, self.executor, self.middleware, False)
+        if context_class is not None:
+            return context_class(*args)
+        return IncrementalExecutionContext(*args, subfields_cache=self.subfields_cache)
+
+    def execute_operation(self, exe_context):
+        operation = exe_context.operation
+        root_type = get_operation_root_type(self.schema, operation)
+        fields = collect_fields(exe_context, root_type, operation.selection_set, DefaultOrderedDict(list), set())
+        if operation.operation == 'mutation':
+            # Root mutation fields run serially and are never deferred
+            return execute_fields_serially(exe_context, root_type, self.root_value, [], fields)
+        self.defer_fields(None, self.get_deferred(fields), self.root_value, parent_type=root_type)
+        fields = omit_deferred(fields, exe_context.variable_values)
+        return execute_fields(exe_context, root_type, self.root_value, fields, [], None)
+
+    def get_payload(self, exe_context, record, **result):
+        payload = dict(result, path=record.path)
+        if record.label is not None:
+            payload['label'] = record.label
+        if exe_context.errors:
+            payload['errors'] = [format_error(error) for error in exe_context.errors]
+        return payload
+
+    def get_deferred(self, fields):
+        deferred = []
+        for key, field_asts in fields.items():
+            args = get_defer_args(field_asts, self.collect_context.variable_values)
+            if args is not None:
+                deferred.append((key, field_asts, args.get('label')))
+        return deferred
+
+    def get_deferred_fields(self, info):
+        """ `(response key, field asts, label)` of deferred sub-fields of the field """
+        object_type = get_named_type(info.return_type)
+        if not isinstance(object_type, GraphQLObjectType):
+            return []
+        return self.get_deferred(self.collect_context.get_sub_fields(object_type, info.field_asts))
+
+    def defer_fields(self, info, deferred, value, start=0, parent_type=None):
+        if info is None:
+            sources = [([], value)]  # Root fields
+        elif value is None:
+            return value
+        else:
+            parent_type = get_named_type(info.return_type)
+            if isinstance(get_nullable_type(info.return_type), GraphQLList):
+                sources = [(info.path + [start + index], item) for index, item in enumerate(value)]
+            else:
+                sources = [(info.path, value)]
+        for path, source in sources:
+            if source is None and info is not None:
+                continue
+            for key, field_asts, label in deferred:
+                self.add(DeferredField(parent_type, source, field_asts, info, path + [key], label))
+        return value
+
+    def add(self, record):
+        if self.started:
+            self.start_record(record)
+        else:
+            self.records.append(record)
+
+    def start_record(self, record):
+        self.running += 1
+        task = asyncio.ensure_future(self.run_record(record))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def run_record(self, record):
+        payload = None
+        try:
+            payload = await record.run(self)
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            payload = {'path': record.path, 'errors': [format_error(error)]}
+        finally:
+            await record.close()
+            self.queue.put_nowait((payload, True))
+
+    def send(self, payload):
+        self.queue.put_nowait((payload, False))
+
+    async def get_next(self):
+        """ Next payload and if more are expected """
+        while self.running:
+            payload, done = await self.queue.get()
+            if done:
+                self.running -= 1
+            if payload is not None or not self.running:
+                return payload, bool(self.running)
+        raise StopAsyncIteration
+
+    def get_streamed_edges(self, info):
+        """ `@stream` arguments of the `edges` selection of a root connection field """
+        if info.path is None or len(info.path) != 1:
+            return None
+        for field_ast in info.field_asts:
+            for edges_ast in iter_fields(field_ast.selection_set.selections, info.fragments, info.variable_values):
+                if edges_ast.name.value == 'edges':
+                    stream = get_directive_args(GraphQLStreamDirective, edges_ast, info.variable_values)
+                    if stream is not None:
+                        return stream
+        return None
+
+    async def open_stream(self, manager, query, info, initial_count):
+        """ Fetch `initial_count` rows with server-side cursor leaving the rest for the streamed edges """
+        rows = QueryStream(manager, query, self.fetch_size)
+        result = []
+        try:
+            while len(result) < initial_count:
+                result.append(await rows.__anext__())
+        except StopAsyncIteration:
+            pass
+        except:
+            await rows.close(commit=False)
+            raise
+        self.streams[tuple(info.path)] = rows
+        return result
+
+    def stream_items(self, info, items, stream, deferred=None):
+        if items is None:
+            return None
+        label = stream.get('label')
+        rows = self.streams.pop(tuple(info.path[:-1]), None)
+        if rows is not None:
+            self.add(StreamedEdges(info, rows, len(items), label, deferred))
+            return items
+        items = list(items)
+        initial_count = max(stream.get('initial_count') or 0, 0)
+        if len(items) > initial_count:
+            self.add(StreamedItems(info, items[initial_count:], initial_count, label, deferred))
+        return items[:initial_count]
+
+    async def start(self):
+        self.started = True
+        # Streams opened for edges which were not resolved (errors)
+        for rows in self.streams.values():
+            await rows.close()
+        self.streams.clear()
+        records, self.records = self.records, []
+        for record in records:
+            self.start_record(record)
+
+    async def close(self):
+        for task in list(self.tasks):
+            task.cancel()
+        for rows in self.streams.values():
+            await rows.close(commit=False)
+        self.streams.clear()
+
+
+class IncrementalResult(object):
+    """ Async iterator of an operation's payloads: the initial one with `data`,
+    then ones with `incremental` results of deferred fields and streamed items, all having `hasNext`
+    """
+
+    def __init__(self, request, initial):
+        self.request = request
+        self.initial = initial
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.initial is not None:
+            payload, self.initial = self.initial, None
+            if self.request is not None:
+                await self.request.start()
+            payload['hasNext'] = bool(self.request and self.request.running)
+            return payload
+        if self.request is None:
+            raise StopAsyncIteration
+        payload, has_next = await self.request.get_next()
+        result = {'hasNext': has_next}
+        if payload is not None:
+            result['incremental'] = [payload]
+        return result
+
+    async def aclose(self):
+        self.initial = None
+        if self.request is not None:
+            await self.request.close()
+            self.request = None
+
+
+async def execute_incremental(schema, request_string, root_value=None, context_value=None, variable_values=None,
+                              operation_name=None, executor=None, middleware=None,
+                              fetch_size=DEFAULT_STREAM_FETCH_SIZE):
+    """ Execute GraphQL query delivering `@defer` fields and `@stream` list items in subsequent payloads.
+
+    Schema must declare the directives::
+
+        schema = Schema(query=Query, directives=specified_directives + incremental_directives)
+
+        result = await execute_incremental(schema, '''{
+            books { edges @stream(initial_count: 10) { node { id author @defer { name } } } }
+        }''')
+        async for payload in result:
+            response.write(json.dumps(payload))
+
+    Deferred fields are `null` in the initial payload and are resolved concurrently once it is built.
+    `edges` of a root connection field are fetched with server-side cursor, sending each fetched batch
+    (`fetch_size` rows) as soon as it arrives; other streamed lists are cut after `initial_count` items
+    and the rest is sent at once.
+    """
+    document = parse(request_string)
+    errors = validate(schema, document)
+    if errors:
+        return IncrementalResult(None, {'errors': [format_error(error) for error in errors]})
+    if context_value is None:
+        context_value = {}
+    if executor is None:
+        executor = AsyncioExecutor()
+    request = IncrementalRequest(schema, document, root_value, context_value, variable_values, operation_name,
+                                 executor, middleware, fetch_size)
+    if isinstance(context_value, dict):
+        context_value[INCREMENTAL_CONTEXT_KEY] = request
+    else:
+        setattr(context_value, INCREMENTAL_CONTEXT_KEY, request)
+    try:
+        exe_context = request.get_execution_context()
+    except GraphQLError as error:
+        return IncrementalResult(None, {'errors': [format_error(error)]})
+    try:
+        data = await Promise.resolve(request.execute_operation(exe_context))
+    except Exception as error:
+        exe_context.errors.append(error)
+        data = None
+    payload = {'data': data}
+    if exe_context.errors:
+        payload['errors'] = [format_error(error) for error in exe_context.errors]
+    return IncrementalResult(request, payload)
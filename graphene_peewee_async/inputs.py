@@ -0,0 +1,124 @@
+from collections import OrderedDict
+
+from graphene import Enum, InputObjectType, InputField, List, String
+from graphene.types.generic import GenericScalar
+from peewee import (
+    ForeignKeyField, CharField, TextField, IntegerField, FloatField, DecimalField, DateField, DateTimeField, TimeField
+)
+from playhouse.postgres_ext import ArrayField, BinaryJSONField, JSONField, TSVectorField
+
+from .aggregates import get_column_type
+from .queries import MODELS_DELIMITER, DESC_ORDER_CHAR, SEARCH_LOOKUP, RANK_LOOKUP, ARRAY_LOOKUPS
+from .utils import get_generated_type
+
+
+COMPARISON_LOOKUPS = ('lt', 'lte', 'gt', 'gte')
+TEXT_LOOKUPS = ('like', 'ilike', 'regexp', SEARCH_LOOKUP)
+TEXT_FIELDS = (CharField, TextField)
+COMPARABLE_FIELDS = TEXT_FIELDS + (IntegerField, FloatField, DecimalField, DateField, DateTimeField, TimeField)
+
+
+def get_key(*pieces):
+    return MODELS_DELIMITER.join(piece for piece in pieces if piece)
+
+
+def get_lookup_types(node, field):
+    """ Lookup names of the column with their value types, `''` is equality """
+    if isinstance(field, TSVectorField):
+        return [(SEARCH_LOOKUP, String)]
+    _type = get_column_type(node, field.name)
+    if isinstance(field, ForeignKeyField):
+        return [('', _type), ('ne', _type), ('in', List(_type))]
+    if isinstance(field, ArrayField):
+        return [('', _type)] + [(lookup, _type) for lookup in ARRAY_LOOKUPS]
+    if isinstance(field, BinaryJSONField):
+        return [('contains', GenericScalar), ('contained_by', GenericScalar), ('has_key', String),
+                ('has_any_keys', List(String)), ('has_keys', List(String))]
+    if isinstance(field, JSONField):  # Only paths inside could be filtered by, these are not typed
+        return []
+    lookups = [('', _type), ('ne', _type), ('in', List(_type))]
+    if isinstance(field, COMPARABLE_FIELDS):
+        lookups += [(lookup, _type) for lookup in COMPARISON_LOOKUPS]
+    if isinstance(field, TEXT_FIELDS):
+        lookups += [(lookup, _type) for lookup in TEXT_LOOKUPS]
+    return lookups
+
+
+def get_computed_lookup_types(node, name):
+    _type = get_column_type(node, name)
+    lookups = [('', _type), ('ne', _type), ('in', List(_type))] + [(lookup, _type) for lookup in COMPARISON_LOOKUPS]
+    if _type is String:
+        lookups += [(lookup, _type) for lookup in TEXT_LOOKUPS]
+    return lookups
+
+
+def iter_paths(node, depth, prefix='', backrefs=False):
+    """ Node of each column with its path, foreign keys (and `backrefs`, for filters) are followed `depth` levels deep """
+    registry = node._meta.registry
+    model = node._meta.model
+    for field in model._meta.sorted_fields:
+        yield node, field, get_key(prefix, field.name)
+        rel_node = isinstance(field, ForeignKeyField) and registry.get_type_for_model(field.rel_model)
+        if rel_node and depth > 0:
+            yield from iter_paths(rel_node, depth - 1, get_key(prefix, field.name), backrefs)
+    if backrefs and depth > 0:
+        for backref_field in model._meta.backrefs:
+            rel_node = backref_field.backref != '+' and registry.get_type_for_model(backref_field.model)
+            if rel_node:
+                yield from iter_paths(rel_node, depth - 1, get_key(prefix, backref_field.backref), backrefs)
+
+
+def get_type_name(node, depth, suffix):
+    return '{}{}{}'.format(node._meta.name, 'Depth{}'.format(depth) if depth != 1 else '', suffix)
+
+
+def get_filter_input(node, depth=1):
+    """ Input type of connection `filters` with a field for every lookup key, e.g. `author__name__ilike`
+    or `book_set__year__gte`, so unknown keys and values of wrong types are rejected by validation
+    """
+    return get_generated_type(node, ('FilterInput', depth), lambda: generate_filter_input(node, depth))
+
+
+def generate_filter_input(node, depth):
+    fields = OrderedDict()
+    for name in node._meta.computed_fields:
+        for lookup, _type in get_computed_lookup_types(node, name):
+            key = get_key(name, lookup)
+            fields[key] = InputField(_type, name=key)
+    for path_node, field, path in iter_paths(node, depth, backrefs=True):
+        for lookup, _type in get_lookup_types(path_node, field):
+            key = get_key(path, lookup)
+            fields[key] = InputField(_type, name=key)  # Not camel cased, keys are the same as for `GenericScalar`
+    return type(get_type_name(node, depth, 'FilterInput'), (InputObjectType,), fields)
+
+
+def get_order_paths(node, depth, rank=True):
+    paths = list(node._meta.computed_fields)
+    for path_node, field, path in iter_paths(node, depth):
+        if not isinstance(field, (ArrayField, JSONField, TSVectorField)):
+            paths.append(path)
+        if rank and isinstance(field, TEXT_FIELDS + (TSVectorField,)):
+            paths.append(get_key(path, RANK_LOOKUP))
+    return paths
+
+
+def get_order_by_enum(node, depth=1):
+    """ Enum of connection `order_by` items: `<path>_asc` and `<path>_desc` values are `<path>` and `-<path>` """
+    return get_generated_type(node, ('OrderBy', depth), lambda: generate_order_by_enum(node, depth))
+
+
+def generate_order_by_enum(node, depth):
+    paths = get_order_paths(node, depth)
+    values = []
+    for path in paths:
+        values.append(('{}_asc'.format(path), path))
+        values.append(('{}_desc'.format(path), DESC_ORDER_CHAR + path))
+    return Enum(get_type_name(node, depth, 'OrderBy'), values)
+
+
+def get_distinct_on_enum(node, depth=1):
+    """ Enum of connection `distinct_on` items: the same paths as of `order_by` without direction and rank """
+    return get_generated_type(node, ('DistinctOn', depth), lambda: Enum(
+        get_type_name(node, depth, 'DistinctOn'),
+        [(path, path) for path in get_order_paths(node, depth, rank=False)]
+    ))
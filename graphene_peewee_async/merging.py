@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+from graphql.execution.base import ResolveInfo
+from graphql.execution.values import get_argument_values
+
+from .utils import iter_fields, merge_field_asts, get_context_value, set_context_value
+
+
+MERGED_RESULTS_CONTEXT_KEY = 'merged_results'
+
+
+def get_arguments_key(info, field_ast):
+    field_def = info.parent_type.fields[info.field_name]
+    arguments = get_argument_values(field_def.args, field_ast.arguments, info.variable_values)
+    return json.dumps(arguments, sort_keys=True, default=str)
+
+
+def is_mergeable(info):
+    """ Root fields of a query could be merged: they are resolved from the same source by the same arguments """
+    return len(info.path) == 1 and info.operation.operation == 'query'
+
+
+def get_sibling_field_asts(info):
+    """ Field nodes of the resolved field and, for root fields, of its aliases having the same arguments """
+    if not is_mergeable(info):
+        return info.field_asts
+    key = get_arguments_key(info, info.field_asts[0])
+    return [field_ast
+            for field_ast in iter_fields(info.operation.selection_set.selections, info.fragments, info.variable_values)
+            if field_ast.name.value == info.field_name and get_arguments_key(info, field_ast) == key]
+
+
+def get_merged_info(info):
+    """ Resolve info of the field whose selection includes all its merged field nodes, to build a single query """
+    field_asts = get_sibling_field_asts(info)
+    if len(field_asts) == 1:
+        return info
+    return ResolveInfo(
+        info.field_name,
+        [merge_field_asts(field_asts, info.fragments, info.variable_values)],
+        info.return_type,
+        info.parent_type,
+        schema=info.schema,
+        fragments=info.fragments,
+        root_value=info.root_value,
+        operation=info.operation,
+        variable_values=info.variable_values,
+        context=info.context,
+        path=info.path,
+    )
+
+
+async def get_merged_result(info, get_result):
+    """ Await `get_result()` once for all aliases of the root field having the same arguments::
+
+        rows = await get_merged_result(info, lambda: execute(info, manager, query))
+
+    Results are shared through the context, so without one every alias is still resolved by its own query.
+    They are kept for the current operation only, a context reused by later operations doesn't return stale rows.
+    """
+    if not is_mergeable(info):
+        return (await get_result())
+    operation, results = get_context_value(info, MERGED_RESULTS_CONTEXT_KEY, (None, None))
+    if operation is not info.operation:
+        results = {}
+        set_context_value(info, MERGED_RESULTS_CONTEXT_KEY, (info.operation, results))
+    key = info.field_name, get_arguments_key(info, info.field_asts[0])
+    if key not in results:
+        results[key] = asyncio.ensure_future(get_result())
+    return (await results[key])
@@ -1,15 +1,15 @@
 from peewee_async import _execute_query_async
-from peewee import ForeignKeyField, SQL, NodeList
 from playhouse.shortcuts import model_to_dict
-from graphene import Int, Dynamic, NonNull
+from graphene import Argument, Int, Dynamic, NonNull
 from graphene.types.generic import GenericScalar
 
+from .database import execute
 from .queries import filter
 from .fields import PeeweeNodeField, PeeweeConnectionField
 from .types import PeeweeMutation
+from .utils import get_generated_type
 
 
-DELIM = '__'
 FILTERS_FIELD = 'filters'
 DATA_FIELD = 'data'
 RELATED_FIELD = 'related'
@@ -46,37 +46,9 @@ def filter_query(query, filters):
     return query
 
 
-def is_filter_deep(model, filter_key):
-    if DELIM in filter_key:
-        outer_field, inner_field = filter_key.split(DELIM, 1)
-        field = getattr(model, outer_field, None)
-        if field is not None and isinstance(field, ForeignKeyField):
-            if getattr(field.rel_model, inner_field.split(DELIM, 1)[0], None):
-                return True
-    return False
-
-
 def filter_query_with_subqueries(query, filters):
-    """ For queries that does not support joining """
-    plain_filters = {}
-    subquery_filters = {}
-    model = query.model
-    filters = prepare_filters(query, filters)
-    for key, val in filters.items():
-        if is_filter_deep(model, key):
-            join_field, join_filter_key = key.split(DELIM, 1)
-            subquery_filters.setdefault(join_field, {}).update({join_filter_key: val})
-        else:
-            plain_filters[key] = val
-    query = filter_query(query, plain_filters)
-    for key, val in subquery_filters.items():
-        field = getattr(model, key)
-        rel_model = field.rel_model
-        query = query.where(NodeList([
-            SQL('EXISTS'),
-            rel_model.select(SQL('1')).filter(**val).where(field == rel_model._meta.primary_key)
-        ]))
-    return query
+    """ For queries that does not support joining: lookups through foreign keys are checked by `EXISTS` subqueries """
+    return filter_query(query, prepare_filters(query, filters))
 
 
 def arguments_from_fields(fields, model):
@@ -89,13 +61,19 @@ def arguments_from_fields(fields, model):
             else:
                 arg = Int().Argument()
         elif isinstance(field.type, NonNull):
-            arg = field.type.of_type().Argument()
+            arg = Argument(field.type.of_type)
         else:
-            arg = field.type().Argument() # TODO: get rid of strange `NotNull is not callable` warning
+            arg = Argument(field.type)  # Structures (e.g. `List` of array field) are instances, not classes
         arguments[name] = arg
     return arguments
 
 
+def get_node_arguments(node_class):
+    """ Arguments made of node fields, converted once for create and update mutations of the node """
+    return get_generated_type(node_class, 'Arguments',
+                              lambda: arguments_from_fields(node_class._meta.fields, node_class._meta.model))
+
+
 def split_data(model, data):
     plain_data = {}
     related_data = {}
@@ -108,10 +86,11 @@ def split_data(model, data):
 class BaseMutation(PeeweeMutation):
 
     @classmethod
-    def generate(cls, node_class, connection_class, arguments={}, returns={}):
+    def generate(cls, node_class, connection_class, arguments={}, returns={}, timeout=None):
         args_class = type('Arguments', (), arguments)
         meta_class = type('Meta', (), {'model': node_class._meta.model,
-                                       'manager': node_class._meta.manager})
+                                       'manager': node_class._meta.manager,
+                                       'timeout': timeout})
         attrs = {meta_class.__name__: meta_class,
                  args_class.__name__: args_class}
         attrs.update(returns)
@@ -184,12 +163,12 @@ class BaseMutation(PeeweeMutation):
 class CreateOneMutation(BaseMutation):
 
     @classmethod
-    def generate(cls, node_class, connection_class, arguments={}, returns={}):
-        args = arguments_from_fields(node_class._meta.fields, node_class._meta.model)
+    def generate(cls, node_class, connection_class, arguments={}, returns={}, timeout=None):
+        args = dict(get_node_arguments(node_class))
         args.update(arguments)
         attrs = {AFFECTED_FIELD: PeeweeNodeField(node_class)}
         attrs.update(returns)
-        return super().generate(node_class, connection_class, args, attrs)
+        return super().generate(node_class, connection_class, args, attrs, timeout)
 
     @classmethod
     async def mutate(cls, instance, info, **args):
@@ -207,12 +186,12 @@ class CreateOneMutation(BaseMutation):
 class CreateManyMutation(BaseMutation):
 
     @classmethod
-    def generate(cls, node_class, connection_class, arguments={}, returns={}):
+    def generate(cls, node_class, connection_class, arguments={}, returns={}, timeout=None):
         args = {DATA_FIELD: GenericScalar()}
         args.update(arguments)
         attrs = {AFFECTED_FIELD: PeeweeConnectionField(connection_class)}
         attrs.update(returns)
-        return super().generate(node_class, connection_class, args, attrs)
+        return super().generate(node_class, connection_class, args, attrs, timeout)
 
     @classmethod
     async def last_insert_id_async(cls, cursor):
@@ -253,12 +232,12 @@ class CreateManyMutation(BaseMutation):
 class UpdateOneMutation(BaseMutation):
 
     @classmethod
-    def generate(cls, node_class, connection_class, arguments={}, returns={}):
-        args = arguments_from_fields(node_class._meta.fields, node_class._meta.model)
+    def generate(cls, node_class, connection_class, arguments={}, returns={}, timeout=None):
+        args = dict(get_node_arguments(node_class))
         args.update(arguments)
         attrs = {AFFECTED_FIELD: PeeweeNodeField(node_class)}
         attrs.update(returns)
-        return super().generate(node_class, connection_class, args, attrs)
+        return super().generate(node_class, connection_class, args, attrs, timeout)
 
     @classmethod
     async def mutate(cls, instance, info, **args):
@@ -271,7 +250,7 @@ class UpdateOneMutation(BaseMutation):
         if plain_data:
             query = model.update(**plain_data)
             query = filter_query_with_subqueries(query, pk_value)
-            await manager.execute(query)
+            await execute(info, manager, query, cls._meta.timeout)
         # TODO: check if it is requested
         obj = await manager.get(model, **{pk_field.name: pk_value})
         await cls.set_related([obj], related_data)
@@ -284,12 +263,12 @@ class UpdateOneMutation(BaseMutation):
 class UpdateManyMutation(BaseMutation):
 
     @classmethod
-    def generate(cls, node_class, connection_class, arguments={}, returns={}):
+    def generate(cls, node_class, connection_class, arguments={}, returns={}, timeout=None):
         args = {FILTERS_FIELD: GenericScalar(), DATA_FIELD: GenericScalar()}
         args.update(arguments)
         attrs = {AFFECTED_FIELD: PeeweeConnectionField(connection_class)}
         attrs.update(returns)
-        return super().generate(node_class, connection_class, args, attrs)
+        return super().generate(node_class, connection_class, args, attrs, timeout)
 
     @classmethod
     async def mutate(cls, instance, info, **args):
@@ -301,12 +280,12 @@ class UpdateManyMutation(BaseMutation):
         if plain_data:
             query = model.update(**plain_data)
             query = filter_query_with_subqueries(query, filters)
-            await manager.execute(query)
+            await execute(info, manager, query, cls._meta.timeout)
         # FIXME: After update select results could be different cause changed data could interfere with filters
         # TODO: check if it is requested
-        select_query = model.select()
+        select_query = model.select().order_by(model._meta.primary_key)  # Updated rows move around the heap
         select_query = filter(select_query, filters)
-        result = await manager.execute(select_query)
+        result = await execute(info, manager, select_query, cls._meta.timeout)
         await cls.set_related(result, related_data)
         # TODO: Seems like list conversion was fixed in peewee>=0.5.10, check it out
         return cls(**{AFFECTED_FIELD: result})
@@ -318,13 +297,13 @@ class UpdateManyMutation(BaseMutation):
 class DeleteOneMutation(BaseMutation):
 
     @classmethod
-    def generate(cls, node_class, connection_class, arguments={}, returns={}):
+    def generate(cls, node_class, connection_class, arguments={}, returns={}, timeout=None):
         pk_field_name = node_class._meta.model._meta.primary_key.name
         args = {pk_field_name: node_class._meta.fields[pk_field_name].type.Argument()}
         args.update(arguments)
         attrs = {AFFECTED_FIELD: PeeweeNodeField(node_class)}
         attrs.update(returns)
-        return super().generate(node_class, connection_class, args, attrs)
+        return super().generate(node_class, connection_class, args, attrs, timeout)
 
     @classmethod
     async def mutate(cls, instance, info, **args):
@@ -335,7 +314,7 @@ class DeleteOneMutation(BaseMutation):
         assert pk_value is not None
         query = model.delete()
         query = filter_query_with_subqueries(query, pk_value)
-        await manager.execute(query)
+        await execute(info, manager, query, cls._meta.timeout)
         return cls(**{AFFECTED_FIELD: model(**{pk_field.name: pk_value})})
 
     class Meta:
@@ -345,12 +324,12 @@ class DeleteOneMutation(BaseMutation):
 class DeleteManyMutation(BaseMutation):
 
     @classmethod
-    def generate(cls, node_class, connection_class, arguments={}, returns={}):
+    def generate(cls, node_class, connection_class, arguments={}, returns={}, timeout=None):
         args = {FILTERS_FIELD: GenericScalar()}
         args.update(arguments)
         attrs = {AFFECTED_FIELD: PeeweeConnectionField(connection_class)}
         attrs.update(returns)
-        return super().generate(node_class, connection_class, args, attrs)
+        return super().generate(node_class, connection_class, args, attrs, timeout)
 
     @classmethod
     async def mutate(cls, instance, info, **args):
@@ -360,7 +339,7 @@ class DeleteManyMutation(BaseMutation):
         query = model.delete()
         query = filter_query_with_subqueries(query, filters)
         # TODO: Add .returning() when it will be supported
-        total = await manager.execute(query)
+        total = await execute(info, manager, query, cls._meta.timeout)
         return cls(**{AFFECTED_FIELD: [model() for _ in range(total)]})
 
     class Meta:
@@ -370,7 +349,7 @@ class DeleteManyMutation(BaseMutation):
 class CloneOneMutation(BaseMutation):
 
     @classmethod
-    def generate(cls, node_class, connection_class, arguments={}, returns={}):
+    def generate(cls, node_class, connection_class, arguments={}, returns={}, timeout=None):
         pk_field_name = node_class._meta.model._meta.primary_key.name
         args = {pk_field_name: node_class._meta.fields[pk_field_name].type.Argument(),
                 RELATED_FIELD: GenericScalar(),
@@ -378,7 +357,7 @@ class CloneOneMutation(BaseMutation):
         args.update(arguments)
         attrs = {AFFECTED_FIELD: PeeweeNodeField(node_class)}
         attrs.update(returns)
-        return super().generate(node_class, connection_class, args, attrs)
+        return super().generate(node_class, connection_class, args, attrs, timeout)
 
     @classmethod
     async def mutate(cls, instance, info, **args):
@@ -0,0 +1,146 @@
+import itertools
+import re
+import time
+import weakref
+from collections import OrderedDict
+
+from peewee import Select, Update, Delete, DatabaseError, __exception_wrapper__
+from peewee_async import Manager
+
+from .database import fetch_all
+
+
+PLACEHOLDER_RE = re.compile(r'%%|%s')
+STATEMENT_NAME_PREFIX = 'gpa_'
+
+
+def to_prepared_sql(sql):
+    """ Convert peewee's `%s` placeholders to Postgres `$1`, `$2`, ... ones """
+    counter = itertools.count(1)
+    return PLACEHOLDER_RE.sub(lambda m: '%' if m.group() == '%%' else '${}'.format(next(counter)), sql)
+
+
+class StatementStats(object):
+
+    def __init__(self):
+        self.plain_count = 0
+        self.plain_time = 0
+        self.prepared_count = 0
+        self.prepared_time = 0
+        self.disabled = False
+
+    def add(self, prepared, duration):
+        if prepared:
+            self.prepared_count += 1
+            self.prepared_time += duration
+        else:
+            self.plain_count += 1
+            self.plain_time += duration
+
+
+class PreparedStatementManager(Manager):
+    """ Manager executing hot select, update and delete queries as server-side prepared statements.
+
+    Every query shape (SQL text with placeholders) runs plain for the first `prepare_after` times.
+    After that it is prepared once per pooled connection and then run with `EXECUTE`.
+    Each connection keeps at most `statement_cache_size` statements and deallocates the
+    least recently used one. When the shape's prepared (generic) plan turns out
+    `generic_plan_slowdown` times slower than its plain runs after `generic_plan_check` executions,
+    the shape stops being prepared.
+    Queries inside of transactions are always run plain.
+    """
+
+    statement_cache_size = 100
+    prepare_after = 2
+    generic_plan_check = 5
+    generic_plan_slowdown = 1.5
+
+    def __init__(self, database=None, **kwargs):
+        super().__init__(database, **kwargs)
+        self.stats = OrderedDict()
+        self.statements = weakref.WeakKeyDictionary()  # connection -> OrderedDict(sql -> name)
+        self._names = itertools.count()
+
+    def get_stats(self, sql):
+        stats = self.stats.pop(sql, None) or StatementStats()
+        self.stats[sql] = stats
+        # Keep stats for more shapes than prepared ones to see which shapes are hot
+        while len(self.stats) > self.statement_cache_size * 10:
+            self.stats.popitem(last=False)
+        return stats
+
+    def should_prepare(self, stats):
+        return not stats.disabled and stats.plain_count >= self.prepare_after
+
+    def check_generic_plan(self, stats):
+        if stats.prepared_count == self.generic_plan_check and stats.plain_count:
+            prepared_avg = stats.prepared_time / stats.prepared_count
+            plain_avg = stats.plain_time / stats.plain_count
+            if prepared_avg > plain_avg * self.generic_plan_slowdown:
+                stats.disabled = True
+
+    async def run(self, connection, sql, params=None):
+        cursor = await connection.cursor()
+        try:
+            with __exception_wrapper__:
+                await cursor.execute(sql, params)
+        except:
+            cursor.close()
+            raise
+        return cursor
+
+    async def prepare(self, connection, sql):
+        statements = self.statements.setdefault(connection, OrderedDict())
+        name = statements.pop(sql, None)
+        if name is None:
+            name = '{}{}'.format(STATEMENT_NAME_PREFIX, next(self._names))
+            (await self.run(connection, 'PREPARE {} AS {}'.format(name, to_prepared_sql(sql)))).close()
+            while len(statements) >= self.statement_cache_size:
+                _, old_name = statements.popitem(last=False)
+                (await self.run(connection, 'DEALLOCATE {}'.format(old_name))).close()
+        statements[sql] = name
+        return name
+
+    async def execute_on(self, connection, query, sql, params, stats):
+        prepared = self.should_prepare(stats)
+        if prepared:
+            try:
+                name = await self.prepare(connection, sql)
+            except DatabaseError:
+                # Parameter types could not be inferred or similar, don't try anymore
+                stats.disabled = True
+                prepared = False
+        started = time.monotonic()
+        if prepared:
+            placeholders = ', '.join(['%s'] * len(params))
+            execute_sql = 'EXECUTE {}'.format(name) + (' ({})'.format(placeholders) if params else '')
+            cursor = await self.run(connection, execute_sql, params)
+        else:
+            cursor = await self.run(connection, sql, params)
+        try:
+            if isinstance(query, Select):
+                result = await fetch_all(cursor, query)
+            else:
+                result = cursor.rowcount
+        finally:
+            cursor.close()
+        stats.add(prepared, time.monotonic() - started)
+        if prepared:
+            self.check_generic_plan(stats)
+        return result
+
+    async def execute(self, query):
+        query = self._swap_database(query)
+        if (not isinstance(query, (Select, Update, Delete)) or
+                not isinstance(query, Select) and query._returning or
+                self.database.transaction_depth_async() > 0):
+            return (await super().execute(query))
+        await self.connect()
+        sql, params = query.sql()
+        stats = self.get_stats(sql)
+        pool = self.database._async_conn
+        connection = await pool.acquire()
+        try:
+            return (await self.execute_on(connection, query, sql, params, stats))
+        finally:
+            pool.release(connection)
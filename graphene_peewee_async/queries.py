@@ -1,20 +1,41 @@
 import operator
-from collections import deque
-from functools import reduce
+from functools import reduce, lru_cache
 
 from peewee import (
-    fn, SQL, NodeList, Node, DQ, Expression, ForeignKeyField, FieldAlias, BackrefAccessor,
+    fn, SQL, NodeList, Expression, Field, Desc, ForeignKeyField, FieldAlias, BackrefAccessor,
     OP, DJANGO_MAP, ModelAlias, JOIN, Model, ModelBase, IntegerField, CharField,
-    Query, Join
+    Query, Join, ModelSelect, Value, Select
 )
+from playhouse.postgres_ext import TSVectorField, ArrayField, ArrayValue, JSONField, BinaryJSONField, JsonLookup, Json
 from graphene.utils.str_converters import to_snake_case
 
-from .utils import get_requested_models, get_field_from_selections
+from .utils import get_requested_models, get_field_from_selections, get_computed_fields, merge_selections
 
 
 TOTAL_FIELD = '__total__'
 MODELS_DELIMITER = '__'
 DESC_ORDER_CHAR = '-'
+SEARCH_LOOKUP = 'search'  # `name__search: "foo -bar"`, web search syntax
+RANK_LOOKUP = 'rank'  # `order_by: ["-name__rank"]`, relevance to the `name__search` filter
+SEARCH_CONFIG = 'english'  # Text search configuration, must be the same as in expression indexes
+# Operators of array and JSONB columns supported by GIN indexes
+ARRAY_LOOKUPS = {'contains': '@>', 'contained_by': '<@', 'overlap': '&&'}
+JSONB_LOOKUPS = {'contains': '@>', 'contained_by': '<@', 'has_key': '?', 'has_any_keys': '?|', 'has_keys': '?&'}
+CONTAINER_LOOKUPS = frozenset(ARRAY_LOOKUPS) | frozenset(JSONB_LOOKUPS)
+LOOKUP_CACHE_SIZE = 10000  # Compiled filter keys and order items, shared by all models
+PREFETCH_MIN_BYTES = 64 * 1024  # Joined columns of all rows above this size are prefetched if `auto_prefetch` is set
+UNPAGINATED_ROWS = 1000  # Rows expected from unpaginated query
+WIDE_FIELD_TYPES = frozenset(['TEXT', 'BLOB', 'JSON', 'JSONB'])
+WIDE_COLUMN_WIDTH = 1024  # Expected bytes of unbounded text, blob and JSON values
+COLUMN_WIDTH = 8
+
+
+class FilterError(Exception):
+    pass
+
+
+class PrefetchError(Exception):
+    pass
 
 
 def get_field(model, full_name, alias_map={}):
@@ -40,68 +61,168 @@ def ensure_join(query, lm, rm, on=None, **join_kwargs):
     return query.switch(lm).join(rm, on=on, **join_kwargs).switch(ctx)
 
 
-def convert_dict_to_node(query, qdict, alias_map={}):
+def get_model(model):
+    return model.model if isinstance(model, ModelAlias) else model
+
+
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
+def compile_filter_key(model, key, is_null, computed=frozenset(), joins=True):
+    """ Attribute names of the filter key path, each with a flag if it's a relationship to be joined
+    (`None` for keys inside a JSON column), the operator and, for lookups through a backref,
+    the rest of the key to filter related rows by (path ends with the backref then and there is no operator).
+    Without `joins` (update and delete queries) foreign keys are crossed like backrefs.
+    `computed` are names of computed fields of the model, which could be only the first piece of the path.
+    """
+    relationship = (ForeignKeyField, BackrefAccessor)
+    pieces = key.split(MODELS_DELIMITER)
+    if MODELS_DELIMITER in key and key.rsplit(MODELS_DELIMITER, 1)[1] in DJANGO_MAP:
+        key, op = key.rsplit(MODELS_DELIMITER, 1)
+        op = DJANGO_MAP[op]
+    elif MODELS_DELIMITER in key and key.rsplit(MODELS_DELIMITER, 1)[1] in CONTAINER_LOOKUPS | {SEARCH_LOOKUP}:
+        key, op = key.rsplit(MODELS_DELIMITER, 1)
+    elif is_null:
+        op = OP.IS
+    else:
+        op = OP.EQ
+    path = []
+    curr = model
+    key_pieces = key.split(MODELS_DELIMITER)
+    for i, piece in enumerate(key_pieces):
+        if not i and piece in computed and MODELS_DELIMITER not in key:
+            return ((piece, False),), op, None
+        model_attr = getattr(curr, piece)
+        semi_join = isinstance(model_attr, BackrefAccessor) or not joins and isinstance(model_attr, ForeignKeyField)
+        if semi_join and i + 1 < len(key_pieces):
+            path.append((piece, False))
+            return tuple(path), None, MODELS_DELIMITER.join(pieces[i + 1:])
+        if isinstance(model_attr, JSONField):
+            path.append((piece, False))
+            path.extend((json_key, None) for json_key in key_pieces[i + 1:])
+            return tuple(path), op, None
+        is_relationship = not is_null and isinstance(model_attr, relationship)
+        if is_relationship:
+            curr = model_attr.rel_model
+        path.append((piece, is_relationship))
+    return tuple(path), op, None
+
+
+def get_search_vector(field):
+    """ Document of the text column, `tsvector` column is used as is.
+    Configuration is rendered as a literal, so `to_tsvector('english', name)` expression index matches
+    """
+    if isinstance(field, TSVectorField) or isinstance(field, FieldAlias) and isinstance(field.field, TSVectorField):
+        return field
+    return fn.to_tsvector(SQL("'{}'".format(SEARCH_CONFIG)), field)
+
+
+def get_search_query(value):
+    return fn.websearch_to_tsquery(SQL("'{}'".format(SEARCH_CONFIG)), value)
+
+
+def get_semi_join(model, relationship, filters):
+    """ `EXISTS` subquery for filters over one-to-many relationship: unlike join it doesn't multiply
+    filtered rows, so neither pagination nor total count are affected.
+    Foreign keys of queries which can't join (update and delete) are checked the same way.
+    """
+    if isinstance(relationship, BackrefAccessor):
+        field = relationship.field
+        rel_model, rel_column, column = field.model, field.name, field.rel_field.name
+    else:
+        field = relationship.field if isinstance(relationship, FieldAlias) else relationship
+        rel_model, rel_column, column = field.rel_model, field.rel_field.name, field.name
+    if rel_model is get_model(model):  # Self-referencing model
+        rel_model = rel_model.alias()
+    subquery = filter(rel_model.select(SQL('1')), filters)
+    subquery = subquery.where(getattr(rel_model, rel_column) == getattr(model, column))
+    return NodeList([SQL('EXISTS'), subquery])
+
+
+def get_container_expression(field, lookup, value):
+    """ Array (`tags__overlap: ["a", "b"]`) or JSONB (`data__has_key: "a"`, `data__meta__contains: {"a": 1}`)
+    operator expression, these could use GIN indexes
+    """
+    column = field.node if isinstance(field, JsonLookup) else field
+    column = column.field if isinstance(column, FieldAlias) else column
+    if isinstance(column, ArrayField):
+        if lookup not in ARRAY_LOOKUPS:
+            raise FilterError('Unsupported lookup "{}" of array field "{}"'.format(lookup, column.name))
+        return Expression(field, ARRAY_LOOKUPS[lookup], ArrayValue(column, value))
+    if lookup not in JSONB_LOOKUPS or not isinstance(column, BinaryJSONField):
+        raise FilterError('Unsupported lookup "{}" of field "{}"'.format(lookup, getattr(column, 'name', column)))
+    if isinstance(field, JsonLookup):
+        field = field.as_json(True)
+    if lookup in ('contains', 'contained_by'):
+        value = Json(value)
+    else:  # Keys are not converted to JSON by the column
+        value = Value(value if lookup == 'has_key' else list(value), converter=False, unpack=False)
+    return Expression(field, JSONB_LOOKUPS[lookup], value)
+
+
+def get_json_value(lookup, value):
+    """ JSON value is extracted as text (`->>`), so it's cast to compare with numbers and booleans """
+    sample = value[0] if isinstance(value, (list, tuple)) and value else value
+    if isinstance(sample, bool):
+        return lookup.cast('boolean')
+    if isinstance(sample, (int, float)):
+        return lookup.cast('numeric')
+    return lookup
+
+
+def convert_dict_to_node(query, qdict, alias_map={}, computed={}):
     accum = []
     joins = []
-    relationship = (ForeignKeyField, BackrefAccessor)
+    semi_joins = {}
+    model = get_model(query.model)
+    computed_names = frozenset(computed)
+    joins_supported = isinstance(query, ModelSelect)
     for key, value in sorted(qdict.items()):
+        path, op, related_key = compile_filter_key(model, key, value is None, computed_names, joins_supported)
         curr = query.model
-        if '__' in key and key.rsplit('__', 1)[1] in DJANGO_MAP:
-            key, op = key.rsplit('__', 1)
-            op = DJANGO_MAP[op]
-        elif value is None:
-            op = OP.IS
-        else:
-            op = OP.EQ
-        for piece in key.split('__'):
+        for i, (piece, is_relationship) in enumerate(path):
+            if not i and piece in computed:
+                model_attr = computed[piece]
+                continue
+            if is_relationship is None:  # Key inside JSON column
+                model_attr = model_attr[piece]
+                continue
             model_attr = getattr(curr, piece)
-            if isinstance(model_attr, FieldAlias):
-                actual_model_attr = model_attr.field
-            else:
-                actual_model_attr = model_attr
-            if value is not None and isinstance(actual_model_attr, relationship):
+            if is_relationship:
                 curr = model_attr.rel_model
                 curr = alias_map.get(curr, curr)
                 joins.append(model_attr)
-        accum.append(Expression(model_attr, op, value))
+        if related_key is not None:
+            # Lookups through the same backref are checked against the same related row, just like with join
+            semi_joins.setdefault(path, (curr, model_attr, {}))[2][related_key] = value
+        elif op == SEARCH_LOOKUP:
+            accum.append(Expression(get_search_vector(model_attr), '@@', get_search_query(value)))
+        elif op in CONTAINER_LOOKUPS:
+            accum.append(get_container_expression(model_attr, op, value))
+        elif isinstance(model_attr, JsonLookup):
+            accum.append(Expression(get_json_value(model_attr, value), op, value))
+        else:
+            accum.append(Expression(model_attr, op, value))
+    for path in sorted(semi_joins):
+        curr, backref, related_filters = semi_joins[path]
+        accum.append(get_semi_join(curr, backref, related_filters))
     return accum, joins
 
 
-def filter(query, filters, alias_map={}):
-    # normalize args and kwargs into a new expression
-    # Note: This is a modified peewee's Query.filter method.
+def filter(query, filters, alias_map={}, computed={}):
+    # Note: This is a modified peewee's Query.filter method for plain (not nested `DQ`) filters dict.
     # Inner methods convert_dict_to_node and ensure_join also changed.
     # That is done to support FieldProxy generated from aliases to prevent unnecessary joins (see issue link below).
     # https://github.com/coleifer/peewee/issues/1338
-    if filters:
-        dq_node = Node() & DQ(**filters)
-    else:
+    if not filters:
         return query
-
-    # dq_node should now be an Expression, lhs = Node(), rhs = ...
-    q = deque([dq_node])
-    dq_joins = set()
-    while q:
-        curr = q.popleft()
-        if not isinstance(curr, Expression):
-            continue
-        for side, piece in (('lhs', curr.lhs), ('rhs', curr.rhs)):
-            if isinstance(piece, DQ):
-                new_query, joins = convert_dict_to_node(query, piece.query, alias_map)
-                dq_joins.update(joins)
-                expression = reduce(operator.and_, new_query)
-                # Apply values from the DQ object.
-                expression._negated = piece._negated
-                expression._alias = piece.alias
-                setattr(curr, side, expression)
-            else:
-                q.append(piece)
-
-    dq_node = dq_node.rhs
+    expressions, dq_joins = convert_dict_to_node(query, filters, alias_map, computed)
+    dq_node = reduce(operator.and_, expressions)
 
     new_query = query.clone()
     for field in dq_joins:
-        if isinstance(field, (ForeignKeyField, FieldAlias)):
+        if isinstance(field, FieldAlias):  # Joined from the aliased model, not the model itself
+            lm, rm = field.source, field.rel_model
+            field_obj = field
+        elif isinstance(field, ForeignKeyField):
             lm, rm = field.model, field.rel_model
             field_obj = field
         elif isinstance(field, BackrefAccessor):
@@ -114,58 +235,295 @@ def filter(query, filters, alias_map={}):
 def join(query, models, src_model=None):
     src_model = src_model or query.model
     for model, child_models, requested_fields in models:
-        query = query.select(*(query._returning + requested_fields))
+        query = query.select(*(tuple(query._returning) + tuple(requested_fields)))
         query = query.switch(src_model)
         query = query.join(model, JOIN.LEFT_OUTER)  # TODO: on
         query = join(query, child_models, model)
     return query
 
 
-def order(model, query, order, alias_map={}):
-    if order:
+class Prefetch(object):
+    """ Foreign key objects fetched with a separate `WHERE ... IN` query and set to the rows as if they were joined.
+    `path` is names of joined foreign keys leading from the fetched rows to the objects referencing prefetched ones.
+    """
+
+    def __init__(self, path, field, query):
+        self.path = path
+        self.field = field
+        self.query = query
+
+    def get_owners(self, rows):
+        owners = list(rows)
+        for name in self.path:
+            owners = [owner.__rel__[name] for owner in owners if owner.__rel__.get(name) is not None]
+        return owners
+
+    def get_query(self, ids):
+        return self.query.where(getattr(self.query.model, self.field.rel_field.name).in_(ids))
+
+    def set(self, owners, objs):
+        rel_field_name = self.field.rel_field.name
+        objs = {obj.__data__.get(rel_field_name): obj for obj in objs}
+        for owner in owners:
+            obj = objs.get(owner.__data__.get(self.field.name))
+            if obj is not None:
+                owner.__rel__[self.field.name] = obj
+
+
+def get_prefetches(query):
+    return getattr(query, '_prefetches', ())
+
+
+def set_prefetches(query, prefetches):
+    query._prefetches = prefetches  # Cloned with the query
+    return query
+
+
+def get_column_width(field):
+    if isinstance(field, FieldAlias):
+        field = field.field
+    if not isinstance(field, Field):  # Computed field expression
+        return COLUMN_WIDTH
+    if isinstance(field, CharField) and field.max_length:
+        return field.max_length
+    if field.field_type in WIDE_FIELD_TYPES:
+        return WIDE_COLUMN_WIDTH
+    return COLUMN_WIDTH
+
+
+def get_joined_width(requested):
+    model, child_models, requested_fields = requested
+    return sum(map(get_column_width, requested_fields)) + sum(map(get_joined_width, child_models))
+
+
+def get_foreign_key(fields, model):
+    for field in fields:
+        if isinstance(field, FieldAlias):
+            field = field.field
+        if isinstance(field, ForeignKeyField) and field.rel_model is get_model(model):
+            return field
+    return None
+
+
+def get_lookup_paths(filters, order_by):
+    """ Foreign key paths filters and order items go through, which have to be joined """
+    keys = list(filters or ()) + [to_snake_case(order_item.lstrip(DESC_ORDER_CHAR)) for order_item in order_by or ()]
+    paths = set()
+    for key in keys:
+        pieces = key.split(MODELS_DELIMITER)
+        for i in range(1, len(pieces)):
+            paths.add(tuple(pieces[:i]))
+    return paths
+
+
+def has_computed_fields(requested):
+    model, child_models, requested_fields = requested
+    return any(not isinstance(field, (Field, FieldAlias)) for field in requested_fields)
+
+
+def is_prefetched(registry, field, requested, rows):
+    """ Explicitly listed in node `prefetch` option or, with `auto_prefetch`, joining would repeat
+    too many bytes of the foreign key object columns over the rows.
+    Objects with computed fields are always prefetched, as only the query's own model gets non-column values.
+    """
+    if has_computed_fields(requested):
+        return True
+    node = registry.get_type_for_model(field.model)
+    if node is None:
+        return False
+    if field.name in node._meta.prefetch:
+        return True
+    return node._meta.auto_prefetch and rows * get_joined_width(requested) >= PREFETCH_MIN_BYTES
+
+
+def get_lookup_joins(requested, excluded, path):
+    """ Joins of the looked up paths only, selecting nothing """
+    model, child_models, requested_fields = requested
+    joined = []
+    for child in child_models:
+        field = get_foreign_key(requested_fields, child[0])
+        child_path = path + (field.name,) if field is not None else path
+        if child_path in excluded:
+            joined.append(get_lookup_joins(child, excluded, child_path))
+    return model, joined, []
+
+
+def has_joined_computed_fields(requested):
+    model, child_models, requested_fields = requested
+    return any(has_computed_fields(child) or has_joined_computed_fields(child) for child in child_models)
+
+
+def plan_prefetches(registry, requested, rows, excluded=frozenset(), path=()):
+    """ Split requested joins into ones to keep and `Prefetch`es.
+    Looked up (`excluded`) paths stay joined, unless objects select computed fields:
+    then they are prefetched and joined only for lookups.
+    """
+    model, child_models, requested_fields = requested
+    joined = []
+    prefetches = []
+    for child in child_models:
+        field = get_foreign_key(requested_fields, child[0])
+        child_path = path + (field.name,) if field is not None else path
+        looked_up = child_path in excluded
+        if field is not None and (has_computed_fields(child) or
+                                  not looked_up and is_prefetched(registry, field, child, rows)):
+            prefetches.append(Prefetch(path, field, get_prefetch_query(registry, field, child, rows)))
+            if looked_up:
+                joined.append(get_lookup_joins(child, excluded, child_path))
+        else:
+            child, child_prefetches = plan_prefetches(registry, child, rows, excluded, child_path)
+            joined.append(child)
+            prefetches.extend(child_prefetches)
+    return (model, joined, requested_fields), prefetches
+
+
+def get_prefetch_query(registry, field, requested, rows):
+    (model, child_models, requested_fields), prefetches = plan_prefetches(registry, requested, rows)
+    rel_field = getattr(model, field.rel_field.name)
+    if not any(isinstance(requested_field, (Field, FieldAlias)) and requested_field.name == rel_field.name
+               for requested_field in requested_fields):
+        requested_fields = [rel_field] + list(requested_fields)
+    query = join(model.select(*requested_fields), child_models)
+    return set_prefetches(query, prefetches)
+
+
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
+def compile_order_item(model, order_item, computed=frozenset()):
+    """ Attribute names of the order item path and whether the order is descending """
+    desc = order_item.startswith(DESC_ORDER_CHAR)
+    if desc:
+        order_item = order_item.lstrip(DESC_ORDER_CHAR)
+    path = tuple(to_snake_case(order_item).split(MODELS_DELIMITER))
+    field_path = path[:-1] if len(path) > 1 and path[-1] == RANK_LOOKUP else path
+    if not (len(field_path) == 1 and field_path[0] in computed):
+        get_field(model, MODELS_DELIMITER.join(field_path))  # Fail early on unknown fields, before caching
+    return path, desc
+
+
+def get_search_rank(field, path, filters):
+    search_key = MODELS_DELIMITER.join(path[:-1] + (SEARCH_LOOKUP,))
+    if search_key not in filters:
+        raise FilterError('Order by "{}" requires "{}" filter'.format(MODELS_DELIMITER.join(path), search_key))
+    return fn.ts_rank(get_search_vector(field), get_search_query(filters[search_key]))
+
+
+def get_path_field(model, path, alias_map={}, computed={}):
+    if len(path) == 1 and path[0] in computed:
+        return computed[path[0]]
+    field = alias_map.get(model, model)
+    for i, name in enumerate(path):
+        if i:  # Foreign key
+            field = alias_map.get(field.rel_model, field.rel_model)
+        field = getattr(field, name)
+    return field
+
+
+def join_path(query, model, path, alias_map={}):
+    """ Join foreign keys of the path which are not joined yet (neither requested nor filtered by) """
+    curr = alias_map.get(model, model)
+    for name in path[:-1]:
+        field = getattr(curr, name)
+        lm = field.source if isinstance(field, FieldAlias) else field.model
+        query = ensure_join(query, lm, field.rel_model, field, join_type=JOIN.LEFT_OUTER)
+        curr = alias_map.get(field.rel_model, field.rel_model)
+    return query
+
+
+def order(model, query, order, alias_map={}, computed={}, filters={}, distinct_on=()):
+    """ Order by `order` items, `distinct_on` ones keep a single (first) row per their values.
+    Postgres requires `DISTINCT ON` expressions to be the leftmost in `ORDER BY`, so they are moved there,
+    in the direction given in `order` if any
+    """
+    base_model = get_model(model)
+    computed_names = frozenset(computed)
+    order_items = [compile_order_item(base_model, order_item, computed_names) for order_item in order]
+    if distinct_on:
+        distinct_paths = [compile_order_item(base_model, item, computed_names)[0] for item in distinct_on]
+        desc_paths = {path for path, desc in order_items if desc}
+        order_items = [(path, path in desc_paths) for path in distinct_paths] + [
+            (path, desc) for path, desc in order_items if path not in distinct_paths]
+        query = query.distinct(*(get_path_field(model, path, alias_map, computed) for path in distinct_paths))
+    if order_items:
         order_fields = []
-        for order_item in order:
-            if order_item.startswith(DESC_ORDER_CHAR):
-                order_item = order_item.lstrip(DESC_ORDER_CHAR)
-                order_field = get_field(model, to_snake_case(order_item), alias_map).desc()
-            else:
-                order_field = get_field(model, to_snake_case(order_item), alias_map)
-            order_fields.append(order_field)
+        for path, desc in order_items:
+            field_path = path[:-1] if len(path) > 1 and path[-1] == RANK_LOOKUP else path
+            query = join_path(query, model, field_path, alias_map)
+            order_field = get_path_field(model, field_path, alias_map, computed)
+            if field_path is not path:
+                order_field = get_search_rank(order_field, path, filters)
+            order_fields.append(Desc(order_field) if desc else order_field)
         query = query.order_by(*order_fields)
     return query
 
 
+def get_distinct_total(query):
+    """ Count of rows left by `DISTINCT ON`: window functions are computed before it, so `COUNT(*) OVER ()` can't """
+    rows = query.select(SQL('1')).order_by().alias('distinct_rows')
+    return Select([rows], [fn.COUNT(SQL('*'))])
+
+
 def paginate(query, page, paginate_by):
     if page and paginate_by:
         query = query.paginate(page, paginate_by)
     return query
 
 
-def get_query(model, info, filters={}, order_by=[], page=None, paginate_by=None, total_query=None):
+def get_query(model, info, filters={}, order_by=[], page=None, paginate_by=None, total_query=None, registry=None,
+              prefetch=True, distinct_on=()):
     query = None
     if isinstance(model, Query):
         query = model
         model = query.objects().model
     if isinstance(model, (Model, ModelBase)):
         alias_map = {}
-        selections = next(field for field in info.field_asts if field.name.value == info.field_name).selection_set.selections
-        requested_model, requested_joins, requested_fields = get_requested_models(model, selections, alias_map)
+        selections = merge_selections([selection
+                                       for field_ast in info.field_asts if field_ast.name.value == info.field_name
+                                       for selection in field_ast.selection_set.selections],
+                                      info.fragments, info.variable_values)
+        # Given query (e.g. of backref) selects from the model itself, so fields and expressions have to refer to it
+        requested_model, requested_joins, requested_fields = get_requested_models(
+            model, selections, alias_map, registry, query.model if query is not None else None,
+            info.fragments, info.variable_values)
         if query is None:
             query = requested_model.select(*requested_fields)
+        else:
+            query = query.select(*(tuple(query._returning) + tuple(
+                field for field in requested_fields if not isinstance(field, (Field, FieldAlias)))))
         if not requested_fields:
             query._returning = ()
+        computed = {}
+        if filters or order_by or distinct_on:
+            computed = {name: expression(requested_model)
+                        for name, expression in get_computed_fields(registry, model).items()}
+        prefetches = ()
+        if registry is not None and prefetch:
+            requested = requested_model, requested_joins, requested_fields
+            rows = paginate_by if page and paginate_by else UNPAGINATED_ROWS
+            lookup_paths = get_lookup_paths(filters, list(order_by) + list(distinct_on))
+            requested, prefetches = plan_prefetches(registry, requested, rows, lookup_paths)
+            requested_joins = requested[1]
+        elif has_joined_computed_fields((requested_model, requested_joins, requested_fields)):
+            # Only the query's own model gets non-column values, joined objects would get nulls instead
+            raise PrefetchError('Computed fields of foreign key objects require prefetching, '
+                                'they are not supported by streamed connections')
         query = join(query, requested_joins)
-        query = filter(query, filters, alias_map)
-        query = order(requested_model, query, order_by, alias_map)
+        query = filter(query, filters, alias_map, computed)
+        query = order(requested_model, query, order_by, alias_map, computed, filters, distinct_on)
+        unpaginated_query = query
         query = paginate(query, page, paginate_by)
-        if page and paginate_by or get_field_from_selections(selections, 'total'):  # TODO: refactor 'total'
+        total_field = get_field_from_selections(selections, 'total', info.fragments, info.variable_values)
+        if page and paginate_by or total_field:  # TODO: refactor 'total'
             if total_query:
                 total = NodeList([total_query]).alias(TOTAL_FIELD)
+            elif distinct_on:
+                total = get_distinct_total(unpaginated_query).alias(TOTAL_FIELD)
             else:
                 total = NodeList([fn.Count(SQL('*')), fn.Over()], glue=' ').alias(TOTAL_FIELD)
             query._returning = tuple(query._returning) + (total,)
         if not query._returning:
             query = query.select(SQL('1'))  # bottleneck
+        if prefetches:
+            query = set_prefetches(query, prefetches)
         # query = query.aggregate_rows()
         return query
     return model
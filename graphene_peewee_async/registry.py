@@ -5,6 +5,7 @@ class Registry(object):
     def __init__(self):
         self._registry = {}
         self._registry_models = {}
+        self._connections = {}
 
     def register(self, cls):
         from .types import PeeweeObjectType
@@ -20,6 +21,17 @@ class Registry(object):
     def get_type_for_model(self, model):
         return self._registry.get(model)
 
+    def get_connection(self, name, node_type):
+        """ Connection class of `node_type` named `name`, created only once per registry """
+        from .fields import PeeweeConnection
+        key = name, node_type
+        if key not in self._connections:
+            connection_meta_class = type('Meta', (), {'node': node_type})
+            self._connections[key] = type(name,
+                                          (PeeweeConnection,),
+                                          {connection_meta_class.__name__: connection_meta_class})
+        return self._connections[key]
+
 
 registry = None
 
@@ -0,0 +1,105 @@
+import datetime
+import decimal
+from functools import lru_cache
+
+import peewee
+from playhouse import postgres_ext
+from graphene import Scalar, Float
+from graphene.types.datetime import DateTime
+from graphene.types.generic import GenericScalar
+from graphql.language import ast
+
+from .converter import convert_peewee_field
+
+
+ISOFORMAT_CACHE_SIZE = 10000
+
+
+@lru_cache(maxsize=ISOFORMAT_CACHE_SIZE)
+def _isoformat(value, utcoffset):
+    return value.isoformat()
+
+
+def isoformat(value):
+    # Equal aware datetimes could have different offsets, so offset is a part of the key
+    utcoffset = value.utcoffset() if isinstance(value, datetime.datetime) else None
+    return _isoformat(value, utcoffset)
+
+
+class CachedDateTime(DateTime):
+    """ `DateTime` with ISO formatting of repeated values cached.
+    Named differently, so schemas could use the stock `DateTime` as well
+    """
+
+    class Meta:
+        name = 'CachedDateTime'
+
+    @staticmethod
+    def serialize(dt):
+        assert isinstance(dt, (datetime.datetime, datetime.date)), (
+            'Received not compatible datetime "{}"'.format(repr(dt))
+        )
+        return isoformat(dt)
+
+
+class DecimalString(Scalar):
+    """ Exact decimal value represented as a string, e.g. `"12.50"`, unlike the stock `Decimal` it's never a number """
+
+    class Meta:
+        name = 'DecimalString'
+
+    @staticmethod
+    def serialize(value):
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value))
+        return format(value, 'f')
+
+    @classmethod
+    def parse_literal(cls, node):
+        if isinstance(node, (ast.StringValue, ast.IntValue, ast.FloatValue)):
+            return cls.parse_value(node.value)
+
+    @staticmethod
+    def parse_value(value):
+        try:
+            return decimal.Decimal(str(value))
+        except decimal.InvalidOperation:
+            return None
+
+
+class JSON(GenericScalar):
+    """ JSON column value passed through as is: psycopg2 already decodes it into JSON-safe values """
+
+    class Meta:
+        name = 'JSON'
+
+
+def convert_date_to_cached_datetime(field, registry=None):
+    return CachedDateTime(description=field.help_text)
+
+
+def convert_decimal_to_string(field, registry=None):
+    return DecimalString(description=field.help_text)
+
+
+def convert_decimal_to_float(field, registry=None):
+    return Float(description=field.help_text)
+
+
+def convert_field_to_pass_through_json(field, registry=None):
+    return JSON(description=field.help_text)
+
+
+def register_fast_scalars(decimal_as_string=False):
+    """ Convert date and date time fields to `CachedDateTime`, JSON fields to `JSON`
+    and, if `decimal_as_string` is set, decimal fields to `DecimalString` instead of `Float`.
+    Must be called before `PeeweeObjectType` subclasses are created.
+    """
+    convert_peewee_field.register(peewee.DateField, convert_date_to_cached_datetime)
+    convert_peewee_field.register(peewee.DateTimeField, convert_date_to_cached_datetime)
+    convert_peewee_field.register(postgres_ext.JSONField, convert_field_to_pass_through_json)
+    convert_peewee_field.register(postgres_ext.BinaryJSONField, convert_field_to_pass_through_json)
+    convert_peewee_field.register(
+        peewee.DecimalField,
+        convert_decimal_to_string if decimal_as_string else convert_decimal_to_float
+    )
@@ -0,0 +1,89 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+from .utils import get_context_value
+
+
+SCHEDULER_CONTEXT_KEY = 'query_scheduler'
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+class QueryScheduler(object):
+    """ Request-scoped limit of database queries running at the same time.
+
+    Create one instance per GraphQL request and pass it with the context
+    (``context_value={'query_scheduler': QueryScheduler(4)}``).
+    Connection and node fields then run concurrently, but never more than
+    `max_concurrency` of them hold a pool connection at once.
+    Waiting fields are started by descending priority, then in arrival order.
+    """
+
+    def __init__(self, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        assert max_concurrency > 0, 'max_concurrency must be positive, received "{}"'.format(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.running = 0
+        self.waits = []  # (field path, seconds spent in queue)
+        self._queue = []
+        self._counter = itertools.count()
+
+    @property
+    def total_wait(self):
+        return sum(wait for _, wait in self.waits)
+
+    @property
+    def max_wait(self):
+        return max((wait for _, wait in self.waits), default=0)
+
+    async def acquire(self, priority=0):
+        if self.running < self.max_concurrency and not self._queue:
+            self.running += 1
+            return
+        waiter = asyncio.get_event_loop().create_future()
+        heapq.heappush(self._queue, (-priority, next(self._counter), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was already handed over to us, pass it further
+                self.release()
+            raise
+
+    def release(self):
+        while self._queue:
+            _, _, waiter = heapq.heappop(self._queue)
+            if not waiter.done():
+                # Hand the slot over, so `running` stays the same
+                waiter.set_result(None)
+                return
+        self.running -= 1
+
+    async def run(self, awaitable, priority=0, name=None):
+        started = time.monotonic()
+        try:
+            await self.acquire(priority)
+        except asyncio.CancelledError:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise
+        self.waits.append((name, time.monotonic() - started))
+        try:
+            return await awaitable
+        finally:
+            self.release()
+
+
+def get_scheduler(info):
+    return get_context_value(info, SCHEDULER_CONTEXT_KEY)
+
+
+def get_field_path(info):
+    return '.'.join(map(str, info.path or [info.field_name]))
+
+
+async def schedule(info, awaitable, priority=0):
+    scheduler = get_scheduler(info)
+    if scheduler is None:
+        return await awaitable
+    return await scheduler.run(awaitable, priority, get_field_path(info))
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+from graphql import parse, print_schema, GraphQLError
+from graphql.execution import ExecutionResult
+from graphql.language.ast import FragmentDefinition, OperationDefinition
+from graphql.utils.introspection_query import introspection_query
+from graphql.type.definition import GraphQLEnumType
+
+from .utils import iter_fields
+
+
+MAX_RESULTS = 16
+
+
+def iter_descriptions(schema):
+    """ Descriptions of types, fields and enum values, returned by introspection but not printed in SDL """
+    for name, gql_type in sorted(schema.get_type_map().items()):
+        yield gql_type.description
+        for field in (getattr(gql_type, 'fields', None) or {}).values():
+            yield field.description
+        if isinstance(gql_type, GraphQLEnumType):
+            for value in gql_type.values:
+                yield value.description
+
+
+def get_schema_digest(sdl, descriptions=(), version=None):
+    key = json.dumps([version, sdl, list(descriptions)], default=str)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def get_request_key(request_string, variable_values=None, operation_name=None):
+    key = json.dumps([request_string, variable_values or {}, operation_name], sort_keys=True)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def is_introspection(document, variable_values=None, operation_name=None):
+    """ Document operation is a query selecting only meta fields (`__schema`, `__type`, `__typename`) """
+    fragments = {definition.name.value: definition
+                 for definition in document.definitions
+                 if isinstance(definition, FragmentDefinition)}
+    operations = [definition
+                  for definition in document.definitions
+                  if isinstance(definition, OperationDefinition)
+                  and (operation_name is None or (definition.name and definition.name.value == operation_name))]
+    if len(operations) != 1 or operations[0].operation != 'query':
+        return False
+    try:
+        return all(field_ast.name.value.startswith('__')
+                   for field_ast in iter_fields(operations[0].selection_set.selections, fragments, variable_values))
+    except (KeyError, GraphQLError):  # Unknown fragment or bad directive argument is reported by execution
+        return False
+
+
+class SchemaSnapshot(object):
+    """ Schema SDL and results of introspection queries saved to a JSON file keyed by the schema digest.
+
+    Introspection of a schema generated for hundreds of models takes seconds,
+    with the snapshot only the process calling `warm()` (e.g. before forking workers) computes it::
+
+        snapshot = SchemaSnapshot(schema, 'schema.json')
+        snapshot.warm()
+        ...
+        result = snapshot.execute_introspection(request_string, variable_values, operation_name)
+        if result is None:  # Not an introspection query
+            result = await execute_async(schema, request_string, ...)
+
+    The digest is computed from the printed schema and descriptions of its types and fields,
+    so the file is ignored (and rewritten by `warm()`) once models, computed fields, mutations,
+    hand-written types or node options change what introspection returns.
+    Anything else cached results depend on could be passed as `version`.
+    Requests never write the file, other introspection queries are kept in memory, `max_results` at most.
+    """
+
+    def __init__(self, schema, path=None, version=None, max_results=MAX_RESULTS):
+        self.schema = schema
+        self.path = path
+        self.max_results = max_results
+        # Printing takes ~50 ms for 400 models, a fraction of introspection
+        self.sdl = print_schema(schema)
+        self.digest = get_schema_digest(self.sdl, iter_descriptions(schema), version)
+        self.results = OrderedDict()
+        if path is not None:
+            self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f, object_pairs_hook=OrderedDict)
+        except (OSError, ValueError):
+            return False
+        if data.get('digest') != self.digest:
+            return False
+        self.results = data.get('introspection', OrderedDict())
+        return True
+
+    def save(self):
+        data = OrderedDict([
+            ('digest', self.digest),
+            ('sdl', self.sdl),
+            ('introspection', self.results),
+        ])
+        # Other workers could write the same file simultaneously, so it's replaced atomically
+        temp_path = '{}.{}.tmp'.format(self.path, os.getpid())
+        with open(temp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp_path, self.path)
+
+    def warm(self):
+        """ Compute the standard introspection query result and SDL and save them, unless loaded from the file """
+        key = get_request_key(introspection_query)
+        if key in self.results:
+            return False
+        self.execute_introspection(introspection_query)
+        if self.path is not None:
+            self.save()
+        return True
+
+    def execute_introspection(self, request_string, variable_values=None, operation_name=None):
+        """ Cached `ExecutionResult` of introspection query, `None` for any other request """
+        key = get_request_key(request_string, variable_values, operation_name)
+        if key in self.results:
+            self.results.move_to_end(key)
+            # Results are kept serialized: cheaper to load than to copy, callers could change them
+            return ExecutionResult(data=json.loads(self.results[key], object_pairs_hook=OrderedDict))
+        try:
+            document = parse(request_string)
+        except GraphQLError:
+            return None
+        if not is_introspection(document, variable_values, operation_name):
+            return None
+        result = self.schema.execute(document, variable_values=variable_values, operation_name=operation_name)
+        if not result.errors:
+            self.results[key] = json.dumps(result.data)
+            while len(self.results) > self.max_results:
+                self.results.popitem(last=False)
+        return result
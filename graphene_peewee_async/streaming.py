@@ -0,0 +1,311 @@
+import itertools
+import json
+from inspect import isawaitable
+
+from graphql.execution import ExecutionResult
+from graphql.execution.executors.asyncio import AsyncioExecutor
+from graphql.type.definition import GraphQLList, GraphQLNonNull, GraphQLObjectType, get_named_type
+from peewee import __exception_wrapper__
+from peewee_async import RowsCursor
+
+from .database import run_sql
+from .utils import iter_fields, get_context_value
+
+
+STREAM_CONTEXT_KEY = 'stream'
+DEFAULT_FETCH_SIZE = 1000
+
+_cursor_names = itertools.count()
+
+
+class StreamingError(Exception):
+    pass
+
+
+class QueryStream(object):
+    """ Async iterator over select query results fetched with a server-side cursor
+    `fetch_size` rows at a time, so only one batch is kept in memory.
+
+    Example::
+
+        async with QueryStream(manager, Book.select()) as books:
+            async for book in books:
+                ...
+
+    The cursor lives in its own transaction on a dedicated pooled connection
+    which is released once all rows are fetched or the stream is closed.
+    """
+
+    def __init__(self, manager, query, fetch_size=DEFAULT_FETCH_SIZE):
+        self.manager = manager
+        self.query = manager._swap_database(query)
+        self.fetch_size = fetch_size
+        self.name = 'gpa_cursor_{}'.format(next(_cursor_names))
+        self.connection = None
+        self._batch = iter(())
+        self._finished = False
+
+    @property
+    def pool(self):
+        return self.manager.database._async_conn
+
+    async def open(self):
+        await self.manager.connect()
+        self.connection = await self.pool.acquire()
+        try:
+            await run_sql(self.connection, 'BEGIN')
+            sql, params = self.query.sql()
+            await run_sql(self.connection, 'DECLARE {} NO SCROLL CURSOR FOR {}'.format(self.name, sql), params)
+        except:
+            await self.close(commit=False)
+            raise
+
+    async def close(self, commit=True):
+        self._finished = True
+        if self.connection is None:
+            return
+        try:
+            await run_sql(self.connection, 'COMMIT' if commit else 'ROLLBACK')
+        finally:
+            self.pool.release(self.connection)
+            self.connection = None
+
+    async def fetch(self):
+        if self.connection is None:
+            await self.open()
+        cursor = await self.connection.cursor()
+        try:
+            with __exception_wrapper__:
+                await cursor.execute('FETCH {} FROM {}'.format(self.fetch_size, self.name))
+            rows = await cursor.fetchall()
+            description = cursor.description
+        finally:
+            cursor.close()
+        if len(rows) < self.fetch_size:
+            await self.close()
+        self._batch = self.query._get_cursor_wrapper(RowsCursor(rows, description)).iterator()
+
+    @property
+    def finished(self):
+        """ All rows are fetched already (some could be still left in the current batch) """
+        return self._finished
+
+    async def next_batch(self):
+        """ Rows left of the current batch or the next fetched batch, empty list once exhausted """
+        batch = list(self._batch)
+        if not batch and not self._finished:
+            try:
+                await self.fetch()
+            except:
+                await self.close(commit=False)
+                raise
+            batch = list(self._batch)
+        self._batch = iter(())
+        return batch
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close(commit=not exc_type)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            try:
+                return next(self._batch)
+            except StopIteration:
+                pass
+            if self._finished:
+                raise StopAsyncIteration
+            try:
+                await self.fetch()
+            except:
+                await self.close(commit=False)
+                raise
+
+
+def serialize_value(value, gql_type, field_asts, fragments, variables):
+    if isinstance(gql_type, GraphQLNonNull):
+        gql_type = gql_type.of_type
+    if value is None:
+        return None
+    if isinstance(gql_type, GraphQLList):
+        return [serialize_value(item, gql_type.of_type, field_asts, fragments, variables) for item in value]
+    if isinstance(gql_type, GraphQLObjectType):
+        selections = [selection
+                      for field_ast in field_asts
+                      for selection in field_ast.selection_set.selections]
+        return serialize_object(value, gql_type, selections, fragments, variables)
+    return gql_type.serialize(value)
+
+
+def serialize_object(obj, gql_type, selections, fragments=None, variables=None):
+    """ Serialize already fetched object according to the selection set without GraphQL execution """
+    result = {}
+    for field_ast in iter_fields(selections, fragments, variables):
+        name = field_ast.name.value
+        key = field_ast.alias.value if field_ast.alias else name
+        if name == '__typename':
+            result[key] = gql_type.name
+            continue
+        gql_field = gql_type.fields[name]
+        value = gql_field.resolver(obj, None)
+        if isawaitable(value):
+            if hasattr(value, 'close'):
+                value.close()
+            raise StreamingError('Field `{}.{}` requires separate query and cannot be streamed'.format(
+                gql_type.name, name))
+        result[key] = serialize_value(value, gql_field.type, [field_ast], fragments, variables)
+    return result
+
+
+class StreamRequest(object):
+    """ Root connection field to be streamed instead of executed, filled by `PeeweeConnectionField` """
+
+    def __init__(self):
+        self.manager = None
+        self.query = None
+        self.info = None
+
+    def set(self, manager, query, info):
+        if self.query is not None:
+            raise StreamingError('Only one root connection field can be streamed')
+        self.manager = manager
+        self.query = query
+        self.info = info
+
+
+def get_stream_request(info):
+    if info.path is None or len(info.path) != 1:
+        return None
+    return get_context_value(info, STREAM_CONTEXT_KEY)
+
+
+class ConnectionStream(object):
+    """ Edges of the streamed root connection field serialized one by one """
+
+    def __init__(self, result, request, fetch_size=DEFAULT_FETCH_SIZE):
+        self.result = result
+        self.request = request
+        self.fetch_size = fetch_size
+
+    def get_node_selection(self):
+        info = self.request.info
+        edge_type = get_named_type(get_named_type(info.return_type).fields['edges'].type)
+        node_type = get_named_type(edge_type.fields['node'].type)
+        selections = []
+        for field_ast in info.field_asts:
+            for edges_ast in iter_fields(field_ast.selection_set.selections, info.fragments, info.variable_values):
+                if edges_ast.name.value != 'edges':
+                    continue
+                for node_ast in iter_fields(edges_ast.selection_set.selections, info.fragments,
+                                            info.variable_values):
+                    if node_ast.name.value == 'node':
+                        selections.extend(node_ast.selection_set.selections)
+        return node_type, selections
+
+    def edges(self):
+        return EdgeIterator(self)
+
+    def ndjson(self):
+        return NDJSONIterator(self.edges())
+
+
+class EdgeIterator(object):
+
+    def __init__(self, stream):
+        info = stream.request.info
+        self.node_type, self.selections = stream.get_node_selection()
+        self.fragments = info.fragments
+        self.variables = info.variable_values
+        self.rows = QueryStream(stream.request.manager, stream.request.query, stream.fetch_size)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close(commit=not exc_type)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        obj = await self.rows.__anext__()
+        try:
+            node = serialize_object(obj, self.node_type, self.selections, self.fragments, self.variables)
+        except:
+            await self.close(commit=False)
+            raise
+        return {'node': node}
+
+    async def close(self, commit=True):
+        await self.rows.close(commit)
+
+
+class NDJSONIterator(object):
+    """ Edges serialized as lines of JSON, the cursor is released once they are exhausted or fail.
+    Consumer stopping early has to close the iterator::
+
+        async with stream.ndjson() as lines:
+            async for line in lines:
+                ...
+    """
+
+    def __init__(self, edges):
+        self.edges = edges
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close(commit=not exc_type)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        edge = await self.edges.__anext__()
+        try:
+            return json.dumps(edge) + '\n'
+        except:
+            await self.close(commit=False)
+            raise
+
+    async def close(self, commit=True):
+        await self.edges.close(commit)
+
+
+async def execute_streaming(schema, request_string, fetch_size=DEFAULT_FETCH_SIZE, context_value=None,
+                            **execute_options):
+    """ Execute GraphQL query streaming the edges of its root connection field.
+
+    The connection query is built from the field selection and arguments as usual but not executed,
+    rows are fetched with server-side cursor instead and serialized incrementally, e.g. as NDJSON::
+
+        stream = await execute_streaming(schema, '{ books { edges { node { id name } } } }')
+        async with stream.ndjson() as lines:
+            async for line in lines:
+                response.write(line)
+
+    Pagination limits are applied only if given explicitly in the arguments.
+    Streamed nodes can select columns and foreign key objects but not backref connections.
+    """
+    if context_value is None:
+        context_value = {}
+    request = StreamRequest()
+    if isinstance(context_value, dict):
+        context_value[STREAM_CONTEXT_KEY] = request
+    else:
+        setattr(context_value, STREAM_CONTEXT_KEY, request)
+    execute_options.setdefault('executor', AsyncioExecutor())
+    result = schema.execute(request_string, context_value=context_value, return_promise=True, **execute_options)
+    if not isinstance(result, ExecutionResult):
+        result = await result
+    if result.errors:
+        raise result.errors[0]
+    if request.query is None:
+        raise StreamingError('No root connection field to stream')
+    return ConnectionStream(result, request, fetch_size)
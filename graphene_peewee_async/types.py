@@ -1,20 +1,49 @@
+import asyncio
 from collections import OrderedDict
+from inspect import isawaitable
 
+from peewee import ForeignKeyField
 from peewee_async import Manager
-from graphene import ObjectType, Field, Mutation
+from graphene import ObjectType, Field, Mutation, Dynamic, NonNull, Int, String, Float, Boolean, ID
 from graphene.types.objecttype import ObjectTypeOptions
 from graphene.types.utils import yank_fields_from_attrs
 
+from .database import get, get_read_manager, get_timeout, mark_written, QueryTimeoutError
 from .queries import get_query
 from .registry import Registry, get_global_registry
 from .converter import convert_peewee_field_with_choices, get_foreign_key_id_field
-from .utils import get_reverse_fields, is_valid_peewee_model
+from .fields import ComputedField
+from .utils import get_reverse_fields, is_valid_peewee_model, get_computed_column
+
+
+RAW_SCALARS = (Int, String, Float, Boolean, ID)
 
 
 def get_foreign_key_field_name(from_field_name, to_field_name):
     return '{}_{}'.format(from_field_name, to_field_name)
 
 
+def get_data_resolver(name):
+    """ Column value straight from the row data, bypassing descriptor and default resolver lookups """
+
+    def resolver(root, info, **args):
+        return root.__data__.get(name)
+
+    return resolver
+
+
+def get_related_resolver(name):
+    """ Joined foreign key object, falling back to the descriptor when it was not joined """
+
+    def resolver(root, info, **args):
+        result = root.__rel__.get(name)
+        if result is None and root.__data__.get(name) is not None:
+            result = getattr(root, name)
+        return result
+
+    return resolver
+
+
 def construct_fields(model, registry):
     reverse_fields = get_reverse_fields(model)
     all_fields = {field.name: field
@@ -31,17 +60,97 @@ def construct_fields(model, registry):
     return fields
 
 
+def get_computed_resolver(name):
+    column = get_computed_column(name)
+
+    def resolver(root, info, **args):
+        return getattr(root, column, None)
+
+    return resolver
+
+
+def get_computed_fields(cls):
+    """ `ComputedField`s declared on the node type and its bases """
+    fields = {}
+    for type_ in reversed(cls.__mro__):
+        for name, value in vars(type_).items():
+            if isinstance(value, ComputedField):
+                fields[name] = value
+    return fields
+
+
+def construct_resolvers(model):
+    """ Specialized resolvers for columns, foreign key ids and foreign key objects by field name """
+    resolvers = {}
+    for field in model._meta.sorted_fields:
+        if isinstance(field, ForeignKeyField):
+            resolvers[field.name] = get_related_resolver(field.name)
+            resolvers[get_foreign_key_field_name(field.name, field.rel_field.name)] = get_data_resolver(field.name)
+        else:
+            resolvers[field.name] = get_data_resolver(field.name)
+    return resolvers
+
+
+def has_custom_resolver(cls, interfaces, name):
+    attr = 'resolve_{}'.format(name)
+    for type_ in cls.__mro__:
+        if type_ is PeeweeObjectType:
+            break
+        if attr in vars(type_):
+            return True
+    return any(getattr(interface, attr, None) is not None for interface in interfaces)
+
+
+def set_resolver(field, resolver):
+    if isinstance(field, Dynamic):
+        get_type = field.get_type
+
+        def get_type_with_resolver():
+            _type = get_type()
+            if isinstance(_type, Field) and _type.resolver is None:
+                _type.resolver = resolver
+            return _type
+
+        return Dynamic(get_type_with_resolver, with_schema=field.with_schema)
+    if field.resolver is None:
+        field.resolver = resolver
+    return field
+
+
+def get_raw_fields(fields):
+    """ Names of plain scalar fields, which values could be returned without serialization """
+    names = []
+    for name, field in fields.items():
+        if isinstance(field, Field):
+            _type = field.type
+            if isinstance(_type, NonNull):
+                _type = _type.of_type
+            if _type in RAW_SCALARS:
+                names.append(name)
+    return frozenset(names)
+
+
 class PeeweeOptions(ObjectTypeOptions):
 
     registry = None
     model = None
     manager = None
+    read_manager = None
+    max_replica_lag = None
+    timeout = None
+    raw_fields = frozenset()
+    computed_fields = {}
+    prefetch = frozenset()
+    auto_prefetch = False
+    generated_types = None
 
 
 class PeeweeObjectType(ObjectType):
 
     @classmethod
-    def __init_subclass_with_meta__(cls, registry=None, model=None, manager=None, **options):
+    def __init_subclass_with_meta__(cls, registry=None, model=None, manager=None, read_manager=None,
+                                    max_replica_lag=None, skip_serialize=False, prefetch=(), auto_prefetch=False,
+                                    **options):
         if not registry:
             registry = get_global_registry()
         assert isinstance(registry, Registry), (
@@ -54,14 +163,35 @@ class PeeweeObjectType(ObjectType):
         assert isinstance(manager, Manager), (
             'You need to pass a valid Peewee Manager in {}.Meta, received "{}".'
         ).format(cls._meta.name, manager)
+        assert read_manager is None or isinstance(read_manager, Manager), (
+            'The attribute read_manager in {}.Meta needs to be an instance of '
+            'Peewee Manager, received "{}".'
+        ).format(cls._meta.name, read_manager)
         _meta = PeeweeOptions(cls)
         _meta.registry = registry
         _meta.model = model
         _meta.manager = manager
-        _meta.fields = yank_fields_from_attrs(
+        _meta.read_manager = read_manager or manager
+        _meta.max_replica_lag = max_replica_lag
+        _meta.prefetch = frozenset(prefetch)
+        _meta.auto_prefetch = auto_prefetch
+        _meta.generated_types = {}
+        fields = yank_fields_from_attrs(
             construct_fields(model, registry),
             _as=Field,
         )
+        interfaces = options.get('interfaces') or ()
+        for name, resolver in construct_resolvers(model).items():
+            if name in fields and not has_custom_resolver(cls, interfaces, name):
+                fields[name] = set_resolver(fields[name], resolver)
+        computed_fields = get_computed_fields(cls)
+        for name, field in computed_fields.items():
+            if field.resolver is None and not has_custom_resolver(cls, interfaces, name):
+                field.resolver = get_computed_resolver(name)
+        _meta.computed_fields = {name: field.expression for name, field in computed_fields.items()}
+        _meta.fields = fields
+        if skip_serialize:
+            _meta.raw_fields = get_raw_fields(fields)
 
         super(PeeweeObjectType, cls).__init_subclass_with_meta__(_meta=_meta, **options)
 
@@ -89,7 +219,9 @@ class PeeweeObjectType(ObjectType):
         pk_field_name = model._meta.primary_key.name
         try:
             # TODO: pass as plain int (use `prepare_filters` inside)
-            return (await cls._meta.manager.get(get_query(model, info, filters={pk_field_name: pk_value})))
+            manager = await get_read_manager(info, cls._meta)
+            query = get_query(model, info, filters={pk_field_name: pk_value}, registry=cls._meta.registry)
+            return (await get(info, manager, query))
         except model.DoesNotExist:
             return None
 
@@ -98,10 +230,39 @@ class PeeweeObjectType(ObjectType):
         return cls.async_get_node(info, pk_value)
 
 
+async def run_atomic(manager, awaitable):
+    async with manager.atomic():
+        return (await awaitable)
+
+
+def get_writing_resolver(mutate, timeout=None, manager=None):
+    """ Resolver running `mutate` inside of a transaction of `manager` (if given), so a mutation failed
+    or cancelled by the timeout between its statements doesn't leave a partial write
+    """
+
+    async def resolver(root, info, **args):
+        mark_written(info)
+        mutate_timeout = get_timeout(info, timeout)
+        result = mutate(root, info, **args)
+        if isawaitable(result):
+            if manager is not None:
+                result = run_atomic(manager, result)
+            if mutate_timeout is None:
+                result = await result
+            else:
+                try:
+                    result = await asyncio.wait_for(result, mutate_timeout)
+                except asyncio.TimeoutError:
+                    raise QueryTimeoutError('Mutation exceeded {}s timeout'.format(mutate_timeout))
+        return result
+
+    return resolver
+
+
 class PeeweeMutation(Mutation):
 
     @classmethod
-    def __init_subclass_with_meta__(cls, model=None, manager=None, **options):
+    def __init_subclass_with_meta__(cls, model=None, manager=None, timeout=None, resolver=None, **options):
         assert is_valid_peewee_model(model), (
             'You need to pass a valid Peewee Model in {}.Meta, received "{}".'
         ).format(cls._meta.name, model)
@@ -111,7 +272,11 @@ class PeeweeMutation(Mutation):
         _meta = PeeweeOptions(cls)
         _meta.model = model
         _meta.manager = manager
-        super(PeeweeMutation, cls).__init_subclass_with_meta__(_meta=_meta, **options)
+        _meta.timeout = timeout
+        mutate = getattr(cls, 'mutate', None)
+        if not resolver and mutate:
+            resolver = get_writing_resolver(mutate, timeout, manager)
+        super(PeeweeMutation, cls).__init_subclass_with_meta__(_meta=_meta, resolver=resolver, **options)
         return cls
 
     class Meta:
@@ -1,6 +1,10 @@
 import inspect
+from collections import OrderedDict
 
-from peewee import Model, BackrefAccessor
+from graphql.execution.values import get_argument_values
+from graphql.language.ast import Field, FragmentSpread, InlineFragment, SelectionSet
+from graphql.type.directives import GraphQLIncludeDirective, GraphQLSkipDirective
+from peewee import Model, BackrefAccessor, Alias, SelectBase
 
 
 DELIM = '__'
@@ -40,38 +44,153 @@ def import_single_dispatch():
     return singledispatch
 
 
+def get_generated_type(node, key, generate):
+    """ Type generated from `node` once and kept on its options, so it lives as long as the node """
+    generated_types = node._meta.generated_types
+    if key not in generated_types:
+        generated_types[key] = generate()
+    return generated_types[key]
+
+
 def get_arg_name(prefix, name, lookup):
     return '{}{}'.format(prefix,
                          (name + DELIM + lookup)
                          if lookup else name)
 
 
-def get_field_from_selections(selections, name):
+def is_selection_included(selection, variables=None):
+    for directive in selection.directives or ():
+        name = directive.name.value
+        if name == GraphQLSkipDirective.name:
+            if get_argument_values(GraphQLSkipDirective.args, directive.arguments, variables).get('if') is True:
+                return False
+        elif name == GraphQLIncludeDirective.name:
+            if get_argument_values(GraphQLIncludeDirective.args, directive.arguments, variables).get('if') is False:
+                return False
+    return True
+
+
+def iter_fields(selections, fragments=None, variables=None):
+    """ Iterate over field selections expanding fragments and applying `@include`/`@skip` directives """
+    for selection in selections:
+        if not is_selection_included(selection, variables):
+            continue
+        if isinstance(selection, FragmentSpread):
+            fragment = fragments[selection.name.value]
+            yield from iter_fields(fragment.selection_set.selections, fragments, variables)
+        elif isinstance(selection, InlineFragment):
+            yield from iter_fields(selection.selection_set.selections, fragments, variables)
+        else:
+            yield selection
+
+
+def get_unconditional_directives(field_ast):
+    """ Directives of the field node except `@include`/`@skip`, which are already applied to it """
+    return [directive for directive in field_ast.directives or ()
+            if directive.name.value not in (GraphQLIncludeDirective.name, GraphQLSkipDirective.name)]
+
+
+def merge_field_asts(field_asts, fragments=None, variables=None):
+    """ Single field node selecting the union of sub-selections (fragments expanded, fields merged by name) """
+    first = field_asts[0]
+    selection_set = None
+    if first.selection_set is not None:
+        selections = [selection for field_ast in field_asts for selection in field_ast.selection_set.selections]
+        selection_set = SelectionSet(merge_selections(selections, fragments, variables))
+    return Field(alias=first.alias, name=first.name, arguments=first.arguments,
+                 directives=get_unconditional_directives(first), selection_set=selection_set)
+
+
+def merge_selections(selections, fragments=None, variables=None):
+    """ Field selections with fragments expanded, `@include`/`@skip` applied and fields of the same name merged,
+    like the executor collects them, so columns are planned the same way for fragments and plain fields
+    """
+    fields = OrderedDict()
+    for field_ast in iter_fields(selections, fragments, variables):
+        fields.setdefault(field_ast.name.value, []).append(field_ast)
+    return [merge_field_asts(field_asts, fragments, variables) for field_asts in fields.values()]
+
+
+def get_field_from_selections(selections, name, fragments=None, variables=None):
     try:
-        return next(field for field in selections if field.name.value == name)
+        return next(field for field in iter_fields(selections, fragments, variables) if field.name.value == name)
     except StopIteration:
         return None
 
 
-def get_requested_models(related_model, selections, alias_map={}):
+def get_computed_column(name):
+    """ Name of the selected column and instance attribute for computed field value """
+    return '__{}__'.format(name)
+
+
+def alias_computed_field(expression, name):
+    column = get_computed_column(name)
+    if isinstance(expression, SelectBase):  # Subquery is aliased by itself
+        return expression.alias(column)
+    return Alias(expression, column)
+
+
+def get_computed_fields(registry, model):
+    """ `{name: expression}` of computed fields of the node type registered for the model """
+    node = registry.get_type_for_model(model) if registry is not None else None
+    if node is None:
+        return {}
+    return node._meta.computed_fields
 
+
+def get_requested_models(related_model, selections, alias_map={}, registry=None, alias=None, fragments=None,
+                         variables=None):
+    """ Model alias (`alias` or a new one), requested foreign key models (recursively)
+    and requested fields, including expressions of computed fields.
+    Fragments and directives are resolved against `variables` first.
+    """
+
+    selections = merge_selections(selections, fragments, variables)
     # TODO: edges/nodes unfolding below is a workaround, refactor ASAP
-    edges_field = get_field_from_selections(selections, 'edges')
+    edges_field = get_field_from_selections(selections, 'edges', fragments, variables)
     if edges_field:
-        selections = edges_field.selection_set.selections[0].selection_set.selections
-    elif get_field_from_selections(selections, 'total') or get_field_from_selections(selections, 'count'):
+        node_field = get_field_from_selections(edges_field.selection_set.selections, 'node', fragments, variables)
+        selections = node_field.selection_set.selections if node_field else []
+    elif any(get_field_from_selections(selections, name, fragments, variables)
+             for name in ('total', 'count', 'aggregate')):
         selections = []
 
     models = []
     fields = []
-    alias = related_model.alias()
+    if alias is None:
+        alias = related_model.alias()
     alias_map[related_model] = alias
+    computed_fields = get_computed_fields(registry, related_model)
     for f in selections:
         f_name = f.name.value
+        if f_name.startswith('__'):  # Meta fields, e.g. `__typename`
+            continue
+        if f_name in computed_fields:
+            fields.append(alias_computed_field(computed_fields[f_name](alias), f_name))
+            continue
         field = getattr(alias, f_name)
-        if not isinstance(field, BackrefAccessor):
+        if isinstance(field, BackrefAccessor):
+            # Backref query is filtered by the referenced column, even if it was not requested
+            fields.append(getattr(alias, field.field.rel_field.name))
+        else:
             if f.selection_set:
                 child_model = field.rel_model
-                models.append(get_requested_models(child_model, f.selection_set.selections, alias_map))
+                models.append(get_requested_models(child_model, f.selection_set.selections, alias_map, registry,
+                                                   fragments=fragments, variables=variables))
             fields.append(field)
     return alias, models, fields
+
+
+def get_context_value(info, key, default=None):
+    context = info.context
+    if isinstance(context, dict):
+        return context.get(key, default)
+    return getattr(context, key, default)
+
+
+def set_context_value(info, key, value):
+    context = info.context
+    if isinstance(context, dict):
+        context[key] = value
+    elif context is not None:
+        setattr(context, key, value)
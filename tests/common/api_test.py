@@ -27,10 +27,12 @@ class ApiTest(BaseTest):
             self.manager.execute(Author.delete())
         )
 
-    async def query(self, query, variables={}):
+    async def query(self, query, variables={}, context=None, middleware=None):
         pre_result = self.schema.execute(
             query,
             variable_values=variables,
+            context_value=context,
+            middleware=middleware,
             return_promise=True,
             executor=self.executor
         )
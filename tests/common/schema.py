@@ -4,7 +4,9 @@ import re
 import inflection
 from graphene import Schema, ObjectType
 from graphql.execution.executors.asyncio import AsyncioExecutor
+from graphql.type.directives import specified_directives
 
+from graphene_peewee_async.incremental import incremental_directives
 from graphene_peewee_async.fields import PeeweeNodeField, PeeweeConnectionField, PeeweeConnection
 from graphene_peewee_async.registry import Registry
 from graphene_peewee_async.types import PeeweeObjectType
@@ -23,11 +25,12 @@ def get_many_field_name(one_field_name):
     return '{}s'.format(one_field_name)
 
 
-def get_node(manager, model, registry):
-    meta_class = type('Meta', (), {'registry': registry,
-                                   'model': model,
-                                   'manager': manager,
-                                   'interfaces': ()})
+def get_node(manager, model, registry, read_manager=None, **options):
+    meta_class = type('Meta', (), dict({'registry': registry,
+                                        'model': model,
+                                        'manager': manager,
+                                        'read_manager': read_manager,
+                                        'interfaces': ()}, **options))
     node_class = type(model.__name__,
                       (PeeweeObjectType,),
                       {meta_class.__name__: meta_class})
@@ -42,12 +45,12 @@ def get_connection(node_class):
     return connection_class
 
 
-def generate_schema(manager, models):
+def generate_schema(manager, models, read_manager=None, **node_options):
     query_classes = {}
     mutation_classes = {}
     registry = Registry()
     for model in models:
-        node_class = get_node(manager, model, registry)
+        node_class = get_node(manager, model, registry, read_manager, **node_options)
         connection_class = get_connection(node_class)
         node_name = node_class.__name__
         entity_name = inflection.underscore(node_name)
@@ -76,5 +79,6 @@ def generate_schema(manager, models):
     executor = AsyncioExecutor()
     schema = Schema(query=query_class,
                     mutation=mutation_class,
+                    directives=specified_directives + incremental_directives,
                     auto_camelcase=False)
     return schema, executor
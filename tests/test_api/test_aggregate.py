@@ -0,0 +1,79 @@
+from unittest import mock
+
+from graphene_peewee_async.aggregates import get_aggregate_type
+from graphene_peewee_async.registry import Registry
+
+from tests.common import ApiTest, Author, Book
+from tests.common.schema import get_node, get_connection
+
+
+class TestAggregate(ApiTest):
+
+    def setUp(self):
+        super().setUp()
+        for name, rating, years in (('foo', 1, (2001, 2003)), ('bar', 5, (2010,)), ('baz', 3, ())):
+            author = self.loop.run_until_complete(self.manager.create(Author, name=name, rating=rating))
+            for year in years:
+                self.loop.run_until_complete(self.manager.create(Book, name='{}{}'.format(name, year), year=year,
+                                                                 author=author))
+
+    def test_type_kept_on_node(self):
+        node_class = get_node(self.manager, Author, Registry())
+        connection_class = get_connection(node_class)
+
+        self.assertIs(connection_class.aggregate.type.of_type, node_class._meta.generated_types['Aggregate'])
+        self.assertIs(get_aggregate_type(node_class), get_aggregate_type(node_class))
+
+    def test_filtered(self):
+        result = self.loop.run_until_complete(self.query('''
+            query {
+                authors (filters: {rating__gt: 1}, paginate_by: 1) {
+                    total
+                    aggregate { count sum { rating } avg { rating } min { rating } max { rating } }
+                }
+            }
+        '''))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['authors'], {
+            'total': 2,
+            'aggregate': [{'count': 2, 'sum': {'rating': 8.0}, 'avg': {'rating': 4.0},
+                           'min': {'rating': 3}, 'max': {'rating': 5}}],
+        })
+
+    def test_group_by_single_query(self):
+        query = '''
+            query {
+                books (filters: {author__rating__lt: 5}) {
+                    aggregate (group_by: ["author"]) { group { author } count max { year } }
+                }
+            }
+        '''
+
+        with mock.patch.object(self.manager, 'execute', wraps=self.manager.execute) as execute:
+            result = self.loop.run_until_complete(self.query(query))
+
+        self.assertIsNone(result.errors)
+        foo = self.loop.run_until_complete(self.manager.get(Author, name='foo'))
+        self.assertEqual(result.data['books']['aggregate'], [
+            {'group': {'author': foo.id}, 'count': 2, 'max': {'year': 2003}},
+        ])
+        self.assertEqual(execute.call_count, 1)  # Edges are not requested, so only aggregates are queried
+        sql = execute.call_args[0][0].sql()[0]
+        self.assertIn('GROUP BY', sql)
+        self.assertIn('MAX', sql)
+        self.assertNotIn('SUM', sql)
+
+    def test_backref(self):
+        result = self.loop.run_until_complete(self.query('''
+            query {
+                authors (filters: {name: "foo"}) {
+                    edges { node { book_set { aggregate { count min { year } } } } }
+                }
+            }
+        '''))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['authors']['edges'], [
+            {'node': {'book_set': {'aggregate': [{'count': 2, 'min': {'year': 2001}}]}}},
+        ])
@@ -0,0 +1,119 @@
+import json
+
+from graphene import Schema, ObjectType, Int, String
+from graphql import GraphQLError
+from graphql.execution.executors.asyncio import AsyncioExecutor
+from peewee import fn, SQL
+
+from graphene_peewee_async.fields import PeeweeConnectionField, ComputedField
+from graphene_peewee_async.queries import PrefetchError
+from graphene_peewee_async.registry import Registry
+from graphene_peewee_async.streaming import execute_streaming
+from graphene_peewee_async.types import PeeweeObjectType
+
+from tests.common import ApiTest, Author, Book
+from tests.common.schema import get_connection
+
+
+class TestComputedFields(ApiTest):
+
+    def setUp(self):
+        super().setUp()
+        for name, books in (('foo', 1), ('bar', 2), ('baz', 0)):
+            author = self.loop.run_until_complete(self.manager.create(Author, name=name, rating=1))
+            for i in range(books):
+                self.loop.run_until_complete(self.manager.create(Book, name='{}{}'.format(name, i), year=2000,
+                                                                 author=author))
+        node_registry = Registry()
+        manager = self.manager
+
+        class AuthorNode(PeeweeObjectType):
+            book_count = ComputedField(Int, lambda author: (
+                Book.select(fn.COUNT(SQL('*'))).where(Book.author == author.id)
+            ))
+
+            class Meta:
+                model = Author
+                manager = self.manager
+                registry = node_registry
+
+        class BookNode(PeeweeObjectType):
+            title = ComputedField(String, lambda book: fn.UPPER(book.name))
+
+            class Meta:
+                model = Book
+                manager = self.manager
+                registry = node_registry
+
+        query = type('Query', (ObjectType,), {
+            'authors': PeeweeConnectionField(get_connection(AuthorNode)),
+            'books': PeeweeConnectionField(get_connection(BookNode)),
+        })
+        self.computed_schema = Schema(query=query, auto_camelcase=False)
+
+    def execute(self, query):
+        result = self.loop.run_until_complete(
+            self.computed_schema.execute(query, executor=AsyncioExecutor(), return_promise=True)
+        )
+        self.assertIsNone(result.errors)
+        return json.loads(json.dumps(result.data))
+
+    def test_selected_filtered_and_ordered(self):
+        data = self.execute('''
+            query {
+                authors (filters: {book_count__gte: 1}, order_by: ["-book_count"]) {
+                    total
+                    edges { node { name book_count } }
+                }
+            }
+        ''')
+
+        self.assertEqual(data['authors'], {'total': 2, 'edges': [
+            {'node': {'name': 'bar', 'book_count': 2}},
+            {'node': {'name': 'foo', 'book_count': 1}},
+        ]})
+
+    def test_foreign_key_and_backref(self):
+        data = self.execute('''
+            query {
+                books (order_by: ["name"]) {
+                    edges { node { title author { name book_count } } }
+                }
+                authors (filters: {name: "bar"}) {
+                    edges { node { id book_set (order_by: ["-title"]) { edges { node { title } } } } }
+                }
+            }
+        ''')
+
+        self.assertEqual([edge['node'] for edge in data['books']['edges']], [
+            {'title': 'BAR0', 'author': {'name': 'bar', 'book_count': 2}},
+            {'title': 'BAR1', 'author': {'name': 'bar', 'book_count': 2}},
+            {'title': 'FOO0', 'author': {'name': 'foo', 'book_count': 1}},
+        ])
+        self.assertEqual(data['authors']['edges'][0]['node']['book_set']['edges'], [
+            {'node': {'title': 'BAR1'}},
+            {'node': {'title': 'BAR0'}},
+        ])
+
+    def test_foreign_key_looked_up(self):
+        data = self.execute('''
+            query {
+                books (filters: {author__name__in: ["foo", "bar"]}, order_by: ["-author__name", "name"]) {
+                    edges { node { title author { name book_count } } }
+                }
+            }
+        ''')
+
+        self.assertEqual([edge['node'] for edge in data['books']['edges']], [
+            {'title': 'FOO0', 'author': {'name': 'foo', 'book_count': 1}},
+            {'title': 'BAR0', 'author': {'name': 'bar', 'book_count': 2}},
+            {'title': 'BAR1', 'author': {'name': 'bar', 'book_count': 2}},
+        ])
+
+    def test_foreign_key_streamed(self):
+        with self.assertRaises(GraphQLError) as context:
+            self.loop.run_until_complete(execute_streaming(self.computed_schema, '''
+                query { books { edges { node { author { book_count } } } } }
+            ''', executor=AsyncioExecutor()))
+
+        self.assertIsInstance(context.exception.original_error, PrefetchError)
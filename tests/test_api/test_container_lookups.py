@@ -0,0 +1,91 @@
+import json
+
+from peewee import CharField
+from playhouse.postgres_ext import ArrayField, BinaryJSONField
+
+from graphene_peewee_async.queries import FilterError
+
+from tests.common import ApiTest
+from tests.common.models import BaseModel
+from tests.common.schema import generate_schema
+
+
+class Item(BaseModel):
+    name = CharField()
+    tags = ArrayField(CharField)
+    data = BinaryJSONField()
+
+    class Meta:
+        table_name = 'test_container_lookups_item'
+
+
+class TestContainerLookups(ApiTest):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with cls.manager.allow_sync():
+            Item.create_table()
+        cls.item_schema, _ = generate_schema(cls.manager, [Item])
+
+    @classmethod
+    def tearDownClass(cls):
+        with cls.manager.allow_sync():
+            Item.drop_table()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        self.loop.run_until_complete(self.manager.execute(Item.delete()))
+        for name, tags, data in (
+            ('foo', ['a', 'b'], {'meta': {'status': 'active', 'size': 3}, 'color': 'red'}),
+            ('bar', ['b', 'c'], {'meta': {'status': 'draft', 'size': 10}}),
+        ):
+            self.loop.run_until_complete(self.manager.create(Item, name=name, tags=tags, data=data))
+
+    def execute(self, query):
+        result = self.loop.run_until_complete(self.item_schema.execute(query, executor=self.executor,
+                                                                       return_promise=True))
+        self.assertIsNone(result.errors)
+        return json.loads(json.dumps(result.data))
+
+    def get_names(self, filters):
+        data = self.execute('query { items (filters: %s, order_by: ["name"]) { edges { node { name } } } }' % filters)
+        return [edge['node']['name'] for edge in data['items']['edges']]
+
+    def test_array_lookups(self):
+        self.assertEqual(self.get_names('{tags__contains: ["a", "b"]}'), ['foo'])
+        self.assertEqual(self.get_names('{tags__contained_by: ["a", "b", "c"]}'), ['bar', 'foo'])
+        self.assertEqual(self.get_names('{tags__overlap: ["c", "d"]}'), ['bar'])
+
+    def test_json_lookups(self):
+        self.assertEqual(self.get_names('{data__contains: {meta: {status: "draft"}}}'), ['bar'])
+        self.assertEqual(self.get_names('{data__has_key: "color"}'), ['foo'])
+        self.assertEqual(self.get_names('{data__has_any_keys: ["color", "shape"]}'), ['foo'])
+        self.assertEqual(self.get_names('{data__meta__has_keys: ["status", "size"]}'), ['bar', 'foo'])
+        self.assertEqual(self.get_names('{data__meta__status: "active"}'), ['foo'])
+        self.assertEqual(self.get_names('{data__meta__size__gt: 5}'), ['bar'])
+        self.assertEqual(self.get_names('{data__meta__status__in: ["draft", "archived"]}'), ['bar'])
+
+    def test_unsupported_lookups(self):
+        for filters, message in (
+            ('{tags__has_key: "a"}', 'Unsupported lookup "has_key" of array field "tags"'),
+            ('{name__overlap: ["a"]}', 'Unsupported lookup "overlap" of field "name"'),
+        ):
+            result = self.loop.run_until_complete(self.item_schema.execute(
+                'query { items (filters: %s) { total } }' % filters, executor=self.executor, return_promise=True))
+
+            self.assertIsInstance(result.errors[0].original_error, FilterError)
+            self.assertEqual(result.errors[0].message, message)
+
+    def test_mutation_filters(self):
+        data = self.execute('''
+            mutation {
+                delete_items (filters: {tags__overlap: ["c"], data__meta__status__in: ["draft"]}) {
+                    affected { total }
+                }
+            }
+        ''')
+
+        self.assertEqual(data['delete_items']['affected']['total'], 1)
+        self.assertEqual(self.get_names('{}'), ['foo'])
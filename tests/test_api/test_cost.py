@@ -0,0 +1,69 @@
+from unittest.mock import patch
+
+from graphene_peewee_async.cost import QueryCostMiddleware, get_table_statistics
+
+from tests.common import ApiTest, Author, Book
+
+
+class TestCost(ApiTest):
+
+    def test_cost_reported(self):
+        context = {}
+
+        result = self.loop.run_until_complete(self.query('''
+            query {
+                books (page: 1, paginate_by: 5) {
+                    edges {
+                        node {
+                            id
+                            author {
+                                id
+                                book_set (page: 1, paginate_by: 2) {
+                                    edges { node { id } }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        ''', context=context, middleware=[QueryCostMiddleware(max_cost=1000)]))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            context['query_cost'].as_dict(),
+            {
+                'queries': 1 + 5,
+                'rows': 5 + 5 * 2,
+                'joins': 1,
+                'total': (1 + 5) * 10 + (5 + 5 * 2) + 5,
+            }
+        )
+
+    def test_cost_rejected(self):
+        context = {}
+
+        with patch.object(self.manager, 'execute', wraps=self.manager.execute) as execute:
+            result = self.loop.run_until_complete(self.query('''
+                query {
+                    books {
+                        edges {
+                            node {
+                                author {
+                                    book_set {
+                                        edges { node { id } }
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            ''', context=context, middleware=[QueryCostMiddleware(max_queries=100)]))
+
+        self.assertEqual(len(result.errors), 1)
+        self.assertEqual(str(result.errors[0]), 'Query queries 1001 exceeds limit of 100')
+        self.assertEqual(execute.call_count, 0)
+
+    def test_table_statistics(self):
+        statistics = self.loop.run_until_complete(get_table_statistics(self.manager, [Author, Book]))
+
+        self.assertEqual(set(statistics), {Author, Book})
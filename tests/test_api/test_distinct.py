@@ -0,0 +1,43 @@
+from tests.common import ApiTest, Author, Book
+
+
+class TestDistinctOn(ApiTest):
+
+    def setUp(self):
+        super().setUp()
+        for name, years in (('foo', (2001, 2005, 2003)), ('bar', (2010, 2002)), ('baz', (2004,))):
+            author = self.loop.run_until_complete(self.manager.create(Author, name=name, rating=1))
+            for year in years:
+                self.loop.run_until_complete(self.manager.create(Book, name='{}{}'.format(name, year), year=year,
+                                                                 author=author))
+
+    def test_latest_per_author(self):
+        result = self.loop.run_until_complete(self.query('''
+            query {
+                books (distinct_on: ["author__name"], order_by: ["-year", "-author__name"], page: 1, paginate_by: 2) {
+                    total
+                    edges { node { name } }
+                }
+            }
+        '''))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['books'], {'total': 3, 'edges': [
+            {'node': {'name': 'foo2005'}},
+            {'node': {'name': 'baz2004'}},
+        ]})
+
+    def test_filtered(self):
+        result = self.loop.run_until_complete(self.query('''
+            query {
+                books (distinct_on: ["author"], order_by: ["year"], filters: {year__gt: 2002}) {
+                    total
+                    edges { node { name } }
+                }
+            }
+        '''))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['books']['total'], 3)
+        self.assertEqual(sorted(edge['node']['name'] for edge in result.data['books']['edges']),
+                         ['bar2010', 'baz2004', 'foo2003'])
@@ -0,0 +1,85 @@
+import json
+
+from graphene_peewee_async.cost import QueryCostMiddleware
+from graphene_peewee_async.execution import execute_async
+
+from tests.common import ApiTest, Author, Book
+
+
+class TestAsyncExecution(ApiTest):
+
+    def setUp(self):
+        super().setUp()
+        self.authors = [
+            self.loop.run_until_complete(
+                self.manager.create(Author, name='foo{}'.format(i), rating=i)
+            )
+            for i in range(2)
+        ]
+        for author in self.authors:
+            for year in (2000, 2001):
+                self.loop.run_until_complete(
+                    self.manager.create(Book, name='bar{}'.format(year), year=year, author=author)
+                )
+
+    def compare(self, query, **kwargs):
+        expected = self.loop.run_until_complete(self.query(query, **kwargs))
+        result = self.loop.run_until_complete(execute_async(
+            self.schema, query, variable_values=kwargs.get('variables'), middleware=kwargs.get('middleware')
+        ))
+        self.assertEqual(json.loads(json.dumps(result.data)), expected.data)
+        self.assertEqual([str(error) for error in result.errors or []],
+                         [str(error) for error in expected.errors or []])
+        return result
+
+    def test_query(self):
+        result = self.compare('''
+            query ($year: Int) {
+                authors (order_by: ["id"]) {
+                    total
+                    edges {
+                        node {
+                            id
+                            name
+                            book_set (filters: {year: $year}) {
+                                count
+                                edges { node { name author { rating } } }
+                            }
+                        }
+                    }
+                }
+                book (id: -1) { id }
+            }
+        ''', variables={'year': 2001}, middleware=[QueryCostMiddleware(max_cost=10 ** 6)])
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['authors']['total'], 2)
+        self.assertIsNone(result.data['book'])
+
+    def test_mutation(self):
+        result = self.loop.run_until_complete(execute_async(self.schema, '''
+            mutation {
+                update_authors (filters: {rating: 0}, data: {name: "baz"}) {
+                    affected { edges { node { id name } } }
+                }
+                delete_books (filters: {year: 2000}) {
+                    affected { total }
+                }
+            }
+        '''))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(json.loads(json.dumps(result.data)), {
+            'update_authors': {'affected': {'edges': [{'node': {'id': self.authors[0].id, 'name': 'baz'}}]}},
+            'delete_books': {'affected': {'total': 2}},
+        })
+
+    def test_errors(self):
+        result = self.compare('''
+            query {
+                authors (order_by: ["unknown"]) { total }
+                books (paginate_by: 1) { edges { node { name } } }
+            }
+        ''')
+
+        self.assertEqual(len(result.errors), 1)
@@ -0,0 +1,76 @@
+from unittest import mock
+
+from tests.common import ApiTest, Author, Book
+
+
+class TestFragments(ApiTest):
+
+    def setUp(self):
+        super().setUp()
+        author = self.loop.run_until_complete(self.manager.create(Author, name='foo', rating=42))
+        self.loop.run_until_complete(self.manager.create(Book, name='bar', year=2001, author=author))
+
+    def query_sql(self, query, variables={}):
+        with mock.patch.object(self.manager, 'execute', wraps=self.manager.execute) as execute:
+            result = self.loop.run_until_complete(self.query(query, variables))
+        self.assertIsNone(result.errors)
+        return result.data, [call[0][0].sql() for call in execute.call_args_list]
+
+    def test_same_columns_as_plain_fields(self):
+        plain_data, plain_sql = self.query_sql('''
+            query {
+                books { edges { node { name author { name } } } }
+            }
+        ''')
+        data, sql = self.query_sql('''
+            query ($withYear: Boolean!) {
+                books {
+                    edges {
+                        cursor
+                        ... on BookEdge { node { __typename ...Book } }
+                    }
+                }
+            }
+            fragment Book on Book {
+                name
+                year @include(if: $withYear)
+                author { ... on Author { name } }
+                ... @skip(if: true) { id }
+            }
+        ''', {'withYear': False})
+
+        self.assertEqual(sql, plain_sql)
+        self.assertEqual(data['books']['edges'][0]['node'], dict(plain_data['books']['edges'][0]['node'],
+                                                                 __typename='Book'))
+
+    def test_total_in_fragment(self):
+        data, sql = self.query_sql('''
+            query { books { ...Total } }
+            fragment Total on BookConnection { total }
+        ''')
+
+        self.assertEqual(data['books'], {'total': 1})
+        self.assertEqual(len(sql), 1)
+        self.assertIn('__total__', sql[0][0])
+
+    def test_directives_with_true_variables(self):
+        data, sql = self.query_sql('''
+            query ($withTotal: Boolean!, $withName: Boolean!, $skipAuthor: Boolean!) {
+                books {
+                    total @include(if: $withTotal)
+                    edges {
+                        node {
+                            name @include(if: $withName)
+                            author @skip(if: $skipAuthor) { name @include(if: $withName) }
+                        }
+                    }
+                }
+            }
+        ''', {'withTotal': True, 'withName': True, 'skipAuthor': False})
+
+        self.assertEqual(data['books'], {
+            'total': 1,
+            'edges': [{'node': {'name': 'bar', 'author': {'name': 'foo'}}}],
+        })
+        self.assertEqual(len(sql), 1)
+        self.assertIn('__total__', sql[0][0])
@@ -0,0 +1,123 @@
+import json
+
+from graphene_peewee_async.incremental import execute_incremental
+
+from tests.common import ApiTest, Author, Book
+
+
+class TestIncremental(ApiTest):
+
+    def setUp(self):
+        super().setUp()
+        self.author = self.loop.run_until_complete(
+            self.manager.create(Author, name='foo', rating=42)
+        )
+        self.books = [
+            self.loop.run_until_complete(
+                self.manager.create(Book, name='bar{}'.format(i), year=2000 + i, author=self.author)
+            )
+            for i in range(5)
+        ]
+
+    def execute(self, query, **kwargs):
+
+        async def run():
+            result = await execute_incremental(self.schema, query, executor=self.executor, **kwargs)
+            return [payload async for payload in result]
+
+        return json.loads(json.dumps(self.loop.run_until_complete(run())))
+
+    def test_defer(self):
+        payloads = self.execute('''
+            query {
+                books (order_by: ["id"], paginate_by: 2) {
+                    edges {
+                        node {
+                            id
+                            author @defer(label: "author") { name }
+                        }
+                    }
+                }
+            }
+        ''')
+
+        self.assertEqual(payloads[0], {
+            'data': {'books': {'edges': [{'node': {'id': book.id}} for book in self.books[:2]]}},
+            'hasNext': True,
+        })
+        incremental = [payload['incremental'][0] for payload in payloads[1:]]
+        self.assertCountEqual(incremental, [
+            {'data': {'author': {'name': 'foo'}}, 'path': ['books', 'edges', index, 'node'], 'label': 'author'}
+            for index in range(2)
+        ])
+        self.assertEqual([payload['hasNext'] for payload in payloads], [True, True, False])
+
+    def test_stream_root_edges(self):
+        payloads = self.execute('''
+            query {
+                books (order_by: ["id"]) {
+                    total
+                    edges @stream(initial_count: 1) {
+                        node { id name }
+                    }
+                }
+            }
+        ''', fetch_size=3)
+
+        node = lambda book: {'node': {'id': book.id, 'name': book.name}}
+        self.assertEqual(payloads, [
+            {'data': {'books': {'total': 5, 'edges': [node(self.books[0])]}}, 'hasNext': True},
+            # Rest of the first fetched batch
+            {'incremental': [{'items': [node(book) for book in self.books[1:3]], 'path': ['books', 'edges', 1]}],
+             'hasNext': True},
+            {'incremental': [{'items': [node(book) for book in self.books[3:]], 'path': ['books', 'edges', 3]}],
+             'hasNext': False},
+        ])
+
+    def test_stream_backref_edges(self):
+        payloads = self.execute('''
+            query {
+                author (id: %s) {
+                    id
+                    book_set {
+                        edges @stream(initial_count: 2) {
+                            node { name }
+                        }
+                    }
+                }
+            }
+        ''' % self.author.id)
+
+        # Backref rows come in no particular order
+        initial_edges = payloads[0]['data']['author']['book_set']['edges']
+        incremental = payloads[1]['incremental'][0]
+        self.assertEqual(len(initial_edges), 2)
+        self.assertEqual(len(incremental['items']), 3)
+        self.assertCountEqual([edge['node']['name'] for edge in initial_edges + incremental['items']],
+                              [book.name for book in self.books])
+        self.assertEqual(incremental['path'], ['author', 'book_set', 'edges', 2])
+        self.assertEqual([payload['hasNext'] for payload in payloads], [True, False])
+
+    def test_defer_root_and_backref(self):
+        payloads = self.execute('''
+            query {
+                author (id: %s) @defer {
+                    id
+                    book_set @defer { total }
+                }
+                books (paginate_by: 1) { total }
+            }
+        ''' % self.author.id)
+
+        self.assertEqual(payloads, [
+            {'data': {'books': {'total': 5}}, 'hasNext': True},
+            {'incremental': [{'data': {'author': {'id': self.author.id}}, 'path': []}], 'hasNext': True},
+            {'incremental': [{'data': {'book_set': {'total': 5}}, 'path': ['author']}], 'hasNext': False},
+        ])
+
+    def test_no_incremental(self):
+        payloads = self.execute('{ authors { edges { node { name } } } }')
+
+        self.assertEqual(payloads, [
+            {'data': {'authors': {'edges': [{'node': {'name': 'foo'}}]}}, 'hasNext': False},
+        ])
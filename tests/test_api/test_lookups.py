@@ -0,0 +1,61 @@
+from peewee import OP
+
+from graphene_peewee_async.queries import compile_filter_key, compile_order_item
+
+from tests.common import ApiTest, Author, Book
+
+
+class TestLookups(ApiTest):
+
+    def setUp(self):
+        super().setUp()
+        for rating, name in ((1, 'foo'), (5, 'bar')):
+            author = self.loop.run_until_complete(self.manager.create(Author, name=name, rating=rating))
+            self.loop.run_until_complete(self.manager.create(Book, name=name, year=2000 + rating, author=author))
+
+    def test_compiled_once(self):
+        compile_filter_key.cache_clear()
+        query = '''
+            query {
+                books (filters: {author__rating__gte: 2}, order_by: ["-author__rating"]) {
+                    edges { node { name author { rating } } }
+                }
+            }
+        '''
+
+        for _ in range(2):
+            result = self.loop.run_until_complete(self.query(query))
+            self.assertIsNone(result.errors)
+            self.assertEqual(result.data['books']['edges'], [{'node': {'name': 'bar', 'author': {'rating': 5}}}])
+        self.assertEqual(compile_filter_key.cache_info().hits, 1)
+
+    def test_compiled_paths(self):
+        self.assertEqual(compile_filter_key(Book, 'author__rating__gte', False),
+                         ((('author', True), ('rating', False)), OP.GTE, None))
+        self.assertEqual(compile_filter_key(Book, 'author', True), ((('author', False),), OP.IS, None))
+        self.assertEqual(compile_filter_key(Author, 'book_set__year__gt', False),
+                         ((('book_set', False),), None, 'year__gt'))
+        self.assertEqual(compile_order_item(Book, '-author__rating'), (('author', 'rating'), True))
+        with self.assertRaises(AttributeError):
+            compile_order_item(Book, 'author__missing')
+
+    def test_backref_filter_does_not_multiply_rows(self):
+        author = self.loop.run_until_complete(self.manager.get(Author, name='bar'))
+        for year in (2006, 2007):
+            self.loop.run_until_complete(self.manager.create(Book, name='baz', year=year, author=author))
+
+        result = self.loop.run_until_complete(self.query('''
+            query {
+                authors (filters: {book_set__year__gt: 2004}, page: 1, paginate_by: 10) {
+                    total
+                    edges { node { name } }
+                }
+                same_book: authors (filters: {book_set__year__gt: 2005, book_set__name: "bar"}) {
+                    total
+                }
+            }
+        '''))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['authors'], {'total': 1, 'edges': [{'node': {'name': 'bar'}}]})
+        self.assertEqual(result.data['same_book'], {'total': 0})
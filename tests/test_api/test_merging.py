@@ -0,0 +1,74 @@
+from unittest import mock
+
+from tests.common import ApiTest, Author, Book
+
+
+class TestMerging(ApiTest):
+
+    def setUp(self):
+        super().setUp()
+        for rating, name in ((1, 'foo'), (5, 'bar')):
+            author = self.loop.run_until_complete(self.manager.create(Author, name=name, rating=rating))
+            self.loop.run_until_complete(self.manager.create(Book, name=name, year=2000 + rating, author=author))
+
+    def query_sql(self, query, variables={}):
+        with mock.patch.object(self.manager, 'execute', wraps=self.manager.execute) as execute:
+            result = self.loop.run_until_complete(self.query(query, variables, context={}))
+        self.assertIsNone(result.errors)
+        return result.data, [call[0][0].sql()[0] for call in execute.call_args_list]
+
+    def test_aliases_with_same_arguments(self):
+        data, sql = self.query_sql('''
+            query {
+                names: books (order_by: ["name"]) { edges { node { name } } }
+                years: books (order_by: ["name"]) { total edges { node { year author { name } } } }
+                other: books (filters: {year: 2001}) { edges { node { name } } }
+            }
+        ''')
+
+        self.assertEqual(len(sql), 2)
+        self.assertEqual(data['names']['edges'], [{'node': {'name': 'bar'}}, {'node': {'name': 'foo'}}])
+        self.assertEqual(data['years'], {'total': 2, 'edges': [
+            {'node': {'year': 2005, 'author': {'name': 'bar'}}},
+            {'node': {'year': 2001, 'author': {'name': 'foo'}}},
+        ]})
+        self.assertEqual(data['other']['edges'], [{'node': {'name': 'foo'}}])
+
+    def test_fragments_and_nodes(self):
+        author = self.loop.run_until_complete(self.manager.get(Author, name='foo'))
+        data, sql = self.query_sql('''
+            query ($id: Int) {
+                a: author (id: $id) { name }
+                b: author (id: $id) { rating }
+                books (filters: {name: "foo"}) { ...Names }
+                ...Years
+            }
+            fragment Names on BookConnection { edges { node { name } } }
+            fragment Years on Query { books (filters: {name: "foo"}) { edges { node { year } } } }
+        ''', {'id': author.id})
+
+        self.assertEqual(len(sql), 2)
+        self.assertEqual(data['a'], {'name': 'foo'})
+        self.assertEqual(data['b'], {'rating': 1})
+        self.assertEqual(data['books']['edges'], [{'node': {'name': 'foo', 'year': 2001}}])
+
+    def test_operations_sharing_context(self):
+        context = {}
+        query = '''
+            query {
+                books (order_by: ["name"]) { edges { node { %s } } }
+            }
+        '''
+        result = self.loop.run_until_complete(self.query(query % 'name', context=context))
+        self.assertIsNone(result.errors)
+        author = self.loop.run_until_complete(self.manager.get(Author, name='foo'))
+        self.loop.run_until_complete(self.manager.create(Book, name='baz', year=2010, author=author))
+
+        result = self.loop.run_until_complete(self.query(query % 'name year', context=context))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['books']['edges'], [
+            {'node': {'name': 'bar', 'year': 2005}},
+            {'node': {'name': 'baz', 'year': 2010}},
+            {'node': {'name': 'foo', 'year': 2001}},
+        ])
@@ -0,0 +1,147 @@
+from unittest import mock
+
+from graphene import Schema, ObjectType
+from graphql.execution.executors.asyncio import AsyncioExecutor
+
+from graphene_peewee_async.fields import PeeweeConnectionField
+from graphene_peewee_async.registry import Registry
+
+from tests.common import ApiTest, Author, Book
+from tests.common.schema import get_node, get_connection
+
+
+class TestPagination(ApiTest):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        registry = Registry()
+        book_connection = get_connection(get_node(cls.manager, Book, registry))
+        author_connection = get_connection(get_node(cls.manager, Author, registry))
+
+        class Query(ObjectType):
+            books = PeeweeConnectionField(book_connection, default_paginate_by=2, max_paginate_by=3)
+            strict_books = PeeweeConnectionField(book_connection, max_paginate_by=3, strict_pagination=True)
+            authors = PeeweeConnectionField(author_connection)
+
+        cls.paginated_schema = Schema(query=Query, auto_camelcase=False)
+
+    def setUp(self):
+        super().setUp()
+        author = self.loop.run_until_complete(
+            self.manager.create(Author, name='foo', rating=42)
+        )
+        self.books = [
+            self.loop.run_until_complete(
+                self.manager.create(Book, name='bar{}'.format(i), year=2000 + i, author=author)
+            )
+            for i in range(5)
+        ]
+
+    def execute(self, query):
+        return self.loop.run_until_complete(self.paginated_schema.execute(
+            query,
+            return_promise=True,
+            executor=AsyncioExecutor()
+        ))
+
+    def test_default_and_max(self):
+        result = self.execute('''
+            query {
+                default: books (order_by: ["id"]) {
+                    total
+                    edges { node { id } }
+                }
+                limited: books (order_by: ["id"], page: 2, paginate_by: 100) {
+                    total
+                    edges { node { id } }
+                }
+            }
+        ''')
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            result.data,
+            {
+                'default': {
+                    'total': 5,
+                    'edges': [{'node': {'id': book.id}} for book in self.books[:2]],
+                },
+                'limited': {
+                    'total': 5,
+                    'edges': [{'node': {'id': book.id}} for book in self.books[3:]],
+                },
+            }
+        )
+
+    def test_strict(self):
+        result = self.execute('''
+            query {
+                strict_books {
+                    edges { node { id } }
+                }
+                too_large: strict_books (paginate_by: 4) {
+                    edges { node { id } }
+                }
+            }
+        ''')
+
+        self.assertEqual(
+            sorted(str(error) for error in result.errors),
+            ['`paginate_by` is required', '`paginate_by` must not exceed 3']
+        )
+
+    def test_global_settings_apply_to_backrefs(self):
+        PeeweeConnectionField.max_paginate_by = 1
+        try:
+            result = self.execute('''
+                query {
+                    authors {
+                        edges {
+                            node {
+                                id
+                                book_set {
+                                    count
+                                    total
+                                }
+                            }
+                        }
+                    }
+                }
+            ''')
+        finally:
+            PeeweeConnectionField.max_paginate_by = None
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['authors']['edges'][0]['node']['book_set'], {'count': 1, 'total': 5})
+
+    def test_mutation_affected(self):
+        result = self.loop.run_until_complete(self.query('''
+            mutation {
+                update_books (
+                    filters: {year__gte: 2000},
+                    data: {name: "baz"}
+                ) {
+                    affected (paginate_by: 2) {
+                        total
+                        count
+                    }
+                }
+            }
+        '''))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data, {'update_books': {'affected': {'total': 5, 'count': 2}}})
+
+    def test_strict_mutation_affected(self):
+        with mock.patch.multiple(PeeweeConnectionField, strict_pagination=True, max_paginate_by=3):
+            result = self.loop.run_until_complete(self.query('''
+                mutation {
+                    update_books (filters: {year__gte: 2000}, data: {name: "baz"}) {
+                        affected { total count }
+                    }
+                }
+            '''))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data, {'update_books': {'affected': {'total': 5, 'count': 3}}})
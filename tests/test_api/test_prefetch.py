@@ -0,0 +1,60 @@
+import json
+from unittest import mock
+
+from tests.common import ApiTest, Author, Book
+from tests.common.schema import generate_schema
+
+
+class TestPrefetch(ApiTest):
+
+    def setUp(self):
+        super().setUp()
+        for name in ('foo', 'bar'):
+            author = self.loop.run_until_complete(self.manager.create(Author, name=name, rating=1))
+            self.loop.run_until_complete(self.manager.execute(Book.insert_many([
+                {'name': '{}{}'.format(name, i), 'year': 2000 + i, 'author': author.id} for i in range(3)
+            ])))
+
+    def execute(self, query, **node_options):
+        schema, executor = generate_schema(self.manager, [Book, Author], **node_options)
+        with mock.patch.object(self.manager, 'execute', wraps=self.manager.execute) as execute:
+            result = self.loop.run_until_complete(
+                schema.execute(query, executor=executor, return_promise=True)
+            )
+        self.assertIsNone(result.errors)
+        return json.loads(json.dumps(result.data)), [call[0][0].sql()[0] for call in execute.call_args_list]
+
+    def get_authors(self, data):
+        return sorted((edge['node']['name'], edge['node']['author']['name']) for edge in data['books']['edges'])
+
+    def test_prefetched_by_node_option(self):
+        query = '{ books { edges { node { name author { id name } } } } }'
+        joined, joined_sql = self.execute(query)
+        prefetched, prefetched_sql = self.execute(query, prefetch=['author'])
+
+        self.assertEqual(self.get_authors(prefetched), self.get_authors(joined))
+        self.assertEqual(len(self.get_authors(prefetched)), 6)
+        self.assertIn('JOIN', joined_sql[0])
+        self.assertEqual(len(prefetched_sql), 2)
+        self.assertNotIn('JOIN', prefetched_sql[0])
+        self.assertIn(' IN ', prefetched_sql[1])
+
+    def test_auto_prefetch_by_width_and_page_size(self):
+        _, unpaginated_sql = self.execute('{ books { edges { node { author { name } } } } }', auto_prefetch=True)
+        _, paginated_sql = self.execute('{ books (page: 1, paginate_by: 10) { edges { node { author { name } } } } }',
+                                        auto_prefetch=True)
+
+        self.assertEqual(len(unpaginated_sql), 2)
+        self.assertEqual(len(paginated_sql), 1)
+
+    def test_joined_when_filtered_or_ordered(self):
+        data, sql = self.execute('''
+            {
+                books (filters: {author__name: "bar"}, order_by: ["-author__name", "name"]) {
+                    edges { node { name author { name } } }
+                }
+            }
+        ''', prefetch=['author'])
+
+        self.assertEqual(len(sql), 1)
+        self.assertEqual(self.get_authors(data), [('bar0', 'bar'), ('bar1', 'bar'), ('bar2', 'bar')])
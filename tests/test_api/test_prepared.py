@@ -0,0 +1,74 @@
+from graphene_peewee_async.prepared import PreparedStatementManager, to_prepared_sql
+
+from tests.common import ApiTest, Author, Book, db
+from tests.common.schema import generate_schema
+
+
+class TestPrepared(ApiTest):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.prepared_manager = PreparedStatementManager(db, loop=cls.loop)
+        cls.schema, cls.executor = generate_schema(cls.prepared_manager, [Book, Author])
+
+    def setUp(self):
+        super().setUp()
+        self.prepared_manager.stats.clear()
+
+    def query_authors(self, rating):
+        return self.loop.run_until_complete(self.query('''
+            query {
+                authors (filters: {rating__gt: ''' + str(rating) + '''}) {
+                    edges { node { name } }
+                }
+            }
+        '''))
+
+    def test_prepared_select(self):
+        self.loop.run_until_complete(
+            self.manager.create(Author, name='foo', rating=42)
+        )
+
+        results = [self.query_authors(rating) for rating in (0, 1, 2, 3, 100)]
+
+        for result in results[:-1]:
+            self.assertIsNone(result.errors)
+            self.assertEqual(result.data, {'authors': {'edges': [{'node': {'name': 'foo'}}]}})
+        self.assertEqual(results[-1].data, {'authors': {'edges': []}})
+        stats, = self.prepared_manager.stats.values()
+        self.assertEqual(stats.plain_count, PreparedStatementManager.prepare_after)
+        self.assertEqual(stats.prepared_count, 5 - PreparedStatementManager.prepare_after)
+        self.assertFalse(stats.disabled)
+
+    def test_prepared_update(self):
+        author = self.loop.run_until_complete(
+            self.manager.create(Author, name='foo', rating=42)
+        )
+
+        for rating in range(4):
+            rows = self.loop.run_until_complete(self.prepared_manager.execute(
+                Author.update(rating=rating).where(Author.id == author.id)
+            ))
+            self.assertEqual(rows, 1)
+
+        author = self.loop.run_until_complete(self.manager.get(Author, id=author.id))
+        self.assertEqual(author.rating, 3)
+
+    def test_generic_plan_fallback(self):
+        self.prepared_manager.generic_plan_slowdown = 0
+        try:
+            for rating in range(10):
+                self.query_authors(rating)
+        finally:
+            del self.prepared_manager.generic_plan_slowdown
+
+        stats, = self.prepared_manager.stats.values()
+        self.assertTrue(stats.disabled)
+        self.assertEqual(stats.prepared_count, PreparedStatementManager.generic_plan_check)
+
+    def test_to_prepared_sql(self):
+        self.assertEqual(
+            to_prepared_sql('SELECT 1 WHERE "a" = %s AND "b" LIKE \'5%%\' AND "c" IN (%s, %s)'),
+            'SELECT 1 WHERE "a" = $1 AND "b" LIKE \'5%\' AND "c" IN ($2, $3)'
+        )
@@ -0,0 +1,75 @@
+from unittest.mock import patch
+
+from peewee_async import Manager, PooledPostgresqlDatabase
+
+from tests.common import ApiTest, Author, Book
+from tests.common.schema import generate_schema
+
+
+class TestReplica(ApiTest):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        replica_db = PooledPostgresqlDatabase('graphene_test', user='postgres', host='localhost')
+        cls.replica_manager = Manager(replica_db, loop=cls.loop)
+        cls.loop.run_until_complete(cls.replica_manager.connect())
+        cls.schema, cls.executor = generate_schema(cls.manager, [Book, Author], cls.replica_manager)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.loop.run_until_complete(cls.replica_manager.close())
+        super().tearDownClass()
+
+    def test_query_reads_from_replica(self):
+        author = self.loop.run_until_complete(
+            self.manager.create(Author, name='foo', rating=42)
+        )
+
+        with patch.object(self.replica_manager, 'execute', wraps=self.replica_manager.execute) as replica_execute, \
+                patch.object(self.manager, 'execute', wraps=self.manager.execute) as primary_execute:
+            result = self.loop.run_until_complete(self.query('''
+                query {
+                    authors {
+                        edges { node { id } }
+                    }
+                    author (id: ''' + str(author.id) + ''') {
+                        name
+                    }
+                }
+            '''))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            result.data,
+            {
+                'authors': {'edges': [{'node': {'id': author.id}}]},
+                'author': {'name': author.name},
+            }
+        )
+        self.assertEqual(replica_execute.call_count, 2)
+        self.assertEqual(primary_execute.call_count, 0)
+
+    def test_read_your_writes(self):
+        context = {}
+
+        with patch.object(self.replica_manager, 'execute', wraps=self.replica_manager.execute) as replica_execute:
+            self.loop.run_until_complete(self.query('''
+                mutation {
+                    create_author (name: "foo", rating: 42) {
+                        affected { id }
+                    }
+                }
+            ''', context=context))
+            result = self.loop.run_until_complete(self.query('''
+                query {
+                    authors {
+                        edges { node { name } }
+                    }
+                }
+            ''', context=context))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data, {'authors': {'edges': [{'node': {'name': 'foo'}}]}})
+        self.assertTrue(context['read_from_primary'])
+        self.assertEqual(replica_execute.call_count, 0)
@@ -0,0 +1,97 @@
+import json
+
+from graphene import Schema, ObjectType
+from graphql.execution.executors.asyncio import AsyncioExecutor
+
+from graphene_peewee_async.execution import execute_async
+from graphene_peewee_async.fields import PeeweeConnectionField
+from graphene_peewee_async.registry import Registry
+from graphene_peewee_async.types import PeeweeObjectType
+
+from tests.common import ApiTest, Author, Book
+from tests.common.schema import get_node, get_connection
+
+
+class TestResolvers(ApiTest):
+
+    def setUp(self):
+        super().setUp()
+        self.author = self.loop.run_until_complete(
+            self.manager.create(Author, name='foo', rating=42)
+        )
+        self.book = self.loop.run_until_complete(
+            self.manager.create(Book, name='bar', year=2000, author=self.author)
+        )
+
+    def test_columns_and_foreign_keys(self):
+        result = self.loop.run_until_complete(self.query('''
+            query {
+                books {
+                    edges {
+                        node {
+                            id
+                            name
+                            author_id
+                            author { id name }
+                        }
+                    }
+                }
+                authors {
+                    edges { node { id } }
+                }
+            }
+        '''))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['books']['edges'], [{'node': {
+            'id': self.book.id,
+            'name': 'bar',
+            'author_id': self.author.id,
+            'author': {'id': self.author.id, 'name': 'foo'},
+        }}])
+
+    def test_custom_resolver(self):
+        node_registry = Registry()
+
+        class BookNode(PeeweeObjectType):
+
+            class Meta:
+                model = Book
+                manager = self.manager
+                registry = node_registry
+
+            def resolve_name(self, info):
+                return self.name.upper()
+
+        get_node(self.manager, Author, node_registry)
+        query = type('Query', (ObjectType,), {'books': PeeweeConnectionField(get_connection(BookNode))})
+        schema = Schema(query=query, auto_camelcase=False)
+
+        result = self.loop.run_until_complete(
+            schema.execute('{ books { edges { node { name year } } } }',
+                           executor=AsyncioExecutor(), return_promise=True)
+        )
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['books']['edges'][0]['node'], {'name': 'BAR', 'year': 2000})
+
+    def test_skip_serialize(self):
+        registry = Registry()
+        node = get_node(self.manager, Book, registry, skip_serialize=True)
+        get_node(self.manager, Author, registry)
+        query = type('Query', (ObjectType,), {'books': PeeweeConnectionField(get_connection(node))})
+        schema = Schema(query=query, auto_camelcase=False)
+
+        self.assertEqual(node._meta.raw_fields, {'id', 'name', 'year', 'author_id'})
+        result = self.loop.run_until_complete(execute_async(schema, '''
+            query { books { edges { node { id name year author_id author { id name } } } } }
+        '''))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(json.loads(json.dumps(result.data['books']['edges'][0]['node'])), {
+            'id': self.book.id,
+            'name': 'bar',
+            'year': 2000,
+            'author_id': self.author.id,
+            'author': {'id': self.author.id, 'name': 'foo'},
+        })
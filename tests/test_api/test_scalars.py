@@ -0,0 +1,68 @@
+import datetime
+import decimal
+
+import peewee
+from graphene import Float, ObjectType, Field, Schema
+from graphene.types.datetime import DateTime
+from graphene.types.decimal import Decimal
+from graphene.types.generic import GenericScalar
+from playhouse import postgres_ext
+from psycopg2.tz import FixedOffsetTimezone
+
+from graphene_peewee_async import converter
+from graphene_peewee_async.converter import convert_peewee_field
+from graphene_peewee_async.scalars import CachedDateTime, DecimalString, JSON, register_fast_scalars
+
+from tests.common import BaseTest
+
+
+class TestScalars(BaseTest):
+
+    def tearDown(self):
+        convert_peewee_field.register(peewee.DateField, converter.convert_date_to_string)
+        convert_peewee_field.register(peewee.DateTimeField, converter.convert_date_to_string)
+        convert_peewee_field.register(postgres_ext.JSONField, converter.convert_field_to_json)
+        convert_peewee_field.register(postgres_ext.BinaryJSONField, converter.convert_field_to_json)
+        convert_peewee_field.register(peewee.DecimalField, converter.convert_field_to_float)
+
+    def test_datetime(self):
+        value = datetime.datetime(2020, 1, 2, 3, 4, 5)
+        self.assertEqual(CachedDateTime.serialize(value), value.isoformat())
+        self.assertEqual(CachedDateTime.serialize(datetime.date(2020, 1, 2)), '2020-01-02')
+        # Same instant in different zones
+        utc = datetime.datetime(2020, 1, 2, 3, tzinfo=FixedOffsetTimezone(0))
+        local = datetime.datetime(2020, 1, 2, 6, tzinfo=FixedOffsetTimezone(180))
+        self.assertEqual(CachedDateTime.serialize(utc), '2020-01-02T03:00:00+00:00')
+        self.assertEqual(CachedDateTime.serialize(local), '2020-01-02T06:00:00+03:00')
+
+    def test_decimal(self):
+        self.assertEqual(DecimalString.serialize(decimal.Decimal('12.50')), '12.50')
+        self.assertEqual(DecimalString.serialize(decimal.Decimal('1E+3')), '1000')
+        self.assertEqual(DecimalString.parse_value('0.1'), decimal.Decimal('0.1'))
+        self.assertIsNone(DecimalString.parse_value('foo'))
+
+    def test_register(self):
+        self.assertIsInstance(convert_peewee_field(peewee.DateTimeField()), DateTime)
+        self.assertIsInstance(convert_peewee_field(peewee.DecimalField()), Float)
+        self.assertIsInstance(convert_peewee_field(postgres_ext.BinaryJSONField()), GenericScalar)
+
+        register_fast_scalars(decimal_as_string=True)
+
+        self.assertIsInstance(convert_peewee_field(peewee.DateField()), CachedDateTime)
+        self.assertIsInstance(convert_peewee_field(postgres_ext.DateTimeTZField()), CachedDateTime)
+        self.assertIsInstance(convert_peewee_field(peewee.DecimalField()), DecimalString)
+        self.assertIsInstance(convert_peewee_field(postgres_ext.BinaryJSONField()), JSON)
+
+    def test_with_stock_scalars(self):
+        register_fast_scalars(decimal_as_string=True)
+        query = type('Query', (ObjectType,), {
+            'created': Field(DateTime),
+            'price': Field(Decimal),
+            'cached_created': convert_peewee_field(peewee.DateTimeField()),
+            'cached_price': convert_peewee_field(peewee.DecimalField()),
+        })
+
+        type_map = Schema(query=query).get_type_map()
+
+        for name in ('DateTime', 'Decimal', 'CachedDateTime', 'DecimalString'):
+            self.assertIn(name, type_map)
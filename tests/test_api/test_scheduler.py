@@ -0,0 +1,60 @@
+import asyncio
+
+from graphene_peewee_async.scheduler import QueryScheduler
+
+from tests.common import ApiTest, Author
+
+
+class TestScheduler(ApiTest):
+
+    def test_concurrency_limit(self):
+        author = self.loop.run_until_complete(
+            self.manager.create(Author, name='foo', rating=42)
+        )
+        scheduler = QueryScheduler(max_concurrency=1)
+
+        result = self.loop.run_until_complete(self.query('''
+            query {
+                first: authors {
+                    edges { node { id } }
+                }
+                second: authors (order_by: ["name"]) {
+                    edges { node { name } }
+                }
+                third: author (id: ''' + str(author.id) + ''') {
+                    rating
+                }
+            }
+        ''', context={'query_scheduler': scheduler}))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            result.data,
+            {
+                'first': {'edges': [{'node': {'id': author.id}}]},
+                'second': {'edges': [{'node': {'name': author.name}}]},
+                'third': {'rating': author.rating},
+            }
+        )
+        self.assertEqual(sorted(name for name, _ in scheduler.waits), ['first', 'second', 'third'])
+        self.assertEqual(scheduler.running, 0)
+
+    def test_priority(self):
+        scheduler = QueryScheduler(max_concurrency=1)
+        started = []
+
+        async def job(name):
+            started.append(name)
+            await asyncio.sleep(0)
+
+        async def run_all():
+            await asyncio.gather(
+                scheduler.run(job('blocker')),
+                scheduler.run(job('low'), priority=-1),
+                scheduler.run(job('normal')),
+                scheduler.run(job('high'), priority=10),
+            )
+
+        self.loop.run_until_complete(run_all())
+
+        self.assertEqual(started, ['blocker', 'high', 'normal', 'low'])
@@ -0,0 +1,28 @@
+from graphene_peewee_async.cost import CostAnalyzer
+from graphene_peewee_async.mutations import get_node_arguments, CreateOneMutation, UpdateOneMutation
+from graphene_peewee_async.registry import Registry
+
+from tests.common import ApiTest, Author
+from tests.common.schema import get_node, get_connection
+
+
+class TestSchemaConstruction(ApiTest):
+
+    def test_backref_connection_made_once(self):
+        author_type = self.schema.get_type('Author')
+        analyzer = CostAnalyzer(self.schema)
+        field = analyzer.get_graphene_field(author_type, 'book_set')
+
+        self.assertIs(analyzer.get_graphene_field(author_type, 'book_set'), field)
+        self.assertIs(self.schema.get_type(field.type._meta.name).graphene_type, field.type)
+
+    def test_mutation_arguments_converted_once(self):
+        node_class = get_node(self.manager, Author, Registry())
+        connection_class = get_connection(node_class)
+        create_class = CreateOneMutation.generate(node_class, connection_class)
+        update_class = UpdateOneMutation.generate(node_class, connection_class)
+
+        self.assertIs(get_node_arguments(node_class), get_node_arguments(node_class))
+        self.assertIn('Arguments', node_class._meta.generated_types)
+        self.assertEqual(set(create_class._meta.arguments), set(update_class._meta.arguments))
+        self.assertEqual(set(create_class._meta.arguments), {'id', 'name', 'rating', 'book_set'})
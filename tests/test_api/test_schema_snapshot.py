@@ -0,0 +1,62 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+from graphql.utils.introspection_query import introspection_query
+
+from graphene_peewee_async.fields import PeeweeConnectionField
+from graphene_peewee_async.schema_snapshot import SchemaSnapshot
+
+from tests.common import ApiTest, Author, Book
+from tests.common.schema import generate_schema
+
+
+class TestSchemaSnapshot(ApiTest):
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'schema.json')
+
+    def test_introspection_cached_in_file(self):
+        self.assertTrue(SchemaSnapshot(self.schema, self.path).warm())
+
+        snapshot = SchemaSnapshot(self.schema, self.path)
+        self.assertFalse(snapshot.warm())
+        with mock.patch.object(self.schema, 'execute') as execute:
+            cached = snapshot.execute_introspection(introspection_query)
+        execute.assert_not_called()
+        expected = self.schema.execute(introspection_query).data
+        self.assertEqual(cached.data, expected)
+        self.assertIn('Author_book_set_Connection', snapshot.sdl)
+        cached.data['__schema']['types'].clear()  # Cached result is not shared with callers
+        self.assertEqual(snapshot.execute_introspection(introspection_query).data, expected)
+
+    def test_changed_schema_ignores_file(self):
+        SchemaSnapshot(self.schema, self.path).warm()
+        schema, _ = generate_schema(self.manager, [Author])
+        with mock.patch.object(PeeweeConnectionField, 'typed_filters', True):
+            typed_schema, _ = generate_schema(self.manager, [Book, Author])
+
+        self.assertEqual(SchemaSnapshot(schema, self.path).results, {})
+        self.assertEqual(SchemaSnapshot(typed_schema, self.path).results, {})
+        self.assertEqual(SchemaSnapshot(self.schema, self.path, version=2).results, {})
+
+    def test_requests_cached_in_memory_only(self):
+        snapshot = SchemaSnapshot(self.schema, self.path, max_results=2)
+        for name in ('Author', 'Book', 'Author', 'Query'):
+            result = snapshot.execute_introspection('{ __type(name: "%s") { name } }' % name)
+            self.assertEqual(result.data, {'__type': {'name': name}})
+
+        self.assertEqual([json.loads(result)['__type']['name'] for result in snapshot.results.values()],
+                         ['Author', 'Query'])
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_other_queries_executed_as_usual(self):
+        snapshot = SchemaSnapshot(self.schema, self.path)
+
+        self.assertIsNone(snapshot.execute_introspection('{ __typename authors { total } }'))
+        self.assertIsNone(snapshot.execute_introspection('mutation { __typename }'))
+        self.assertFalse(os.path.exists(self.path))
@@ -0,0 +1,57 @@
+from graphene_peewee_async.queries import FilterError
+
+from tests.common import ApiTest, Author, Book
+
+
+class TestSearch(ApiTest):
+
+    def setUp(self):
+        super().setUp()
+        author = self.loop.run_until_complete(self.manager.create(Author, name='Jules Verne', rating=5))
+        for name in ('Journey to the Center of the Earth', 'From the Earth to the Moon', 'Around the Moon'):
+            self.loop.run_until_complete(self.manager.create(Book, name=name, year=1870, author=author))
+
+    def test_search(self):
+        result = self.loop.run_until_complete(self.query('''
+            query {
+                books (filters: {name__search: "moon -around"}) { edges { node { name } } }
+                authors (filters: {book_set__name__search: "journeys"}) { edges { node { name } } }
+            }
+        '''))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['books']['edges'], [{'node': {'name': 'From the Earth to the Moon'}}])
+        self.assertEqual(result.data['authors']['edges'], [{'node': {'name': 'Jules Verne'}}])
+
+    def test_order_by_rank(self):
+        result = self.loop.run_until_complete(self.query('''
+            query {
+                books (filters: {name__search: "earth or moon", author__name__search: "verne"},
+                       order_by: ["-name__rank", "name"]) {
+                    edges { node { name } }
+                }
+            }
+        '''))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data['books']['edges'], [
+            {'node': {'name': 'From the Earth to the Moon'}},
+            {'node': {'name': 'Around the Moon'}},
+            {'node': {'name': 'Journey to the Center of the Earth'}},
+        ])
+
+    def test_rank_without_search(self):
+        result = self.loop.run_until_complete(self.query('''
+            query {
+                books (order_by: ["-name__rank"]) { edges { node { name } } }
+                authors (filters: {name__search: "verne"}, order_by: ["book_set__name__rank"]) { total }
+            }
+        '''))
+
+        self.assertEqual(len(result.errors), 2)
+        for error, message in zip(result.errors, (
+            'Order by "name__rank" requires "name__search" filter',
+            'Order by "book_set__name__rank" requires "book_set__name__search" filter',
+        )):
+            self.assertIsInstance(error.original_error, FilterError)
+            self.assertEqual(error.message, message)
@@ -0,0 +1,59 @@
+from graphene_peewee_async.database import Snapshot
+
+from tests.common import ApiTest, Author
+
+
+class TestSnapshot(ApiTest):
+
+    def test_query_sees_snapshot(self):
+        author = self.loop.run_until_complete(
+            self.manager.create(Author, name='foo', rating=42)
+        )
+
+        async def run():
+            async with Snapshot(self.manager) as snapshot:
+                await snapshot.execute(Author.select())  # Takes the snapshot
+                await self.manager.create(Author, name='bar', rating=1)
+                return await self.query('''
+                    query {
+                        authors {
+                            total
+                            edges { node { id } }
+                        }
+                        author (id: ''' + str(author.id) + ''') {
+                            name
+                        }
+                    }
+                ''', context={'snapshot': snapshot})
+
+        result = self.loop.run_until_complete(run())
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            result.data,
+            {
+                'authors': {
+                    'total': 1,
+                    'edges': [{'node': {'id': author.id}}],
+                },
+                'author': {'name': author.name},
+            }
+        )
+        self.assertEqual(self.loop.run_until_complete(self.manager.count(Author.select())), 2)
+
+    def test_mutation_bypasses_snapshot(self):
+
+        async def run():
+            async with Snapshot(self.manager) as snapshot:
+                return await self.query('''
+                    mutation {
+                        create_author (name: "foo", rating: 42) {
+                            affected { name }
+                        }
+                    }
+                ''', context={'snapshot': snapshot})
+
+        result = self.loop.run_until_complete(run())
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(result.data, {'create_author': {'affected': {'name': 'foo'}}})
@@ -0,0 +1,91 @@
+import json
+
+from graphene_peewee_async.streaming import execute_streaming, QueryStream, StreamingError
+
+from tests.common import ApiTest, Author, Book
+
+
+class TestStreaming(ApiTest):
+
+    def setUp(self):
+        super().setUp()
+        self.author = self.loop.run_until_complete(
+            self.manager.create(Author, name='foo', rating=42)
+        )
+        self.books = [
+            self.loop.run_until_complete(
+                self.manager.create(Book, name='bar{}'.format(i), year=2000 + i, author=self.author)
+            )
+            for i in range(5)
+        ]
+
+    async def collect(self, iterator):
+        items = []
+        async for item in iterator:
+            items.append(item)
+        return items
+
+    def test_stream_ndjson(self):
+        stream = self.loop.run_until_complete(execute_streaming(self.schema, '''
+            query {
+                books (filters: {year__gt: 2000}, order_by: ["id"]) {
+                    edges {
+                        node {
+                            id
+                            title: name
+                            author { name }
+                        }
+                    }
+                }
+            }
+        ''', fetch_size=2, executor=self.executor))
+
+        lines = self.loop.run_until_complete(self.collect(stream.ndjson()))
+
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [{'node': {'id': book.id, 'title': book.name, 'author': {'name': self.author.name}}}
+             for book in self.books[1:]]
+        )
+        self.assertTrue(all(line.endswith('\n') for line in lines))
+
+    def test_query_stream(self):
+
+        async def run():
+            async with QueryStream(self.manager, Book.select().order_by(Book.id), fetch_size=3) as books:
+                return await self.collect(books)
+
+        books = self.loop.run_until_complete(run())
+
+        self.assertEqual([book.id for book in books], [book.id for book in self.books])
+
+    def test_backref_not_streamed(self):
+        stream = self.loop.run_until_complete(execute_streaming(self.schema, '''
+            query {
+                authors {
+                    edges {
+                        node {
+                            book_set { total }
+                        }
+                    }
+                }
+            }
+        ''', executor=self.executor))
+
+        with self.assertRaises(StreamingError):
+            self.loop.run_until_complete(self.collect(stream.edges()))
+
+    def test_stopped_early(self):
+        stream = self.loop.run_until_complete(execute_streaming(self.schema, '''
+            query { books (order_by: ["id"]) { edges { node { id } } } }
+        ''', fetch_size=2, executor=self.executor))
+        lines = stream.ndjson()
+
+        async def run():
+            async with lines:
+                async for line in lines:
+                    return json.loads(line)
+
+        self.assertEqual(self.loop.run_until_complete(run()), {'node': {'id': self.books[0].id}})
+        self.assertIsNone(lines.edges.rows.connection)
+        self.assertTrue(lines.edges.rows.finished)
@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+from graphene import Schema, ObjectType, Boolean, String
+from graphql.execution.executors.asyncio import AsyncioExecutor
+from peewee import SQL
+
+from graphene_peewee_async.fields import PeeweeConnectionField
+from graphene_peewee_async.registry import Registry
+from graphene_peewee_async.types import PeeweeMutation
+
+from tests.common import ApiTest, Author
+from tests.common.schema import get_node, get_connection
+
+
+class TestTimeout(ApiTest):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        connection_class = get_connection(get_node(cls.manager, Author, Registry()))
+
+        class Query(ObjectType):
+            slow_authors = PeeweeConnectionField(connection_class, timeout=0.1)
+
+            def resolve_slow_authors(self, info, **args):
+                return Author.select().where(SQL('(SELECT 1 FROM pg_sleep(5)) = 1'))
+
+        class SlowCreateAuthor(PeeweeMutation):
+
+            class Meta:
+                model = Author
+                manager = cls.manager
+                timeout = 0.1
+
+            class Arguments:
+                name = String()
+
+            ok = Boolean()
+
+            @classmethod
+            async def mutate(mutation_cls, root, info, name):
+                await mutation_cls._meta.manager.create(Author, name=name, rating=1)
+                await asyncio.sleep(5)
+                return mutation_cls(ok=True)
+
+        class Mutation(ObjectType):
+            slow_create_author = SlowCreateAuthor.Field()
+
+        cls.slow_schema = Schema(query=Query, mutation=Mutation, auto_camelcase=False)
+
+    def test_field_timeout(self):
+        started = time.monotonic()
+
+        result = self.loop.run_until_complete(self.slow_schema.execute(
+            '''
+                query {
+                    slow_authors {
+                        edges { node { id } }
+                    }
+                }
+            ''',
+            return_promise=True,
+            executor=AsyncioExecutor()
+        ))
+
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(len(result.errors), 1)
+        self.assertEqual(str(result.errors[0]), 'Query exceeded 0.1s timeout')
+
+    def test_operation_deadline(self):
+        result = self.loop.run_until_complete(self.query('''
+            query {
+                authors {
+                    edges { node { id } }
+                }
+            }
+        ''', context={'deadline': time.monotonic() - 1}))
+
+        self.assertEqual(len(result.errors), 1)
+        self.assertIn('deadline', str(result.errors[0]))
+
+    def test_mutation_deadline(self):
+        result = self.loop.run_until_complete(self.query('''
+            mutation {
+                create_author (name: "foo", rating: 42) {
+                    affected { id }
+                }
+            }
+        ''', context={'deadline': time.monotonic() - 1}))
+
+        self.assertEqual(len(result.errors), 1)
+        self.assertIn('deadline', str(result.errors[0]))
+        self.assertEqual(self.loop.run_until_complete(self.manager.count(Author.select())), 0)
+
+    def test_mutation_timeout_rolls_back(self):
+        result = self.loop.run_until_complete(self.slow_schema.execute(
+            'mutation { slow_create_author (name: "foo") { ok } }',
+            return_promise=True,
+            executor=AsyncioExecutor()
+        ))
+
+        self.assertEqual(str(result.errors[0]), 'Mutation exceeded 0.1s timeout')
+        self.assertEqual(self.loop.run_until_complete(self.manager.count(Author.select())), 0)
@@ -0,0 +1,116 @@
+import json
+from unittest import mock
+
+from graphql import parse, print_schema, validate
+from peewee import CharField, ForeignKeyField
+
+from graphene_peewee_async.fields import PeeweeConnectionField
+from graphene_peewee_async.inputs import get_filter_input, get_order_by_enum
+from graphene_peewee_async.registry import Registry
+
+from tests.common import ApiTest, Author, Book
+from tests.common.models import BaseModel
+from tests.common.schema import generate_schema, get_node
+
+
+class TestTypedFilters(ApiTest):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with mock.patch.object(PeeweeConnectionField, 'typed_filters', True):
+            cls.typed_schema, _ = generate_schema(cls.manager, [Book, Author])
+
+    def setUp(self):
+        super().setUp()
+        for name, rating, year in (('foo', 1, 2001), ('bar', 5, 2005)):
+            author = self.loop.run_until_complete(self.manager.create(Author, name=name, rating=rating))
+            self.loop.run_until_complete(self.manager.create(Book, name=name, year=year, author=author))
+
+    def execute(self, query):
+        with mock.patch.object(self.manager, 'execute', wraps=self.manager.execute) as execute:
+            result = self.loop.run_until_complete(self.typed_schema.execute(query, executor=self.executor,
+                                                                            return_promise=True))
+        return result, execute.call_count
+
+    def test_types(self):
+        sdl = print_schema(self.typed_schema)
+
+        self.assertIn('books(filters: BookFilterInput, order_by: [BookOrderBy]', sdl)
+        self.assertIn('author__name__ilike: String', sdl)
+        self.assertIn('year__in: [Int]', sdl)
+        self.assertIn('author__rating_desc', sdl)
+        self.assertIn('distinct_on: [BookDistinctOn]', sdl)
+
+    def test_types_kept_on_node(self):
+        node_class = get_node(self.manager, Book, Registry())
+
+        self.assertIs(get_filter_input(node_class), get_filter_input(node_class))
+        self.assertIsNot(get_order_by_enum(node_class), get_order_by_enum(node_class, 2))
+        self.assertEqual(set(node_class._meta.generated_types),
+                         {('FilterInput', 1), ('OrderBy', 1), ('OrderBy', 2)})
+
+    def test_filtered_and_ordered(self):
+        result, _ = self.execute('''
+            query {
+                books (filters: {author__rating__gte: 1, year__in: [2001, 2005]}, order_by: [author__rating_desc]) {
+                    edges { node { name } }
+                }
+            }
+        ''')
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(json.loads(json.dumps(result.data['books']['edges'])), [
+            {'node': {'name': 'bar'}},
+            {'node': {'name': 'foo'}},
+        ])
+
+    def test_backref_filters(self):
+        result, _ = self.execute('''
+            query {
+                authors (filters: {book_set__year__gte: 2005, book_set__name__ilike: "b%"}) {
+                    edges { node { name } }
+                }
+            }
+        ''')
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(json.loads(json.dumps(result.data['authors']['edges'])), [{'node': {'name': 'bar'}}])
+
+    def test_rejected_by_validation(self):
+        for arguments in ('filters: {missing: 1}', 'filters: {year__gt: "soon"}', 'order_by: [missing_asc]'):
+            result, queries = self.execute('query { books (%s) { edges { node { name } } } }' % arguments)
+
+            self.assertTrue(result.invalid)
+            self.assertEqual(queries, 0)
+
+    def test_distinct_on(self):
+        result, _ = self.execute('''
+            query {
+                books (distinct_on: [author__rating], order_by: [author__rating_desc]) {
+                    edges { node { name } }
+                }
+            }
+        ''')
+
+        self.assertIsNone(result.errors)
+        self.assertEqual([edge['node']['name'] for edge in result.data['books']['edges']], ['bar', 'foo'])
+        result, queries = self.execute('query { books (distinct_on: [author__rating_desc]) { total } }')
+        self.assertTrue(result.invalid)
+        self.assertEqual(queries, 0)
+
+    def test_foreign_key_to_non_integer_column(self):
+
+        class Country(BaseModel):
+            code = CharField(unique=True)
+
+        class City(BaseModel):
+            country = ForeignKeyField(Country, field='code')
+
+        with mock.patch.object(PeeweeConnectionField, 'typed_filters', True):
+            schema, _ = generate_schema(self.manager, [City, Country])
+
+        errors = validate(schema, parse('''
+            query { citys (filters: {country: "US", country__in: ["US"], country__code__ne: "GB"}) { total } }
+        '''))
+        self.assertEqual(errors, [])